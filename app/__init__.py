@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import threading
 from datetime import datetime
+from importlib import import_module
 
-from flask import Flask, render_template
+import click
+from flask import Flask, appcontext_pushed, render_template
 from flask_login import login_required, current_user
 
-from sqlalchemy import event, or_
+from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 from .extensions import db, migrate, login_manager, csrf
+from . import instrumentation
+from .instrumentation import query_budget
 
 
 @event.listens_for(Engine, "connect")
@@ -24,9 +29,71 @@ def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
         cur.close()
 
 
-def create_app() -> Flask:
+# (module, blueprint, url_prefix); None keeps the blueprint's own prefix.
+BLUEPRINTS = (
+    (".auth.routes", "auth_bp", "/auth"),
+    (".social.routes", "social_bp", "/social"),
+    (".pets.routes", "pets_bp", None),
+    (".schedule.routes", "schedule_bp", None),
+    (".matching.routes", "matching_bp", None),
+    (".assignments.routes", "assignments_bp", None),
+    (".analytics.routes", "analytics_bp", None),
+)
+
+# `flask` commands that serve or inspect pages; the others never import the views.
+PAGE_COMMANDS = frozenset({"run", "routes", "shell", "loadtest"})
+
+_blueprints_lock = threading.Lock()
+
+
+def register_blueprints(app: Flask) -> None:
+    with _blueprints_lock:
+        if app.extensions.get("blueprints"):
+            return
+        for module, name, url_prefix in BLUEPRINTS:
+            app.register_blueprint(getattr(import_module(module, __name__), name), url_prefix=url_prefix)
+        app.extensions["blueprints"] = True
+
+
+def _fast_startup(app: Flask) -> bool:
+    mode = str(app.config.get("FAST_STARTUP", "auto"))
+    if mode == "auto":
+        return click.get_current_context(silent=True) is not None
+    return mode == "1"
+
+
+def _needs_pages() -> bool:
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return True
+    while ctx is not None:
+        if ctx.info_name in PAGE_COMMANDS:
+            return True
+        ctx = ctx.parent
+    return False
+
+
+def _defer_blueprints(app: Flask) -> None:
+    """Register the blueprints with the first app context that may need them.
+
+    That is the first request (or test request context), or a command from
+    ``PAGE_COMMANDS``. Requests push the app context before URL matching, so
+    the first one is routed normally.
+    """
+
+    def on_push(sender, **_):
+        if _needs_pages():
+            register_blueprints(sender)
+            appcontext_pushed.disconnect(on_push, sender)
+
+    appcontext_pushed.connect(on_push, app, weak=False)
+
+
+def create_app(config: dict | None = None) -> Flask:
     app = Flask(__name__)
     app.config.from_object("config.Config")
+    if config:
+        app.config.update(config)
 
     os.makedirs(os.path.join(app.static_folder, "uploads"), exist_ok=True)
     os.makedirs(app.instance_path, exist_ok=True)
@@ -46,32 +113,29 @@ def create_app() -> Flask:
     csrf.init_app(app)
     login_manager.login_view = "auth.login"
 
+    instrumentation.init_app(app)
+
+    from .social import cache as friend_cache
+    friend_cache.init_app(app)
+
+    from . import dashboard as dashboard_cache
+    dashboard_cache.init_app(app)
+
     from .models.user import User
     from .models.social import Friendship
     from .models.pet import Pet
     from .models.care import CareRequest
     from .models.assignment import CareAssignment
+    from .models.feed import SitterFeed
+    from .models.analytics import AnalyticsMonthly
+    from .models.stats import UserStats
+    from .models.archive import CareRequestArchive, CareAssignmentArchive
+    from . import data_version, user_stats
 
-    from .auth.routes import auth_bp
-    app.register_blueprint(auth_bp, url_prefix="/auth")
-
-    from .social.routes import social_bp
-    app.register_blueprint(social_bp, url_prefix="/social")
-
-    from .pets.routes import pets_bp
-    app.register_blueprint(pets_bp)
-
-    from .schedule.routes import schedule_bp
-    app.register_blueprint(schedule_bp)
-
-    from .matching.routes import matching_bp
-    app.register_blueprint(matching_bp)
-
-    from .assignments.routes import assignments_bp
-    app.register_blueprint(assignments_bp)
-
-    from .analytics.routes import analytics_bp
-    app.register_blueprint(analytics_bp)
+    if _fast_startup(app):
+        _defer_blueprints(app)
+    else:
+        register_blueprints(app)
 
     from .cli import (
         init_db_cmd,
@@ -80,6 +144,16 @@ def create_app() -> Flask:
         seed_demo_cmd,
         seed_small_cmd,
         seed_big_cmd,
+        loadtest_cmd,
+        rebuild_feeds_cmd,
+        check_feeds_cmd,
+        rollup_backfill_cmd,
+        stats_verify_cmd,
+        lifecycle_cmd,
+        archive_cmd,
+        export_cmd,
+        import_cmd,
+        startup_profile_cmd,
     )
 
     app.cli.add_command(init_db_cmd)
@@ -88,6 +162,16 @@ def create_app() -> Flask:
     app.cli.add_command(seed_demo_cmd)
     app.cli.add_command(seed_small_cmd)
     app.cli.add_command(seed_big_cmd)
+    app.cli.add_command(loadtest_cmd)
+    app.cli.add_command(rebuild_feeds_cmd)
+    app.cli.add_command(check_feeds_cmd)
+    app.cli.add_command(rollup_backfill_cmd)
+    app.cli.add_command(stats_verify_cmd)
+    app.cli.add_command(lifecycle_cmd)
+    app.cli.add_command(archive_cmd)
+    app.cli.add_command(export_cmd)
+    app.cli.add_command(import_cmd)
+    app.cli.add_command(startup_profile_cmd)
 
     @app.get("/")
     def index():
@@ -95,58 +179,13 @@ def create_app() -> Flask:
 
     @app.get("/dashboard")
     @login_required
+    @query_budget(3)
     def dashboard():
-        rels = Friendship.query.filter(
-            Friendship.status == "accepted",
-            or_(
-                Friendship.requester_id == current_user.id,
-                Friendship.addressee_id == current_user.id,
-            ),
-        ).all()
-        friend_ids = [
-            (r.addressee_id if r.requester_id == current_user.id else r.requester_id)
-            for r in rels
-        ]
-
-        stats = {
-            "pets": Pet.query.filter_by(owner_id=current_user.id).count(),
-            "open_requests": CareRequest.query.filter_by(
-                owner_id=current_user.id, status="open"
-            ).count(),
-            "sitter_assignments": CareAssignment.query.filter(
-                CareAssignment.sitter_id == current_user.id,
-                CareAssignment.status == "active",
-                CareAssignment.end_at >= datetime.utcnow(),
-            ).count(),
-            "friends_open_reqs": (
-                CareRequest.query.filter(
-                    CareRequest.status == "open",
-                    CareRequest.owner_id.in_(friend_ids),
-                ).count()
-                if friend_ids
-                else 0
-            ),
-            "pending_approvals": (
-                CareAssignment.query.join(
-                    CareRequest, CareRequest.id == CareAssignment.care_request_id
-                )
-                .filter(
-                    CareRequest.owner_id == current_user.id,
-                    CareAssignment.status == "pending",
-                )
-                .count()
-            ),
-        }
-
-        latest = {
-            "requests": CareRequest.query.filter_by(owner_id=current_user.id)
-            .order_by(CareRequest.start_at.desc())
-            .limit(5)
-            .all(),
-        }
+        dash = dashboard_cache.load(current_user)
+        latest = {"requests": dash.recent}
 
         return render_template(
-            "dashboard.html", user=current_user, stats=stats, latest=latest
+            "dashboard.html", user=current_user, stats=dash.stats, latest=latest
         )
 
     @app.context_processor
@@ -190,10 +229,8 @@ def create_app() -> Flask:
 
     @app.teardown_request
     def _teardown_request(_exc):
-        try:
-            if _exc is not None:
-                db.session.rollback()
-        finally:
-            db.session.remove()
+        # Flask-SQLAlchemy removes the session when the app context ends.
+        if _exc is not None:
+            db.session.rollback()
 
     return app
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Series behind the analytics charts, read from ``analytics_monthly``.
+
+Each series is a ``GROUP BY`` over the user's rollup rows, so the work depends
+on the chart window and not on how long the user has been around. The month
+bucket and duration expressions (dialect-specific; SQLite and PostgreSQL) are
+what ``rollup.backfill`` aggregates the base tables with.
+"""
+from __future__ import annotations
+
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models.analytics import AnalyticsMonthly
+
+SITTER_HOUR_STATUSES = ("pending", "active", "done")
+
+
+def month_of(col):
+    """``'YYYY-MM'`` of a timestamp column."""
+    if db.engine.dialect.name == "postgresql":
+        return func.to_char(col, "YYYY-MM")
+    return func.strftime("%Y-%m", col)
+
+
+def hours_between(start, end):
+    if db.engine.dialect.name == "postgresql":
+        return func.extract("epoch", end - start) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+
+def request_status_counts(owner_id: int) -> dict[str, int]:
+    rows = (
+        db.session.query(AnalyticsMonthly.status, func.sum(AnalyticsMonthly.count))
+        .filter(AnalyticsMonthly.user_id == owner_id, AnalyticsMonthly.role == "owner")
+        .group_by(AnalyticsMonthly.status)
+        .all()
+    )
+    return {status: int(n) for status, n in rows if n}
+
+
+def _per_month(user_id: int, role: str, value, months: list[str], statuses=None) -> dict:
+    q = db.session.query(AnalyticsMonthly.month, func.sum(value)).filter(
+        AnalyticsMonthly.user_id == user_id,
+        AnalyticsMonthly.role == role,
+        AnalyticsMonthly.month >= months[0],
+        AnalyticsMonthly.month <= months[-1],
+    )
+    if statuses is not None:
+        q = q.filter(AnalyticsMonthly.status.in_(statuses))
+    return dict(q.group_by(AnalyticsMonthly.month).all())
+
+
+def requests_per_month(owner_id: int, months: list[str]) -> dict[str, int]:
+    counts = dict.fromkeys(months, 0)
+    rows = _per_month(owner_id, "owner", AnalyticsMonthly.count, months)
+    counts.update((m, int(n)) for m, n in rows.items() if m in counts)
+    return counts
+
+
+def sitter_hours_per_month(sitter_id: int, months: list[str]) -> dict[str, float]:
+    hours = dict.fromkeys(months, 0.0)
+    rows = _per_month(sitter_id, "sitter", AnalyticsMonthly.hours, months, SITTER_HOUR_STATUSES)
+    # Rounded: the rollup adds and subtracts float deltas.
+    hours.update((m, round(float(h), 2) + 0.0) for m, h in rows.items() if m in hours)
+    return hours
@@ -0,0 +1,171 @@
+"""Incremental upkeep of ``analytics_monthly``.
+
+A care request counts for its owner, and an assignment for its sitter, in the
+bucket of its status and ``start_at`` month. Write paths snapshot the bucket
+of the row before they change it and hand both snapshots to ``move``:
+
+    before = rollup.of_request(cr)
+    cr.status = "cancelled"
+    rollup.move(before, rollup.of_request(cr))
+
+``move`` applies the difference as an upsert (``count = count + :d``), so a
+write touches at most two rollup rows and nothing is ever recomputed from the
+base tables. The user's ``data_version`` is bumped by the flush of the row
+itself (``app.data_version``). ``backfill`` does the
+full recomputation: everything on an empty table, or only from a given month
+on (by default the current one, which leaves closed months alone). It reads
+the ``*_archive`` tables too, so archiving history (``app.archive``) does not
+change the charts.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import cast
+
+from sqlalchemy import case, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
+
+from ..extensions import db
+from ..models.analytics import AnalyticsMonthly
+from ..models.archive import CareAssignmentArchive, CareRequestArchive
+from ..models.assignment import CareAssignment
+from ..models.care import CareRequest
+from ..models.user import User
+from .queries import hours_between, month_of
+
+_KEY = ("user_id", "role", "month", "status")
+
+
+@dataclass(frozen=True)
+class Bucket:
+    user_id: int
+    role: str
+    month: str
+    status: str
+    hours: float
+
+
+def current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def _hours(start: datetime, end: datetime) -> float:
+    return max((end - start).total_seconds() / 3600.0, 0.0)
+
+
+def of_request(cr: CareRequest) -> Bucket | None:
+    if cr.owner_id is None or cr.start_at is None or cr.end_at is None:
+        return None
+    return Bucket(cr.owner_id, "owner", cr.start_at.strftime("%Y-%m"), cr.status or "open",
+                  _hours(cr.start_at, cr.end_at))
+
+
+def of_assignment(a: CareAssignment) -> Bucket | None:
+    if a.sitter_id is None or a.start_at is None or a.end_at is None:
+        return None
+    return Bucket(a.sitter_id, "sitter", a.start_at.strftime("%Y-%m"), a.status or "pending",
+                  _hours(a.start_at, a.end_at))
+
+
+def move(before: Bucket | None, after: Bucket | None) -> None:
+    """Take one row out of ``before`` and put it into ``after``."""
+    if before == after:
+        return
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    for bucket, sign in ((before, -1), (after, 1)):
+        if bucket is not None:
+            d = deltas[(bucket.user_id, bucket.role, bucket.month, bucket.status)]
+            d[0] += sign
+            d[1] += sign * bucket.hours
+    rows = [
+        dict(zip(_KEY, key), count=n, hours=h)
+        for key, (n, h) in deltas.items()
+        if n or h
+    ]
+    if rows:
+        _add(rows)
+
+
+def _upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=list(_KEY),
+        set_={
+            "count": AnalyticsMonthly.count + stmt.excluded.count,
+            "hours": AnalyticsMonthly.hours + stmt.excluded.hours,
+        },
+    )
+
+
+def _insert():
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(AnalyticsMonthly)
+
+
+def _add(rows: list[dict]) -> None:
+    db.session.execute(_upsert(_insert().values(rows)))
+
+
+def _hours_of(model):
+    return case(
+        (model.end_at > model.start_at, hours_between(model.start_at, model.end_at)),
+        else_=0.0,
+    )
+
+
+_ROLES = (
+    ("owner", CareRequest, CareRequest.owner_id),
+    ("sitter", CareAssignment, CareAssignment.sitter_id),
+)
+_ARCHIVES = {CareRequest: CareRequestArchive.__table__, CareAssignment: CareAssignmentArchive.__table__}
+
+
+def move_status(model, ids: list[int], before: str, after: str) -> None:
+    """Set-based ``move`` of the rows ``ids`` of ``model`` from status ``before`` to ``after``."""
+    role, user_col = next((r, c) for r, m, c in _ROLES if m is model)
+    month = month_of(model.start_at)
+    for status, sign in ((before, -1), (after, 1)):
+        q = (
+            select(user_col, literal(role), month, literal(status),
+                   func.count() * sign, func.sum(_hours_of(model)) * sign)
+            .where(model.id.in_(ids), user_col.isnot(None))
+            .group_by(user_col, month)
+        )
+        db.session.execute(_upsert(_insert().from_select([*_KEY, "count", "hours"], q)))
+
+
+def backfill(since: str | None = None) -> int:
+    """Recompute the rollup for months >= ``since`` (all when None); returns the row count."""
+    start = datetime.strptime(since, "%Y-%m") if since else None
+    cleared = delete(AnalyticsMonthly)
+    if since:
+        cleared = cleared.where(AnalyticsMonthly.month >= since)
+    db.session.execute(cleared)
+
+    rows = 0
+    for role, model, user_col in _ROLES:
+        # Archived rows still count: aggregate the hot and the archive table together.
+        parts = []
+        for table in (model.__table__, _ARCHIVES[model]):
+            c = table.c
+            part = select(c[user_col.key].label("user_id"), c.start_at, c.end_at, c.status)
+            if start is not None:
+                part = part.where(c.start_at >= start)
+            parts.append(part)
+        src = union_all(*parts).subquery()
+        month = month_of(src.c.start_at)
+        q = (
+            select(src.c.user_id, literal(role), month, src.c.status, func.count(),
+                   func.sum(_hours_of(src.c)))
+            .where(src.c.user_id.isnot(None))
+            .group_by(src.c.user_id, month, src.c.status)
+        )
+        result = db.session.execute(
+            insert(AnalyticsMonthly).from_select([*_KEY, "count", "hours"], q)
+        )
+        rows += cast(CursorResult, result).rowcount
+    db.session.execute(update(User).values(data_version=User.data_version + 1))
+    db.session.commit()
+    return rows
@@ -1,28 +1,16 @@
-import importlib
-import json
-from collections import Counter
 from datetime import datetime
 
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, jsonify, render_template, request
 from flask_login import current_user, login_required
 
-from ..models.assignment import CareAssignment
-from ..models.care import CareRequest
+from ..instrumentation import query_budget
+from .queries import request_status_counts, requests_per_month, sitter_hours_per_month
 
 analytics_bp = Blueprint("analytics", __name__, template_folder="../templates")
 
-try:
-    px = importlib.import_module("plotly.express") 
-    PlotlyJSONEncoder = importlib.import_module("plotly.utils").PlotlyJSONEncoder  
-    _HAS_PLOTLY = True
-except Exception:
-    px = None
-    PlotlyJSONEncoder = None
-    _HAS_PLOTLY = False
-
-
-def _month_key(dt: datetime) -> str:
-    return dt.strftime("%Y-%m")
+DEFAULT_MONTHS = 6
+MAX_MONTHS = 120
+RANGE_CHOICES = (6, 12, 24, 60)
 
 
 def _last_n_months_labels(n: int = 6) -> list[str]:
@@ -38,115 +26,38 @@ def _last_n_months_labels(n: int = 6) -> list[str]:
     return months
 
 
+def _span() -> int:
+    return min(max(request.args.get("months", DEFAULT_MONTHS, type=int), 1), MAX_MONTHS)
+
+
 @analytics_bp.get("/analytics")
 @login_required
+@query_budget(1)
 def overview():
-    my_reqs = CareRequest.query.filter_by(owner_id=current_user.id).all()
-
-    by_status = Counter([(r.status or "unknown") for r in my_reqs])
-    status_labels = list(by_status.keys()) or ["no data"]
-    status_values = list(by_status.values()) or [1]
+    return render_template("analytics.html", span=_span(), spans=RANGE_CHOICES)
 
-    months = _last_n_months_labels(6)
-    monthly_counts = {m: 0 for m in months}
-    for r in my_reqs:
-        if r.start_at:
-            k = _month_key(r.start_at)
-            if k in monthly_counts:
-                monthly_counts[k] += 1
-    months_x = list(monthly_counts.keys())
-    months_y = list(monthly_counts.values())
 
-    my_assignments = CareAssignment.query.filter(
-        CareAssignment.sitter_id == current_user.id,
-        CareAssignment.status.in_(["pending", "active", "done"]),
-    ).all()
-
-    sitter_hours = {m: 0.0 for m in months}
-    for a in my_assignments:
-        if not a.start_at or not a.end_at:
-            continue
-        dur_h = (a.end_at - a.start_at).total_seconds() / 3600.0
-        if dur_h <= 0:
-            continue
-        k = _month_key(a.start_at)
-        if k in sitter_hours:
-            sitter_hours[k] += round(dur_h, 2)
-
-    sitter_x = list(sitter_hours.keys())
-    sitter_y = list(sitter_hours.values())
-
-    def dumps_obj(obj) -> str:
-        if _HAS_PLOTLY and PlotlyJSONEncoder is not None:
-            return json.dumps(obj, cls=PlotlyJSONEncoder, allow_nan=False)
-        return json.dumps(obj, allow_nan=False)
-
-    if _HAS_PLOTLY and px is not None:
-        fig_status = px.pie(
-            names=status_labels,
-            values=status_values,
-            hole=0.4,
-            title="Your care requests by status",
-        )
-        fig_status.update_traces(textposition="inside", textinfo="percent+label")
-
-        fig_reqs = px.bar(
-            x=months_x,
-            y=months_y,
-            title="Requests per month (last 6 months)",
-            labels={"x": "Month", "y": "Requests"},
-        )
-
-        fig_hours = px.bar(
-            x=sitter_x,
-            y=sitter_y,
-            title="Your sitter hours per month (last 6 months)",
-            labels={"x": "Month", "y": "Hours"},
-        )
-
-        status_json = dumps_obj(fig_status)
-        requests_json = dumps_obj(fig_reqs)
-        hours_json = dumps_obj(fig_hours)
+@analytics_bp.get("/analytics/data.json")
+@login_required
+@query_budget(4)
+def data():
+    """Chart series as labels/values; 304 while the user's data and the window are unchanged."""
+    span = _span()
+    months = _last_n_months_labels(span)
+    # The window moves with the calendar, so the current month is part of the tag.
+    etag = f"u{current_user.id}-v{current_user.data_version}-{months[-1]}-{span}"
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
     else:
-        status_json = dumps_obj(
-            {
-                "data": [
-                    {
-                        "type": "pie",
-                        "labels": status_labels,
-                        "values": status_values,
-                        "hole": 0.4,
-                        "textinfo": "percent+label",
-                        "textposition": "inside",
-                    }
-                ],
-                "layout": {"title": "Your care requests by status"},
-            }
-        )
-        requests_json = dumps_obj(
-            {
-                "data": [{"type": "bar", "x": months_x, "y": months_y}],
-                "layout": {
-                    "title": "Requests per month (last 6 months)",
-                    "xaxis": {"title": "Month"},
-                    "yaxis": {"title": "Requests"},
-                },
-            }
+        by_status = request_status_counts(current_user.id)
+        requests = requests_per_month(current_user.id, months)
+        hours = sitter_hours_per_month(current_user.id, months)
+        response = jsonify(
+            months=span,
+            status={"labels": list(by_status), "values": list(by_status.values())},
+            requests={"labels": list(requests), "values": list(requests.values())},
+            hours={"labels": list(hours), "values": list(hours.values())},
         )
-        hours_json = dumps_obj(
-            {
-                "data": [{"type": "bar", "x": sitter_x, "y": sitter_y}],
-                "layout": {
-                    "title": "Your sitter hours per month (last 6 months)",
-                    "xaxis": {"title": "Month"},
-                    "yaxis": {"title": "Hours"},
-                },
-            }
-        )
-
-    return render_template(
-        "analytics.html",
-        status_json=status_json,
-        requests_json=requests_json,
-        hours_json=hours_json,
-    )
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,136 @@
+"""Moving finished history into the ``*_archive`` tables.
+
+A care request is archived together with all of its assignments, once the
+request is in a terminal status, every assignment is too and all of them
+ended before the cutoff. Such rows count towards no ``user_stats`` counter,
+have no ``sitter_feed`` rows and no R*Tree boxes, so the move only copies
+them into ``care_requests_archive`` / ``care_assignments_archive`` (same ids
+and columns, plus ``archived_at``) and deletes them from the hot tables.
+``analytics_monthly`` keeps counting them and ``rollup.backfill`` reads the
+archive tables as well.
+
+``archive`` works in chunks of ``chunk_size`` requests, each its own short
+transaction (``INSERT ... SELECT`` into both archives, then the deletes), so
+the write lock is never held for long; ``pause`` sleeps between chunks to
+let other writers in.
+"""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import cast
+
+from sqlalchemy import delete, exists, insert, literal, or_, select
+from sqlalchemy.engine import CursorResult
+
+from .data_version import bump_statement
+from .extensions import db
+from .models.archive import CareAssignmentArchive, CareRequestArchive
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+
+REQUEST_STATUSES = ("confirmed", "completed", "done", "cancelled", "expired")
+ASSIGNMENT_STATUSES = ("done", "declined", "cancelled")
+
+_AGE = re.compile(r"^(\d+)([hdw])$")
+_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_age(text: str) -> timedelta:
+    """``"180d"`` -> 180 days; units are h, d and w."""
+    m = _AGE.match(text.strip().lower())
+    if not m:
+        raise ValueError(f"expected a number followed by h, d or w, got {text!r}")
+    return timedelta(**{_UNITS[m.group(2)]: int(m.group(1))})
+
+
+@dataclass
+class ArchiveResult:
+    requests: int = 0
+    assignments: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    # Longest chunk transaction, i.e. the longest the write lock was held.
+    max_chunk_seconds: float = 0.0
+    cutoff: datetime | None = field(default=None)
+
+    @property
+    def rate(self) -> float:
+        rows = self.requests + self.assignments
+        return rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _due(cutoff: datetime, limit: int):
+    unfinished = select(CareAssignment.id).where(
+        CareAssignment.care_request_id == CareRequest.id,
+        or_(CareAssignment.status.notin_(ASSIGNMENT_STATUSES), CareAssignment.end_at >= cutoff),
+    )
+    return (
+        select(CareRequest.id)
+        .where(
+            CareRequest.status.in_(REQUEST_STATUSES),
+            CareRequest.end_at < cutoff,
+            ~exists(unfinished),
+        )
+        .order_by(CareRequest.end_at)
+        .limit(limit)
+    )
+
+
+def _copy(model, archive_model, where, now: datetime) -> int:
+    names = [c.name for c in model.__table__.c]
+    q = select(*model.__table__.c, literal(now)).where(where)
+    result = db.session.execute(insert(archive_model).from_select([*names, "archived_at"], q))
+    return cast(CursorResult, result).rowcount
+
+
+def _archive_chunk(cutoff: datetime, chunk_size: int) -> tuple[int, int]:
+    ids = db.session.scalars(_due(cutoff, chunk_size)).all()
+    if not ids:
+        db.session.commit()
+        return 0, 0
+    now = datetime.utcnow()
+    sitters = db.session.scalars(
+        select(CareAssignment.sitter_id).where(CareAssignment.care_request_id.in_(ids)).distinct()
+    ).all()
+    _copy(CareRequest, CareRequestArchive, CareRequest.id.in_(ids), now)
+    assignments = _copy(CareAssignment, CareAssignmentArchive, CareAssignment.care_request_id.in_(ids), now)
+    # The owners' request lists change; bump before their rows are gone.
+    db.session.execute(bump_statement(users=sitters, requests=ids))
+    db.session.execute(
+        delete(CareAssignment)
+        .where(CareAssignment.care_request_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(CareRequest).where(CareRequest.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(ids), assignments
+
+
+def archive(
+    older_than: timedelta,
+    chunk_size: int = 500,
+    pause: float = 0.0,
+    now: datetime | None = None,
+) -> ArchiveResult:
+    """Archive every finished request (with its assignments) that ended more than ``older_than`` ago."""
+    cutoff = (now or datetime.utcnow()) - older_than
+    result = ArchiveResult(cutoff=cutoff)
+    started = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        requests, assignments = _archive_chunk(cutoff, chunk_size)
+        result.max_chunk_seconds = max(result.max_chunk_seconds, time.perf_counter() - t0)
+        result.chunks += 1
+        result.requests += requests
+        result.assignments += assignments
+        if requests < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,151 @@
+"""Approve many pending applications in one transaction.
+
+``approve_batch`` loads the pending rows (with their requests) in one query and
+the active assignments of every sitter and pet involved in a second one, then
+decides every item in memory:
+
+1. per-item checks (owner, still pending, window inside the request);
+2. conflicts with existing active assignments: per sitter/pet the active
+   intervals are merged into a sorted, disjoint list and each item is a
+   binary search;
+3. conflicts inside the batch: the surviving items are swept in start order,
+   keeping per sitter/pet the furthest end approved so far. An item that
+   starts before that end overlaps an item approved earlier in the sweep.
+
+That is O(n log n) overall. Everything approved is committed together.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import or_
+
+from ..analytics import rollup
+from ..extensions import db
+from ..matching import feed
+from ..models.assignment import CareAssignment
+from ..models.care import CareRequest
+
+
+@dataclass
+class BatchItem:
+    assignment_id: int
+    start_at: datetime | None = None
+    end_at: datetime | None = None
+
+
+@dataclass
+class BatchResult:
+    assignment_id: int
+    ok: bool
+    message: str
+    conflict_id: int | None = None
+
+
+class _Merged:
+    """Sorted disjoint intervals of one sitter or pet, with the id of one member each."""
+
+    def __init__(self, intervals: list[tuple[datetime, datetime, int]]) -> None:
+        self.starts: list[datetime] = []
+        self.spans: list[tuple[datetime, datetime, int]] = []
+        for start, end, aid in sorted(intervals):
+            if self.spans and start < self.spans[-1][1]:
+                s, e, first = self.spans[-1]
+                self.spans[-1] = (s, max(e, end), first)
+            else:
+                self.spans.append((start, end, aid))
+                self.starts.append(start)
+
+    def overlapping(self, start: datetime, end: datetime) -> int | None:
+        i = bisect_left(self.starts, end) - 1
+        if i >= 0 and self.spans[i][1] > start:
+            return self.spans[i][2]
+        return None
+
+
+def approve_batch(owner_id: int, items: list[BatchItem]) -> list[BatchResult]:
+    results: dict[int, BatchResult] = {}
+    wanted = {it.assignment_id: it for it in items}
+
+    rows = (
+        db.session.query(CareAssignment, CareRequest)
+        .join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
+        .filter(CareAssignment.id.in_(wanted))
+        .all()
+    )
+    found = {a.id: (a, cr) for a, cr in rows}
+
+    candidates: list[tuple[datetime, datetime, CareAssignment, CareRequest]] = []
+    for aid, it in wanted.items():
+        a, cr = found.get(aid, (None, None))
+        if a is None or cr.owner_id != owner_id:
+            results[aid] = BatchResult(aid, False, "Not found.")
+            continue
+        if a.status != "pending":
+            results[aid] = BatchResult(aid, False, f"Not pending ({a.status}).")
+            continue
+        start = it.start_at or a.start_at
+        end = it.end_at or a.end_at
+        if end <= start:
+            results[aid] = BatchResult(aid, False, "End must be after start.")
+        elif not (cr.start_at <= start and end <= cr.end_at):
+            results[aid] = BatchResult(aid, False, "Outside the request window.")
+        else:
+            candidates.append((start, end, a, cr))
+
+    if candidates:
+        sitters = {a.sitter_id for _, _, a, _ in candidates}
+        pets = {a.pet_id for _, _, a, _ in candidates if a.pet_id}
+        lo = min(c[0] for c in candidates)
+        hi = max(c[1] for c in candidates)
+        active = db.session.query(
+            CareAssignment.id, CareAssignment.sitter_id, CareAssignment.pet_id,
+            CareAssignment.start_at, CareAssignment.end_at,
+        ).filter(
+            CareAssignment.status == "active",
+            or_(CareAssignment.sitter_id.in_(sitters), CareAssignment.pet_id.in_(pets)),
+            CareAssignment.start_at < hi,
+            CareAssignment.end_at > lo,
+        )
+        by_key: dict[tuple[str, int], list] = {}
+        for aid, sitter_id, pet_id, start, end in active:
+            by_key.setdefault(("sitter", sitter_id), []).append((start, end, aid))
+            if pet_id:
+                by_key.setdefault(("pet", pet_id), []).append((start, end, aid))
+        merged = {key: _Merged(iv) for key, iv in by_key.items()}
+
+        reach: dict[tuple[str, int], tuple[datetime, int]] = {}
+        for start, end, a, cr in sorted(candidates, key=lambda c: (c[0], c[2].id)):
+            keys = [("sitter", a.sitter_id)] + ([("pet", a.pet_id)] if a.pet_id else [])
+            conflict = None
+            for key in keys:
+                hit = merged[key].overlapping(start, end) if key in merged else None
+                if hit is None and key in reach and reach[key][0] > start:
+                    hit = reach[key][1]
+                if hit is not None:
+                    conflict = (key[0], hit)
+                    break
+            if conflict:
+                kind, other = conflict
+                results[a.id] = BatchResult(
+                    a.id, False, f"Conflicts with assignment #{other} ({kind}).", other
+                )
+                continue
+
+            for key in keys:
+                if key not in reach or reach[key][0] < end:
+                    reach[key] = (end, a.id)
+            before = rollup.of_assignment(a)
+            a.start_at, a.end_at, a.status = start, end, "active"
+            rollup.move(before, rollup.of_assignment(a))
+            if start == cr.start_at and end == cr.end_at and cr.status != "confirmed":
+                before = rollup.of_request(cr)
+                cr.status = "confirmed"
+                rollup.move(before, rollup.of_request(cr))
+                feed.publish_request(cr)
+            results[a.id] = BatchResult(a.id, True, "Approved.")
+
+    db.session.commit()
+    return [results[it.assignment_id] for it in items if it.assignment_id in results]
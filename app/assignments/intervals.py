@@ -0,0 +1,203 @@
+"""Overlap checks for care assignments, backed by an R*Tree on SQLite.
+
+``find_conflicts`` is the one way to ask "which assignments of this sitter (or
+pet) overlap [start, end)?". A B-tree can seek on the key and on one end of
+the interval only, so a sitter with a long history scans every assignment that
+started before ``end``. On SQLite the pending and active assignments are also
+mirrored into two R*Tree tables, ``sitter_intervals`` and ``pet_intervals``,
+with one box per assignment (key x [start, end] in epoch seconds). The query
+then fetches only the boxes that intersect and re-checks them against
+``care_assignments`` by primary key.
+
+Mapper events keep the trees in sync with ORM writes; core bulk inserts
+(seeding) call ``rebuild_intervals`` afterwards, and core status updates
+``drop_boxes``. On other databases ``find_conflicts`` uses the plain range
+predicate.
+"""
+from __future__ import annotations
+
+import math
+import typing
+from datetime import datetime
+
+from sqlalchemy import DDL, Integer, cast, column, delete, event, func, insert, inspect, select, table, text
+from sqlalchemy.engine import Connection, CursorResult
+from sqlalchemy.orm import aliased
+
+from ..extensions import db
+from ..models.assignment import CareAssignment
+
+INDEXED_STATUSES = ("pending", "active")
+_EPOCH = datetime(1970, 1, 1)
+
+sitter_intervals = table(
+    "sitter_intervals", column("id"), column("key_lo"), column("key_hi"), column("t_lo"), column("t_hi")
+)
+pet_intervals = table(
+    "pet_intervals", column("id"), column("key_lo"), column("key_hi"), column("t_lo"), column("t_hi")
+)
+_TREES = ((sitter_intervals, "sitter_id"), (pet_intervals, "pet_id"))
+
+RTREE_DDL = tuple(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {t.name} USING rtree(id, key_lo, key_hi, t_lo, t_hi)"
+    for t, _ in _TREES
+)
+RTREE_DROP = tuple(f"DROP TABLE IF EXISTS {t.name}" for t, _ in _TREES)
+
+for _stmt in RTREE_DDL:
+    event.listen(CareAssignment.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in RTREE_DROP:
+    event.listen(CareAssignment.__table__, "before_drop", DDL(_stmt).execute_if(dialect="sqlite"))
+
+def _lo(dt: datetime) -> int:
+    return math.floor((dt - _EPOCH).total_seconds())
+
+
+def _hi(dt: datetime) -> int:
+    return math.ceil((dt - _EPOCH).total_seconds())
+
+
+def _epoch(col):
+    return cast(func.strftime("%s", col), Integer)
+
+
+def find_conflicts(
+    start: datetime,
+    end: datetime,
+    *,
+    sitter_id: int | None = None,
+    pet_id: int | None = None,
+    statuses: tuple[str, ...] = ("active",),
+    exclude_id: int | None = None,
+):
+    """Query of the sitter's (or pet's) assignments in ``statuses`` overlapping [start, end)."""
+    if (sitter_id is None) == (pet_id is None):
+        raise ValueError("pass exactly one of sitter_id / pet_id")
+    tree, key_attr = _TREES[0] if sitter_id is not None else _TREES[1]
+    key = sitter_id if sitter_id is not None else pet_id
+    use_tree = db.engine.dialect.name == "sqlite" and set(statuses) <= set(INDEXED_STATUSES)
+    return _conflicts(start, end, key_attr, key, statuses, exclude_id, tree if use_tree else None)
+
+
+def _conflicts(start, end, key_attr, key, statuses, exclude_id, tree):
+    key_col = getattr(CareAssignment, key_attr)
+    status = CareAssignment.status
+    if tree is not None:
+        # ``|| ''`` keeps SQLite off ``ix_care_assignments_status_end``.
+        status = status + ""
+    q = CareAssignment.query.filter(
+        status.in_(statuses),
+        CareAssignment.start_at < end,
+        CareAssignment.end_at > start,
+    )
+    if exclude_id is not None:
+        q = q.filter(CareAssignment.id != exclude_id)
+    if tree is None:
+        return q.filter(key_col == key)
+
+    boxes = select(tree.c.id).where(
+        tree.c.key_lo <= key,
+        tree.c.key_hi >= key,
+        tree.c.t_lo <= _hi(end),
+        tree.c.t_hi >= _lo(start),
+    )
+    # ``+ 0`` keeps SQLite from seeking the B-tree on the key; the R*Tree
+    # boxes are the driving side and every candidate is a rowid lookup.
+    return q.filter(CareAssignment.id.in_(boxes), key_col + 0 == key)
+
+
+def active_conflict(key_attr: str, outer=CareAssignment):
+    """Correlated EXISTS: another active assignment of ``outer``'s sitter/pet overlaps it.
+
+    Meant as an extra column next to ``outer`` in a list query, so every row
+    gets its flag from the same statement.
+    """
+    other = aliased(CareAssignment)
+    key = getattr(outer, key_attr)
+    q = select(other.id).where(
+        other.status == "active",
+        other.id != outer.id,
+        other.start_at < outer.end_at,
+        other.end_at > outer.start_at,
+    )
+    if db.engine.dialect.name != "sqlite":
+        return q.where(getattr(other, key_attr) == key).exists()
+
+    tree = _TREES[0][0] if key_attr == "sitter_id" else _TREES[1][0]
+    boxes = select(tree.c.id).where(
+        tree.c.key_lo <= key,
+        tree.c.key_hi >= key,
+        tree.c.t_lo <= _epoch(outer.end_at) + 1,
+        tree.c.t_hi >= _epoch(outer.start_at),
+    ).correlate(outer)
+    return q.where(other.id.in_(boxes), getattr(other, key_attr) + 0 == key).exists()
+
+
+def _sync(connection: Connection, target: CareAssignment, fresh: bool = False, deleted: bool = False) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for tree, key_attr in _TREES:
+        if not fresh:
+            connection.execute(delete(tree).where(tree.c.id == target.id))
+        key = getattr(target, key_attr)
+        if deleted or key is None or target.status not in INDEXED_STATUSES:
+            continue
+        connection.execute(
+            insert(tree).values(
+                id=target.id,
+                key_lo=key,
+                key_hi=key,
+                t_lo=_lo(target.start_at),
+                t_hi=_hi(target.end_at),
+            )
+        )
+
+
+@event.listens_for(CareAssignment, "after_insert")
+def _after_insert(mapper, connection, target):
+    _sync(connection, target, fresh=True)
+
+
+@event.listens_for(CareAssignment, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(
+        state.attrs[name].history.has_changes()
+        for name in ("status", "start_at", "end_at", "sitter_id", "pet_id")
+    ):
+        _sync(connection, target)
+
+
+@event.listens_for(CareAssignment, "after_delete")
+def _after_delete(mapper, connection, target):
+    _sync(connection, target, deleted=True)
+
+
+def drop_boxes(ids: list[int]) -> None:
+    """Remove assignments leaving the indexed statuses through a Core update."""
+    if db.engine.dialect.name != "sqlite":
+        return
+    for tree, _ in _TREES:
+        db.session.execute(delete(tree).where(tree.c.id.in_(ids)))
+
+
+def rebuild_intervals() -> int:
+    """Refill both trees from ``care_assignments``; returns the number of boxes."""
+    if db.engine.dialect.name != "sqlite":
+        return 0
+    rows = 0
+    for tree, key_attr in _TREES:
+        db.session.execute(delete(tree))
+        result = db.session.execute(
+            text(
+                f"INSERT INTO {tree.name} (id, key_lo, key_hi, t_lo, t_hi) "
+                f"SELECT id, {key_attr}, {key_attr}, "
+                "CAST(strftime('%s', start_at) AS INTEGER), "
+                "CAST(strftime('%s', end_at) AS INTEGER) + 1 "
+                f"FROM care_assignments WHERE {key_attr} IS NOT NULL "
+                "AND status IN ('pending', 'active')"
+            )
+        )
+        rows += typing.cast(CursorResult, result).rowcount
+    db.session.commit()
+    return rows
@@ -6,9 +6,16 @@ from wtforms import SubmitField
 from wtforms.fields import DateTimeLocalField
 from wtforms.validators import DataRequired
 
+from ..analytics import rollup
 from ..extensions import db
+from ..instrumentation import query_budget
+from ..matching import feed
+from ..models.archive import CareAssignmentArchive, CareRequestArchive
 from ..models.assignment import CareAssignment
 from ..models.care import CareRequest
+from ..row_actions import row_action, submitted_action
+from .batch import BatchItem, approve_batch
+from .intervals import active_conflict, find_conflicts
 
 assignments_bp = Blueprint("assignments", __name__, template_folder="../templates")
 
@@ -20,44 +27,59 @@ class ApproveForm(FlaskForm):
     end_at = DateTimeLocalField(
         "End", format="%Y-%m-%dT%H:%M", validators=[DataRequired()]
     )
-    submit = SubmitField("Approve")
 
 
-class DeclineForm(FlaskForm):
-    submit = SubmitField("Decline")
+class BatchApproveForm(FlaskForm):
+    submit = SubmitField("Approve selected")
 
 
-@assignments_bp.route("/assignments", methods=["GET"])
-@login_required
-def list_assignments():
-
+def _assignment_lists(model, request_model):
+    """The user's assignments in ``model`` as (owner rows, sitter rows), newest first."""
+    options = (joinedload(model.pet), joinedload(model.sitter))
     owner_rows = (
-        db.session.query(CareAssignment)
-        .options(joinedload(CareAssignment.pet), joinedload(CareAssignment.sitter))
-        .join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
-        .filter(CareRequest.owner_id == current_user.id)
-        .order_by(CareAssignment.start_at.desc())
+        db.session.query(model)
+        .options(*options)
+        .join(request_model, request_model.id == model.care_request_id)
+        .filter(request_model.owner_id == current_user.id)
+        .order_by(model.start_at.desc())
         .all()
     )
 
     sitter_rows = (
-        CareAssignment.query.options(
-            joinedload(CareAssignment.pet), joinedload(CareAssignment.sitter)
-        )
+        model.query.options(*options)
         .filter_by(sitter_id=current_user.id)
-        .order_by(CareAssignment.start_at.desc())
+        .order_by(model.start_at.desc())
         .all()
     )
+    return owner_rows, sitter_rows
+
+
+@assignments_bp.route("/assignments", methods=["GET"])
+@login_required
+@query_budget(5)
+def list_assignments():
+    archived = request.args.get("archived") == "1"
+
+    owner_rows, sitter_rows = _assignment_lists(CareAssignment, CareRequest)
+    if archived:
+        old_owner, old_sitter = _assignment_lists(CareAssignmentArchive, CareRequestArchive)
+        owner_rows = sorted(owner_rows + old_owner, key=lambda a: a.start_at, reverse=True)
+        sitter_rows = sorted(sitter_rows + old_sitter, key=lambda a: a.start_at, reverse=True)
 
     return render_template(
-        "assignments_list.html", owner_rows=owner_rows, sitter_rows=sitter_rows
+        "assignments_list.html", owner_rows=owner_rows, sitter_rows=sitter_rows, archived=archived
     )
 
 @assignments_bp.route("/assignments/review", methods=["GET"])
 @login_required
+@query_budget(2)
 def review_list():
-    rows = (
-        db.session.query(CareAssignment)
+    result = (
+        db.session.query(
+            CareAssignment,
+            active_conflict("sitter_id").label("sitter_conflict"),
+            active_conflict("pet_id").label("pet_conflict"),
+        )
         .options(joinedload(CareAssignment.pet), joinedload(CareAssignment.sitter))
         .join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
         .filter(
@@ -66,20 +88,28 @@ def review_list():
         .order_by(CareAssignment.created_at.desc())
         .all()
     )
-
-    approve_forms = {}
-    decline_forms = {}
-    for a in rows:
-        f = ApproveForm(prefix=f"ap{a.id}")
-        f.start_at.data = a.start_at
-        f.end_at.data = a.end_at
-        approve_forms[a.id] = f
-        decline_forms[a.id] = DeclineForm(prefix=f"dc{a.id}")
+    rows = [a for a, _, _ in result]
+    conflicts = {
+        a.id: {"sitter": bool(sitter), "pet": bool(pet)} for a, sitter, pet in result
+    }
+
+    actions = {
+        a.id: {
+            "approve": row_action(
+                "assignments.approve_assignment", "approve", a.id, "Approve", assign_id=a.id
+            ),
+            "decline": row_action(
+                "assignments.decline_assignment", "decline", a.id, "Decline", assign_id=a.id
+            ),
+        }
+        for a in rows
+    }
     return render_template(
         "assignments_owner_review.html",
         rows=rows,
-        approve_forms=approve_forms,
-        decline_forms=decline_forms,
+        conflicts=conflicts,
+        actions=actions,
+        batch_form=BatchApproveForm(),
     )
 
 
@@ -92,8 +122,8 @@ def approve_assignment(assign_id):
         flash("Not allowed.", "danger")
         return redirect(url_for("assignments.review_list"))
 
-    form = ApproveForm(prefix=f"ap{a.id}")
-    if not form.validate_on_submit():
+    form = ApproveForm(prefix=f"ap{a.id}", meta={"csrf": False})
+    if not submitted_action(a.id, "approve") or not form.validate():
         flash("Invalid form.", "warning")
         return redirect(url_for("assignments.review_list"))
 
@@ -107,41 +137,68 @@ def approve_assignment(assign_id):
         flash("Approved time must be within the request window.", "warning")
         return redirect(url_for("assignments.review_list"))
 
-    conflict_sitter = CareAssignment.query.filter(
-        CareAssignment.id != a.id,
-        CareAssignment.sitter_id == a.sitter_id,
-        CareAssignment.status == "active",
-        CareAssignment.start_at < new_end,
-        CareAssignment.end_at > new_start,
+    conflict_sitter = find_conflicts(
+        new_start, new_end, sitter_id=a.sitter_id, exclude_id=a.id
     ).first()
 
     conflict_pet = None
     if a.pet_id:
-        conflict_pet = CareAssignment.query.filter(
-            CareAssignment.id != a.id,
-            CareAssignment.pet_id == a.pet_id,
-            CareAssignment.status == "active",
-            CareAssignment.start_at < new_end,
-            CareAssignment.end_at > new_start,
+        conflict_pet = find_conflicts(
+            new_start, new_end, pet_id=a.pet_id, exclude_id=a.id
         ).first()
 
     if conflict_sitter or conflict_pet:
         flash("Time conflicts with another active assignment.", "warning")
         return redirect(url_for("assignments.review_list"))
 
+    before = rollup.of_assignment(a)
     a.start_at = new_start
     a.end_at = new_end
     a.status = "active"
+    rollup.move(before, rollup.of_assignment(a))
     db.session.commit()
 
     if a.start_at == cr.start_at and a.end_at == cr.end_at:
+        before = rollup.of_request(cr)
         cr.status = "confirmed"
+        rollup.move(before, rollup.of_request(cr))
+        feed.publish_request(cr)
         db.session.commit()
 
     flash("Assignment approved.", "success")
     return redirect(url_for("assignments.list_assignments"))
 
 
+@assignments_bp.route("/assignments/approve-batch", methods=["POST"])
+@login_required
+def approve_batch_view():
+    form = BatchApproveForm()
+    if not form.validate_on_submit():
+        flash("Invalid form.", "warning")
+        return redirect(url_for("assignments.review_list"))
+
+    items = []
+    for raw in dict.fromkeys(request.form.getlist("ids")):
+        if not raw.isdigit():
+            continue
+        aid = int(raw)
+        times = ApproveForm(prefix=f"ap{aid}", meta={"csrf": False})
+        # Rows submitted without adjusted times keep the proposed window.
+        items.append(BatchItem(
+            aid,
+            times.start_at.data if times.start_at.validate(times) else None,
+            times.end_at.data if times.end_at.validate(times) else None,
+        ))
+    if not items:
+        flash("Select at least one application.", "info")
+        return redirect(url_for("assignments.review_list"))
+
+    results = approve_batch(current_user.id, items)
+    approved = sum(r.ok for r in results)
+    flash(f"Approved {approved} of {len(results)}.", "success" if approved else "warning")
+    return render_template("assignments_batch_result.html", results=results)
+
+
 @assignments_bp.route("/assignments/<int:assign_id>/decline", methods=["POST"])
 @login_required
 def decline_assignment(assign_id):
@@ -151,12 +208,13 @@ def decline_assignment(assign_id):
         flash("Not allowed.", "danger")
         return redirect(url_for("assignments.review_list"))
 
-    form = DeclineForm(prefix=f"dc{a.id}")
-    if not form.validate_on_submit():
+    if not submitted_action(a.id, "decline"):
         flash("Invalid form.", "warning")
         return redirect(url_for("assignments.review_list"))
 
+    before = rollup.of_assignment(a)
     a.status = "declined"
+    rollup.move(before, rollup.of_assignment(a))
     db.session.commit()
     flash("Application declined.", "info")
     return redirect(url_for("assignments.review_list"))
@@ -174,7 +232,9 @@ def cancel_assignment(assign_id):
         flash("Assignment is not active.", "info")
         return redirect(url_for("assignments.list_assignments"))
 
+    before = rollup.of_assignment(a)
     a.status = "cancelled"
+    rollup.move(before, rollup.of_assignment(a))
     db.session.commit()
     flash("Assignment cancelled.", "info")
     return redirect(url_for("assignments.list_assignments"))
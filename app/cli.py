@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-import random
+import json
+import time
+from dataclasses import asdict
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import click
 from flask import current_app
+from flask.cli import ScriptInfo, pass_script_info
 from sqlalchemy import text
 
 from .extensions import db
@@ -14,6 +18,16 @@ from .models.pet import Pet
 from .models.care import CareRequest
 from .models.assignment import CareAssignment
 from .models.social import Friendship
+from .models.analytics import AnalyticsMonthly
+from .models.feed import SitterFeed
+from .models.stats import UserStats
+from .models.archive import CareAssignmentArchive, CareRequestArchive
+from . import archive, lifecycle, transfer, user_stats
+from .analytics import rollup
+from .assignments.intervals import rebuild_intervals
+from .matching.feed import check_feeds, publish_request, rebuild_feeds
+from .seeding import SeedSpec, seed_bulk
+from .startup_profile import profile_startup
 
 
 def _db_uri() -> str:
@@ -40,12 +54,18 @@ def reset_db_cmd(force: bool):
 
 @click.command("purge-data")
 def purge_data_cmd():
+    db.session.query(SitterFeed).delete()
+    db.session.query(AnalyticsMonthly).delete()
+    db.session.query(UserStats).delete()
+    db.session.query(CareAssignmentArchive).delete()
+    db.session.query(CareRequestArchive).delete()
     db.session.query(CareAssignment).delete()
     db.session.query(CareRequest).delete()
     db.session.query(Pet).delete()
     db.session.query(Friendship).delete()
     db.session.query(User).delete()
     db.session.commit()
+    rebuild_intervals()
     try:
         db.session.execute(text("DELETE FROM sqlite_sequence"))
         db.session.commit()
@@ -83,211 +103,35 @@ def seed_demo_cmd():
         status="open",
     )
     db.session.add(cr)
+    rollup.move(None, rollup.of_request(cr))
+    publish_request(cr)
     db.session.commit()
 
     click.echo("✔ Seed done. Users: demo@paw.com / sitter@paw.com (парола: demo)")
 
-FIRST_NAMES = [
-    "Alex", "Mira", "Daniel", "Eva", "Ivo", "Nina", "Chris", "Maria", "Petar", "Georgi",
-    "Viktor", "Sofia", "Ani", "Stoyan", "Kalina", "Toma", "Raya", "Mila", "Rumen", "Teo",
-]
-LAST_NAMES = [
-    "Petrov", "Georgieva", "Ivanov", "Dimitrova", "Nikolov", "Stoyanova", "Kolev",
-    "Marinova", "Kostov", "Hristova", "Vasilev", "Todorova", "Alexandrov", "Ilieva",
-]
-
-SPECIES_BREEDS = {
-    "Cat": ["Domestic Shorthair", "British Shorthair", "Siamese", "Maine Coon", "Mix"],
-    "Dog": ["Labrador", "German Shepherd", "Golden Retriever", "Bulldog", "Poodle", "Mix"],
-    "Bird": ["Budgerigar", "Cockatiel", "Canary", "Lovebird", "Parrot"],
-    "Hamster": ["Syrian", "Dwarf Campbell", "Winter White", "Chinese", "Roborovski"],
-    "Rabbit": ["Holland Lop", "Mini Lop", "Netherland Dwarf", "Lionhead", "Mix"],
-}
-
-def _rand_name() -> str:
-    return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
-
-
-def _rand_email(i: int) -> str:
-    return f"user{i:03d}@paw.com"
-
-def _rand_pet(owner_id: int) -> Pet:
-    species = random.choice(list(SPECIES_BREEDS.keys()))
-    breed = random.choice(SPECIES_BREEDS[species])
-    age = random.randint(1, 14)
-    name = random.choice(
-        ["Maca", "Rex", "Bobi", "Luna", "Simba", "Molly", "Kaya", "Pufi", "Rocky", "Tara", "Miro", "Sisi"]
-    )
-    p = Pet(owner_id=owner_id, name=name, species=species, breed=breed, age=age)
-    db.session.add(p)
-    return p
-
-def _ensure_friendship(a_id: int, b_id: int, status: str = "accepted") -> None:
-    if a_id == b_id:
-        return
-    exists = Friendship.query.filter(
-        db.or_(
-            db.and_(Friendship.requester_id == a_id, Friendship.addressee_id == b_id),
-            db.and_(Friendship.requester_id == b_id, Friendship.addressee_id == a_id),
-        )
-    ).first()
-    if exists:
-        return
-    f = Friendship(requester_id=a_id, addressee_id=b_id, status=status)
-    db.session.add(f)
-
-def _make_assignment_for_request(
-    req: CareRequest, sitter_id: int, mode: str, now: datetime
-) -> CareAssignment:
-    if mode == "assigned":
-        start = req.start_at
-        end = req.end_at
-        status = "pending"
-    elif mode == "active":
-        start = now - timedelta(hours=random.randint(1, 6))
-        end = now + timedelta(hours=random.randint(2, 12))
-        req.start_at = start
-        req.end_at = end
-        status = "active"
-    else:
-        duration_h = random.randint(2, 24)
-        end = now - timedelta(days=random.randint(1, 20), hours=random.randint(0, 12))
-        start = end - timedelta(hours=duration_h)
-        status = "done"
-
-    a = CareAssignment(
-        care_request_id=req.id,
-        sitter_id=sitter_id,
-        start_at=start,
-        end_at=end,
-        status=status,
-        sitter_note=random.choice(
-            ["Happy to help!", "Evening walks OK.", "Can do meds.", "Near the owner.", "Flexible hours."]
-        ),
-    )
-    db.session.add(a)
-    return a
-
 def _seed_bulk(
     users: int,
     pets_per_owner_min: int,
     pets_per_owner_max: int,
     reqs_per_pet_min: int,
     reqs_per_pet_max: int,
+    chunk_size: int = 10_000,
+    workers: int = 1,
+    seed: int = 42,
 ) -> None:
-    random.seed(42)
     uri = _db_uri()
+    if workers > 1 and not uri.startswith("sqlite:"):
+        raise click.UsageError("--workers needs a SQLite database (shards are merged with ATTACH).")
     click.echo(f"Seeding on DB: {uri}")
-
-    now = datetime.utcnow()
-
-    all_users: list[User] = []
-    for i in range(users):
-        role_pick = random.random()
-        is_owner = role_pick < 0.4 or (0.7 <= role_pick <= 1.0) 
-        is_sitter = role_pick > 0.3                             
-        u = User(email=_rand_email(i), name=_rand_name(), is_owner=is_owner, is_sitter=is_sitter)
-        if hasattr(u, "set_password"):
-            u.set_password("demo")
-        db.session.add(u)
-        all_users.append(u)
-    db.session.commit()
-
-    owners = [u for u in all_users if u.is_owner]
-    sitters = [u for u in all_users if u.is_sitter]
-    click.echo(f"Users: total={len(all_users)} owners={len(owners)} sitters={len(sitters)}")
-
-    for o in owners:
-        candidates = random.sample(sitters, k=min(4, len(sitters))) if sitters else []
-        for s in candidates[:3]:
-            _ensure_friendship(o.id, s.id, status="accepted")
-        if len(candidates) >= 4:
-            _ensure_friendship(o.id, candidates[3].id, status="pending")
-    db.session.commit()
-
-    pets: list[Pet] = []
-    for o in owners:
-        k = random.randint(pets_per_owner_min, pets_per_owner_max)
-        for _ in range(k):
-            p = _rand_pet(o.id)
-            pets.append(p)
-    db.session.commit()
-    click.echo(f"Pets: total={len(pets)}")
-
-    total_reqs = 0
-    total_asg = 0
-    status_weights = [
-        ("open", 0.30),
-        ("assigned", 0.20),
-        ("active", 0.20),
-        ("done", 0.25),
-        ("cancelled", 0.05),
-    ]
-
-    def pick_status() -> str:
-        r = random.random()
-        acc = 0.0
-        for label, w in status_weights:
-            acc += w
-            if r <= acc:
-                return label
-        return "open"
-
-    for p in pets:
-        rels = Friendship.query.filter(
-            db.and_(
-                Friendship.status == "accepted",
-                db.or_(
-                    Friendship.requester_id == p.owner_id,
-                    Friendship.addressee_id == p.owner_id,
-                ),
-            )
-        ).all()
-        friend_ids = [
-            (r.addressee_id if r.requester_id == p.owner_id else r.requester_id) for r in rels
-        ]
-        friend_sitters = [u for u in all_users if u.id in friend_ids and u.is_sitter]
-
-        k = random.randint(reqs_per_pet_min, reqs_per_pet_max)
-        for _ in range(k):
-            days_offset = random.randint(-40, 40)
-            start = now + timedelta(days=days_offset, hours=random.randint(7, 19))
-            end = start + timedelta(hours=random.randint(2, 36))
-            st = pick_status()
-
-            req = CareRequest(
-                owner_id=p.owner_id,
-                pet_id=p.id,
-                start_at=start,
-                end_at=end,
-                status=st,
-            )
-            db.session.add(req)
-            db.session.flush()  
-
-            if friend_sitters and st in {"assigned", "active", "done"}:
-                sitter = random.choice(friend_sitters)
-                _make_assignment_for_request(req, sitter.id, mode=st, now=now)
-                total_asg += 1
-
-            total_reqs += 1
-
-    db.session.commit()
-    click.echo(f"CareRequests: total={total_reqs}")
-    click.echo(f"Assignments: total={total_asg}")
-
-    open_reqs = CareRequest.query.filter_by(status="open").count()
-    active_asg = CareAssignment.query.filter_by(status="active").count()
-    done_asg = CareAssignment.query.filter_by(status="done").count()
-    pending_asg = CareAssignment.query.filter_by(status="pending").count()
-
-    click.echo(
-        "✔ Seed completed:\n"
-        f"  Users: {len(all_users)}\n"
-        f"  Pets: {len(pets)}\n"
-        f"  Requests: {total_reqs} (open: {open_reqs})\n"
-        f"  Assignments: {total_asg} (pending: {pending_asg}, active: {active_asg}, done: {done_asg})"
+    spec = SeedSpec(
+        users=users,
+        pets_per_owner_min=pets_per_owner_min,
+        pets_per_owner_max=pets_per_owner_max,
+        reqs_per_pet_min=reqs_per_pet_min,
+        reqs_per_pet_max=reqs_per_pet_max,
+        seed=seed,
     )
+    seed_bulk(spec, chunk_size=chunk_size, workers=workers)
 
 @click.command("seed-small")
 @click.option("--users", default=20, show_default=True, help="Общ брой потребители.")
@@ -310,11 +154,217 @@ def seed_small_cmd(
 @click.option("--pets-per-owner-max", default=3, show_default=True, help="Макс. брой pets на owner.")
 @click.option("--reqs-per-pet-min", default=2, show_default=True, help="Мин. заявки за pet.")
 @click.option("--reqs-per-pet-max", default=5, show_default=True, help="Макс. заявки за pet.")
+@click.option("--chunk-size", default=10_000, show_default=True, help="Редове на INSERT/commit.")
+@click.option("--workers", default=1, show_default=True, help="Процеси за паралелно генериране (SQLite).")
+@click.option("--seed", default=42, show_default=True, help="Seed; резултатът не зависи от --workers.")
 def seed_big_cmd(
     users: int,
     pets_per_owner_min: int,
     pets_per_owner_max: int,
     reqs_per_pet_min: int,
     reqs_per_pet_max: int,
+    chunk_size: int,
+    workers: int,
+    seed: int,
 ):
-    _seed_bulk(users, pets_per_owner_min, pets_per_owner_max, reqs_per_pet_min, reqs_per_pet_max)
\ No newline at end of file
+    _seed_bulk(
+        users,
+        pets_per_owner_min,
+        pets_per_owner_max,
+        reqs_per_pet_min,
+        reqs_per_pet_max,
+        chunk_size=chunk_size,
+        workers=workers,
+        seed=seed,
+    )
+
+
+@click.command("loadtest")
+@click.option("--clients", default=8, show_default=True, help="Паралелни клиенти (нишки).")
+@click.option("--duration", default=30.0, show_default=True, help="Продължителност в секунди.")
+@click.option("--users", default=50, show_default=True, help="Брой seed-нати акаунти за логин.")
+@click.option("--mix", default=None, help="Тегла, напр. dashboard=30,open_requests=25,apply=10.")
+@click.option("--busy-threshold-ms", default=50.0, show_default=True, help="Запис над този праг = busy wait.")
+@click.option("--seed", default=42, show_default=True, help="Seed за избора на действия.")
+@pass_script_info
+def loadtest_cmd(info: ScriptInfo, clients: int, duration: float, users: int, mix: str | None,
+                 busy_threshold_ms: float, seed: int):
+    from .loadtest import parse_mix, run_loadtest
+
+    # The served app itself, not the ``current_app`` proxy: requests run in other threads.
+    run_loadtest(
+        info.load_app(),
+        clients=clients,
+        duration=duration,
+        users=users,
+        mix=parse_mix(mix),
+        busy_threshold_ms=busy_threshold_ms,
+        seed=seed,
+    )
+
+
+@click.command("rebuild-feeds")
+def rebuild_feeds_cmd():
+    click.echo(f"Rebuilding sitter_feed on DB: {_db_uri()}")
+    rows = rebuild_feeds()
+    click.echo(f"✔ sitter_feed rebuilt: {rows:,} rows.")
+
+
+@click.command("check-feeds")
+@click.option("--limit", default=20, show_default=True, help="Макс. показани разлики от всеки вид.")
+def check_feeds_cmd(limit: int):
+    drift = check_feeds(limit=limit)
+    if drift.ok:
+        click.echo("✔ sitter_feed matches friendships x open requests.")
+        return
+    for label, rows in (("missing", drift.missing), ("stale", drift.stale)):
+        for sitter_id, req_id, owner_id, start_at in rows:
+            click.echo(f"  {label:<8} sitter={sitter_id} request={req_id} owner={owner_id} start={start_at}")
+    click.echo(f"✘ sitter_feed drift: {len(drift.missing)} missing, {len(drift.stale)} stale "
+               f"(showing up to {limit} each). Run `flask rebuild-feeds`.")
+    raise SystemExit(1)
+
+
+@click.command("rollup-backfill")
+@click.option("--since", metavar="YYYY-MM", help="Преизчисли месеците от този нататък.")
+@click.option("--full", is_flag=True, help="Преизчисли всички месеци.")
+def rollup_backfill_cmd(since: str | None, full: bool):
+    if since:
+        try:
+            datetime.strptime(since, "%Y-%m")
+        except ValueError as exc:
+            raise click.BadParameter("expected YYYY-MM", param_hint="--since") from exc
+    elif not full and db.session.query(AnalyticsMonthly).first() is not None:
+        # Closed months stay as they are; only the current one is refreshed.
+        since = rollup.current_month()
+    label = f"from {since}" if since else "all months"
+    click.echo(f"Rebuilding analytics_monthly ({label}) on DB: {_db_uri()}")
+    rows = rollup.backfill(since)
+    click.echo(f"✔ analytics_monthly rebuilt: {rows:,} rows.")
+
+
+@click.command("stats-verify")
+@click.option("--repair", is_flag=True, help="Преизчисли user_stats при разминаване.")
+@click.option("--limit", default=20, show_default=True, help="Макс. показани разминавания.")
+def stats_verify_cmd(repair: bool, limit: int):
+    drift = user_stats.verify(limit=limit)
+    if drift.ok:
+        click.echo("✔ user_stats matches the base tables.")
+        return
+    for user_id, counter, stored, actual in drift.rows:
+        click.echo(f"  user={user_id} {counter:<19} stored={stored} actual={actual}")
+    click.echo(f"✘ user_stats drift: {drift.total:,} users (showing up to {limit}).")
+    if not repair:
+        click.echo("Run `flask stats-verify --repair`.")
+        raise SystemExit(1)
+    rows = user_stats.rebuild()
+    click.echo(f"✔ user_stats rebuilt: {rows:,} rows.")
+
+
+@click.group("lifecycle")
+def lifecycle_cmd():
+    """Time-driven status transitions (active -> done, open -> expired)."""
+
+
+@lifecycle_cmd.command("run")
+@click.option("--interval", default=30.0, show_default=True, help="Секунди между тиковете.")
+@click.option("--chunk-size", default=500, show_default=True, help="Редове на UPDATE/commit.")
+@click.option("--max-chunks", default=20, show_default=True, help="Макс. chunks на преход за един тик.")
+@click.option("--once", is_flag=True, help="Само един тик.")
+def lifecycle_run_cmd(interval: float, chunk_size: int, max_chunks: int, once: bool):
+    click.echo(f"Lifecycle worker on DB: {_db_uri()} (every {interval:g}s, "
+               f"{chunk_size:,} rows x {max_chunks} chunks per transition)")
+    total, seconds = 0, 0.0
+    try:
+        while True:
+            result = lifecycle.tick(chunk_size=chunk_size, max_chunks=max_chunks)
+            total += result.total
+            seconds += result.seconds
+            if result.total or once:
+                moved = ", ".join(f"{name}={n:,}" for name, n in result.counts.items())
+                click.echo(f"  tick: {moved} in {result.seconds * 1000:.1f}ms, {result.chunks} chunks "
+                           f"({result.rate:,.0f} transitions/s){' [backlog]' if result.backlog else ''}")
+            if once:
+                break
+            # A backlog is drained tick after tick; each chunk commits on its own.
+            time.sleep(0 if result.backlog else interval)
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"✔ {total:,} transitions in {seconds:.2f}s of work "
+               f"({total / seconds if seconds else 0:,.0f} transitions/s).")
+
+
+@click.command("archive")
+@click.option("--older-than", "older_than", default="180d", show_default=True,
+              help="Минимална възраст (край на заявката): 180d, 26w, 72h.")
+@click.option("--chunk-size", default=500, show_default=True, help="Заявки на транзакция.")
+@click.option("--pause", default=0.0, show_default=True, help="Секунди пауза между транзакциите.")
+def archive_cmd(older_than: str, chunk_size: int, pause: float):
+    try:
+        age = archive.parse_age(older_than)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--older-than") from e
+    click.echo(f"Archiving finished requests older than {older_than} on DB: {_db_uri()}")
+    result = archive.archive(age, chunk_size=chunk_size, pause=pause)
+    click.echo(f"  cutoff: end_at < {result.cutoff:%Y-%m-%d %H:%M}")
+    click.echo(f"  {'care_requests':<18} {result.requests:>10,}")
+    click.echo(f"  {'care_assignments':<18} {result.assignments:>10,}")
+    click.echo(f"✔ {result.requests + result.assignments:,} rows archived in {result.chunks} chunks, "
+               f"{result.seconds:.2f}s ({result.rate:,.0f} rows/s, "
+               f"longest transaction {result.max_chunk_seconds * 1000:.1f}ms).")
+
+
+def _transfer_report(result) -> None:
+    for t in result.tables:
+        click.echo(f"  {t.name:<24} {t.rows:>10,} rows in {t.seconds:7.2f}s "
+                   f"({t.rate:,.0f} rows/s, {t.bytes / 1e6:,.1f} MB gz)")
+
+
+@click.command("export")
+@click.argument("directory", type=click.Path(file_okay=False))
+@click.option("--format", "fmt", type=click.Choice(transfer.FORMATS), default="ndjson",
+              show_default=True, help="Формат на файловете (gzip).")
+@click.option("--chunk-size", default=5000, show_default=True, help="Редове на fetch (yield_per).")
+def export_cmd(directory: str, fmt: str, chunk_size: int):
+    click.echo(f"Exporting DB {_db_uri()} to {directory} ({fmt}.gz)")
+    result = transfer.export_tables(directory, fmt=fmt, chunk_size=chunk_size)
+    _transfer_report(result)
+    click.echo(f"✔ {result.rows:,} rows exported in {result.seconds:.2f}s, "
+               f"one snapshot as of {result.snapshot_at:%Y-%m-%d %H:%M:%S} UTC.")
+
+
+@click.command("import")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--chunk-size", default=5000, show_default=True, help="Редове на INSERT/commit.")
+def import_cmd(directory: str, chunk_size: int):
+    click.echo(f"Importing {directory} into DB {_db_uri()}")
+    try:
+        result = transfer.import_tables(directory, chunk_size=chunk_size)
+    except (ValueError, FileNotFoundError) as e:
+        raise click.ClickException(str(e)) from e
+    _transfer_report(result)
+    click.echo(f"✔ {result.rows:,} rows imported, derived tables rebuilt, in {result.seconds:.2f}s.")
+
+
+@click.command("startup-profile")
+@click.option("--mode", type=click.Choice(["web", "cli"]), default="web", show_default=True,
+              help="web: worker с всички blueprints; cli: команда без страници (FAST_STARTUP=1).")
+@click.option("--top", default=25, show_default=True, help="Брой показани модули.")
+@click.option("--sort", "sort_key", type=click.Choice(["cumulative", "self"]), default="cumulative",
+              show_default=True, help="Подреждане по собствено или кумулативно време.")
+@click.option("--out", type=click.Path(dir_okay=False), help="Запиши JSON отчет тук.")
+def startup_profile_cmd(mode: str, top: int, sort_key: str, out: str | None):
+    profile = profile_startup(mode)
+    click.echo(f"create_app() [{mode}]: {profile.total_ms:,.1f} ms, {len(profile.modules):,} modules imported")
+    click.echo(f"{'self ms':>9} {'cum ms':>9}  module")
+    for m in profile.top(top, sort_key):
+        click.echo(f"{m.self_ms:>9.1f} {m.cumulative_ms:>9.1f}  {'  ' * m.depth}{m.module}")
+    if out:
+        report = {
+            "mode": profile.mode,
+            "total_ms": profile.total_ms,
+            "modules": [asdict(m) for m in profile.modules],
+        }
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        Path(out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        click.echo(f"wrote {out}")
@@ -0,0 +1,157 @@
+"""Dashboard numbers and recent requests, cached per user in process.
+
+A miss costs two statements: the user's ``user_stats`` row (a primary-key
+lookup, with the count of their ``sitter_feed`` rows and of their running
+sitter assignments as scalar subqueries), and the five latest requests joined
+to their pets. The result is kept with the ``data_version`` it was read at;
+since every write the dashboard shows bumps that counter
+(``app.data_version``) and the user row is loaded for the request anyway, a
+repeat view issues no statement of its own.
+
+``user_stats.active_assignments`` still counts an assignment whose ``end_at``
+has passed until the lifecycle worker marks it done, so the dashboard counts
+running ones itself. Entries expire when the first of them ends and after
+``DASHBOARD_CACHE_TTL`` seconds.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from flask import Flask, current_app
+from sqlalchemy import func, select
+
+from .extensions import db
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+from .models.feed import SitterFeed
+from .models.pet import Pet
+from .models.stats import UserStats
+from .models.user import User
+
+RECENT_REQUESTS = 5
+
+# Dashboard key -> user_stats column.
+_STATS = (
+    ("pets", "pets"),
+    ("open_requests", "open_requests"),
+    ("pending_approvals", "pending_approvals"),
+)
+
+
+@dataclass(frozen=True)
+class RecentRequest:
+    id: int
+    pet_name: str | None
+    start_at: datetime
+    end_at: datetime
+    status: str
+
+
+@dataclass(frozen=True)
+class Dashboard:
+    stats: dict[str, int]
+    recent: list[RecentRequest]
+    expires: float  # time.monotonic() deadline
+
+
+def _stats_statement(user_id: int, now: datetime):
+    running = select(CareAssignment.end_at).where(
+        CareAssignment.sitter_id == user_id,
+        CareAssignment.status == "active",
+        CareAssignment.end_at >= now,
+    ).subquery()
+    feed = (
+        select(func.count())
+        .select_from(SitterFeed)
+        .where(SitterFeed.sitter_id == user_id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            *(func.coalesce(getattr(UserStats, c), 0).label(label) for label, c in _STATS),
+            feed.label("friends_open_reqs"),
+            select(func.count()).select_from(running).scalar_subquery().label("sitter_assignments"),
+            select(func.min(running.c.end_at)).scalar_subquery().label("next_end"),
+        )
+        .select_from(User)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id == user_id)
+    )
+
+
+def _load(user_id: int, ttl: float) -> Dashboard:
+    now = datetime.utcnow()
+    row = db.session.execute(_stats_statement(user_id, now)).one()._asdict()
+    next_end = row.pop("next_end")
+    recent = [
+        RecentRequest(r.id, r.name, r.start_at, r.end_at, r.status)
+        for r in db.session.execute(
+            select(CareRequest.id, Pet.name, CareRequest.start_at, CareRequest.end_at,
+                   CareRequest.status)
+            .outerjoin(Pet, Pet.id == CareRequest.pet_id)
+            .where(CareRequest.owner_id == user_id)
+            .order_by(CareRequest.start_at.desc())
+            .limit(RECENT_REQUESTS)
+        )
+    ]
+    expires = time.monotonic() + ttl
+    if next_end is not None:
+        expires = min(expires, time.monotonic() + max((next_end - now).total_seconds(), 0.0))
+    return Dashboard(stats=row, recent=recent, expires=expires)
+
+
+class DashboardCache:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[int, tuple[int, Dashboard]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, version: int) -> Dashboard:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] == version and entry[1].expires > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        dash = _load(user_id, self.ttl)
+
+        with self._lock:
+            # Versions only grow; never replace a newer entry with this one.
+            current = self._data.get(user_id)
+            if current is None or current[0] <= version:
+                self._data[user_id] = (version, dash)
+                self._data.move_to_end(user_id)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return dash
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def init_app(app: Flask) -> None:
+    app.extensions["dashboard_cache"] = DashboardCache(
+        maxsize=app.config["DASHBOARD_CACHE_SIZE"], ttl=app.config["DASHBOARD_CACHE_TTL"]
+    )
+
+
+def dashboard_cache() -> DashboardCache:
+    return current_app.extensions["dashboard_cache"]
+
+
+def load(user) -> Dashboard:
+    return dashboard_cache().get(user.id, user.data_version)
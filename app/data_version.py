@@ -0,0 +1,89 @@
+"""Upkeep of ``users.data_version``, the per-user key of caches and ETags.
+
+Every flush that touches something a user's dashboard or analytics show
+bumps that user's counter in the same transaction:
+
+* a pet of the user;
+* a care request of the user, and for the owner's accepted friends too when
+  the request is added, removed or changes status (their count of friends'
+  open requests moves);
+* an assignment where the user is the sitter or owns the request;
+* a friendship of the user.
+
+The bumps of one flush go out as a single ``UPDATE users``. Core writes
+don't flush ORM objects: bulk ones (seeding, ``rollup.backfill``) bump every
+user, set-based status transitions (``app.lifecycle``) run ``bump_statement``.
+"""
+from __future__ import annotations
+
+from sqlalchemy import event, inspect, select, union, update
+from sqlalchemy.orm import Session
+
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+from .models.pet import Pet
+from .models.social import Friendship
+from .models.user import User
+
+
+def _status_changed(obj) -> bool:
+    return inspect(obj).attrs.status.history.has_changes()
+
+
+def bump_statement(users=(), requests=(), friends_of=()):
+    """Bump ``users``, the owners of ``requests`` and the friends of ``friends_of``.
+
+    Returns the ``UPDATE users``, or None when there is nobody to bump.
+    """
+    users = {u for u in users if u is not None}
+    requests = {r for r in requests if r is not None}
+    friends_of = {u for u in friends_of if u is not None}
+    ids = []
+    if users:
+        ids.append(select(User.id).where(User.id.in_(users)))
+    if requests:
+        ids.append(select(CareRequest.owner_id).where(CareRequest.id.in_(requests)))
+    if friends_of:
+        accepted = Friendship.status == "accepted"
+        ids.append(select(Friendship.addressee_id).where(
+            accepted, Friendship.requester_id.in_(friends_of)
+        ))
+        ids.append(select(Friendship.requester_id).where(
+            accepted, Friendship.addressee_id.in_(friends_of)
+        ))
+    if not ids:
+        return None
+    # One IN over a UNION: SQLite would scan ``users`` for an OR of INs.
+    users_t = User.__table__
+    return (
+        update(users_t)
+        .where(users_t.c.id.in_(union(*ids) if len(ids) > 1 else ids[0]))
+        .values(data_version=users_t.c.data_version + 1)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session: Session, _flush_context) -> None:
+    users: set = set()
+    requests: set = set()
+    friends_of: set = set()
+    changed = [(obj, "new") for obj in session.new]
+    changed += [(obj, "deleted") for obj in session.deleted]
+    changed += [
+        (obj, "dirty") for obj in session.dirty if session.is_modified(obj, include_collections=False)
+    ]
+    for obj, change in changed:
+        if isinstance(obj, Pet):
+            users.add(obj.owner_id)
+        elif isinstance(obj, CareRequest):
+            users.add(obj.owner_id)
+            if change != "dirty" or _status_changed(obj):
+                friends_of.add(obj.owner_id)
+        elif isinstance(obj, CareAssignment):
+            users.add(obj.sitter_id)
+            requests.add(obj.care_request_id)
+        elif isinstance(obj, Friendship):
+            users.update((obj.requester_id, obj.addressee_id))
+    stmt = bump_statement(users, requests, friends_of)
+    if stmt is not None:
+        session.connection().execute(stmt)
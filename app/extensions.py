@@ -1,9 +1,43 @@
+from __future__ import annotations
+
+import click
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
 
+
+class LazyMigrate:
+    """Flask-Migrate without importing Alembic at startup.
+
+    ``init_app`` only adds a ``db`` command group; Flask-Migrate (and with it
+    Alembic, the most expensive import of the app) is loaded and initialised
+    when one of its subcommands is looked up. Web workers never pay for it.
+    """
+
+    def init_app(self, app, db) -> None:
+        app.cli.add_command(_MigrateGroup(app, db))
+
+
+class _MigrateGroup(click.Group):
+    def __init__(self, app, db) -> None:
+        super().__init__("db", help="Perform database migrations.")
+        self._app = app
+        self._db = db
+
+    def _commands(self) -> click.Group:
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as group
+
+        if "migrate" not in self._app.extensions:
+            Migrate(self._app, self._db)
+        return group
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Hand the invocation to Flask-Migrate's own group (and its options).
+        return self._commands().make_context(info_name, args, parent=parent, **extra)
+
+
 db: SQLAlchemy = SQLAlchemy()
-migrate: Migrate = Migrate()
+migrate: LazyMigrate = LazyMigrate()
 login_manager = LoginManager()
-csrf: CSRFProtect = CSRFProtect()
\ No newline at end of file
+csrf: CSRFProtect = CSRFProtect()
@@ -0,0 +1,210 @@
+"""Opt-in per-request SQL instrumentation.
+
+Enabled with ``SQL_INSTRUMENTATION``. Every request gets a ``Server-Timing``
+header with its statement count and total DB time, and statements slower than
+``SLOW_QUERY_MS`` are written together with their endpoint to a rotating log.
+
+On top of that, lazy relationship loads are recorded per request and grouped
+by relationship (``SQL_LAZY_LOADS = "log" | "raise"``), and views decorated
+with :func:`query_budget` are checked against their declared statement limit
+(``SQL_QUERY_BUDGETS = "log" | "raise"``).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import cast
+
+from flask import Flask, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, RelationshipProperty, Session, configure_mappers
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BindParameter, ClauseElement
+
+from .extensions import db
+
+SLOW_LOGGER = "app.sql.slow"
+
+
+class LazyLoadError(RuntimeError):
+    """A relationship was lazily loaded more often than ``SQL_LAZY_LOAD_LIMIT``."""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A view issued more statements than its :func:`query_budget`."""
+
+
+def query_budget(max_queries: int):
+    """Declare the maximum number of SQL statements a view may issue."""
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def query_budgets(app: Flask) -> dict[str, int]:
+    """Endpoint -> declared budget for every view registered on ``app``."""
+    return {
+        endpoint: view.query_budget
+        for endpoint, view in app.view_functions.items()
+        if hasattr(view, "query_budget")
+    }
+
+
+@lru_cache(maxsize=None)
+def _dynamic_relationships() -> dict[str, str]:
+    """Bind key of the parent criteria -> name, for every ``lazy="dynamic"`` relationship.
+
+    A dynamic relationship builds an ordinary SELECT, so it never shows up as a
+    relationship load. Its WHERE is a copy of the relationship's own lazy
+    clause, though, whose bind parameters keep their keys and get the parent's
+    value through a callable; an explicit filter on the same columns has
+    neither.
+    """
+    configure_mappers()
+    found = {}
+    for mapper in cast(type[DeclarativeBase], db.Model).registry.mappers:
+        for prop in mapper.relationships:
+            if prop.lazy == "dynamic":
+                for key in prop._lazy_strategy._bind_to_col:
+                    found[key] = f"{mapper.class_.__name__}.{prop.key}"
+    return found
+
+
+def _lazy_relationship(state: ORMExecuteState) -> str | None:
+    if state.is_relationship_load:
+        path = state.loader_strategy_path
+        prop = path[-1] if path else None
+        if isinstance(prop, RelationshipProperty):
+            return f"{prop.parent.class_.__name__}.{prop.key}"
+        return None
+    if not state.is_select:
+        return None
+    dynamic = _dynamic_relationships()
+    for el in visitors.iterate(cast(ClauseElement, state.statement)):
+        if isinstance(el, BindParameter) and el.callable is not None:
+            name = dynamic.get(el._identifying_key)
+            if name is not None:
+                return name
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_lazy_load(state: ORMExecuteState) -> None:
+    if not has_request_context() or "lazy_loads" not in g:
+        return
+    name = _lazy_relationship(state)
+    if name is None:
+        return
+    g.lazy_loads[name] += 1
+    limit = current_app.config["SQL_LAZY_LOAD_LIMIT"]
+    if current_app.config.get("SQL_LAZY_LOADS") == "raise" and g.lazy_loads[name] > limit:
+        raise LazyLoadError(
+            f"{name} lazily loaded {g.lazy_loads[name]} times in {request.endpoint} (limit {limit})"
+        )
+
+
+def _compact(statement: str, limit: int = 2000) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _slow_logger(app: Flask) -> logging.Logger:
+    logger = logging.getLogger(SLOW_LOGGER)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    path = app.config["SLOW_QUERY_LOG"]
+    for handler in logger.handlers:
+        if getattr(handler, "baseFilename", None) == path:
+            return logger
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=app.config["SLOW_QUERY_LOG_BYTES"],
+        backupCount=app.config["SLOW_QUERY_LOG_BACKUPS"],
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def init_app(app: Flask) -> None:
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+
+    threshold = app.config["SLOW_QUERY_MS"] / 1000.0
+    slow_log = _slow_logger(app)
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if not has_request_context() or "sql_count" not in g:
+            return
+        g.sql_count += 1
+        g.sql_time += elapsed
+        if elapsed >= threshold:
+            slow_log.info(
+                "%.1fms endpoint=%s %s %s",
+                elapsed * 1000.0,
+                request.endpoint,
+                request.method,
+                _compact(statement),
+            )
+
+    @app.before_request
+    def _start_sql_timing():
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.request_start = time.perf_counter()
+        if app.config.get("SQL_LAZY_LOADS"):
+            g.lazy_loads = Counter()
+
+    @app.after_request
+    def _server_timing(response):
+        if "sql_count" not in g:
+            return response
+        _check_lazy_loads(app)
+        _check_query_budget(app)
+        total = (time.perf_counter() - g.request_start) * 1000.0
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={g.sql_time * 1000.0:.2f};desc="{g.sql_count} queries"',
+        )
+        if g.get("lazy_loads"):
+            response.headers.add(
+                "Server-Timing", f'lazy;desc="{sum(g.lazy_loads.values())} lazy loads"'
+            )
+        response.headers.add("Server-Timing", f"app;dur={total:.2f}")
+        return response
+
+
+def _check_lazy_loads(app: Flask) -> None:
+    limit = app.config["SQL_LAZY_LOAD_LIMIT"]
+    repeated = {k: n for k, n in g.get("lazy_loads", {}).items() if n > limit}
+    if repeated:
+        details = ", ".join(f"{k}x{n}" for k, n in sorted(repeated.items()))
+        app.logger.warning("N+1 lazy loads in %s: %s", request.endpoint, details)
+
+
+def _check_query_budget(app: Flask) -> None:
+    if request.endpoint is None:
+        return
+    view = app.view_functions.get(request.endpoint)
+    budget = getattr(view, "query_budget", None)
+    if budget is None or g.sql_count <= budget:
+        return
+    message = f"{request.endpoint} issued {g.sql_count} queries (budget {budget})"
+    if app.config.get("SQL_QUERY_BUDGETS") == "raise":
+        raise QueryBudgetExceeded(message)
+    app.logger.warning(message)
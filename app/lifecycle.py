@@ -0,0 +1,148 @@
+"""Time-driven status transitions.
+
+* an ``active`` assignment whose ``end_at`` has passed becomes ``done``;
+* an ``open`` care request whose ``end_at`` has passed becomes ``expired``,
+  and its still ``pending`` applications become ``declined`` with it.
+
+``tick`` works through the due rows in chunks. A chunk is one
+``UPDATE ... WHERE id IN (SELECT id ... ORDER BY end_at LIMIT :n) RETURNING``
+that finds its rows through the ``(status, end_at)`` indexes, followed by the
+same changes the write paths make to the derived tables, done set-based over
+the chunk's ids: the analytics rollup, ``user_stats``, ``sitter_feed``, the
+R*Trees and ``data_version``. Every chunk is its own short transaction.
+
+A tick runs at most ``max_chunks`` chunks per transition, so it touches at
+most ``chunk_size * max_chunks`` rows of each table however large the tables
+are; a backlog is drained by the following ticks. ``flask lifecycle run``
+runs ticks in a loop.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+
+from . import user_stats
+from .analytics import rollup
+from .assignments.intervals import drop_boxes
+from .data_version import bump_statement
+from .extensions import db
+from .matching.feed import unpublish_requests
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+
+
+@dataclass(frozen=True)
+class Transition:
+    name: str
+    model: type[CareAssignment] | type[CareRequest]
+    user_col: str
+    before: str
+    after: str
+    counter: str  # the user_stats column the ``before`` status counts towards
+
+
+TRANSITIONS = (
+    Transition("assignments_done", CareAssignment, "sitter_id", "active", "done", "active_assignments"),
+    Transition("requests_expired", CareRequest, "owner_id", "open", "expired", "open_requests"),
+)
+
+
+@dataclass
+class TickResult:
+    counts: dict[str, int] = field(default_factory=dict)
+    chunks: int = 0
+    seconds: float = 0.0
+    # A chunk came back full when the tick stopped: rows are still due.
+    backlog: bool = False
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def rate(self) -> float:
+        return self.total / self.seconds if self.seconds > 0 else 0.0
+
+
+def _decline_applications(request_ids: list[int]) -> set[int]:
+    """Decline the pending assignments of ``request_ids``; returns their sitters."""
+    rows = db.session.execute(
+        update(CareAssignment)
+        .where(CareAssignment.care_request_id.in_(request_ids), CareAssignment.status == "pending")
+        .values(status="declined")
+        .returning(CareAssignment.id, CareAssignment.sitter_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return set()
+    ids = [r[0] for r in rows]
+    rollup.move_status(CareAssignment, ids, "pending", "declined")
+    user_stats.add(
+        "pending_approvals",
+        select(CareRequest.owner_id, -func.count())
+        .join(CareAssignment, CareAssignment.care_request_id == CareRequest.id)
+        .where(CareAssignment.id.in_(ids))
+        .group_by(CareRequest.owner_id),
+    )
+    drop_boxes(ids)
+    return {r[1] for r in rows}
+
+
+def _transition_chunk(t: Transition, now: datetime, chunk_size: int) -> int:
+    model = t.model
+    user_col = getattr(model, t.user_col)
+    due = (
+        select(model.id)
+        .where(model.status == t.before, model.end_at < now)
+        .order_by(model.end_at)
+        .limit(chunk_size)
+    )
+    rows = db.session.execute(
+        update(model)
+        .where(model.id.in_(due), model.status == t.before)
+        .values(status=t.after)
+        .returning(model.id, user_col)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        db.session.commit()
+        return 0
+    ids = [r[0] for r in rows]
+    users = {r[1] for r in rows}
+
+    rollup.move_status(model, ids, t.before, t.after)
+    user_stats.add(
+        t.counter, select(user_col, -func.count()).where(model.id.in_(ids)).group_by(user_col)
+    )
+    if model is CareAssignment:
+        drop_boxes(ids)
+        db.session.execute(bump_statement(users=users))
+    else:
+        # Nobody can approve them any more.
+        sitters = _decline_applications(ids)
+        # Friends see the owner's open requests in their feed and dashboard.
+        unpublish_requests(ids)
+        db.session.execute(bump_statement(users=users | sitters, friends_of=users))
+    db.session.commit()
+    return len(ids)
+
+
+def tick(now: datetime | None = None, chunk_size: int = 500, max_chunks: int = 20) -> TickResult:
+    """Run the due transitions, at most ``max_chunks`` chunks of ``chunk_size`` rows each."""
+    now = now or datetime.utcnow()
+    result = TickResult(counts={t.name: 0 for t in TRANSITIONS})
+    started = time.perf_counter()
+    for t in TRANSITIONS:
+        for _ in range(max_chunks):
+            n = _transition_chunk(t, now, chunk_size)
+            result.chunks += 1
+            result.counts[t.name] += n
+            if n < chunk_size:
+                break
+        else:
+            result.backlog = True
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,307 @@
+"""In-process load generator behind ``flask loadtest``.
+
+The app is served on a local threaded WSGI server and driven by a pool of
+client threads. Every client logs in as a seeded user (password ``demo``)
+and replays a weighted mix of browsing and write actions. SQLite lock errors
+and slow write statements (time spent in the busy handler) are counted on
+the server side through request signals and engine events.
+"""
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from http.cookiejar import CookieJar
+
+import click
+from flask import Flask, got_request_exception
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from .extensions import db
+from .models.user import User
+from .seeding import SEED_PASSWORD
+
+DEFAULT_MIX = {
+    "dashboard": 30,
+    "open_requests": 25,
+    "assignments": 15,
+    "apply": 10,
+    "approve": 10,
+    "friend_request": 10,
+}
+HISTOGRAM_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+_APPLY_RE = re.compile(r'/requests/(\d+)/apply')
+_APPROVE_RE = re.compile(r'/assignments/(\d+)/approve')
+
+
+def parse_mix(spec: str | None) -> dict[str, int]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise click.BadParameter(f"unknown action {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))]
+
+    def histogram(self) -> list[int]:
+        buckets = [0] * (len(HISTOGRAM_MS) + 1)
+        for ms in self.latencies:
+            buckets[bisect_left(HISTOGRAM_MS, ms)] += 1
+        return buckets
+
+
+class ServerProbe:
+    """Counts ``database is locked`` errors and slow writes while attached."""
+
+    def __init__(self, app: Flask, busy_threshold_ms: float) -> None:
+        self.app = app
+        self.busy_threshold = busy_threshold_ms / 1000.0
+        self.locked = 0
+        self.busy_waits = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        with app.app_context():
+            self.engine = db.engine
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("loadtest_t0", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["loadtest_t0"].pop()
+        if elapsed >= self.busy_threshold and not statement.lstrip().upper().startswith("SELECT"):
+            with self._lock:
+                self.busy_waits += 1
+                self.busy_seconds += elapsed
+
+    def _on_exception(self, sender, exception, **_extra) -> None:
+        if isinstance(exception, OperationalError) and (
+            "locked" in str(exception) or "busy" in str(exception)
+        ):
+            with self._lock:
+                self.locked += 1
+
+    def __enter__(self) -> "ServerProbe":
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        got_request_exception.connect(self._on_exception, self.app)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        got_request_exception.disconnect(self._on_exception, self.app)
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs) -> None:
+        pass
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Client:
+    def __init__(self, base_url: str, email: str, stats: dict, lock: threading.Lock, rng: random.Random) -> None:
+        self.base_url = base_url
+        self.email = email
+        self.stats = stats
+        self.lock = lock
+        self.rng = rng
+        self.csrf = ""
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect()
+        )
+
+    def request(self, name: str, path: str, data: dict | None = None) -> str:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        t0 = time.perf_counter()
+        status, text = 0, ""
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=60) as resp:
+                status, text = resp.status, resp.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        except OSError:
+            status = 0
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        with self.lock:
+            st = self.stats[name]
+            st.latencies.append(elapsed)
+            st.statuses[status] += 1
+            if status == 0 or status >= 500:
+                st.errors += 1
+        return text
+
+    def login(self) -> bool:
+        page = self.request("login", "/auth/login")
+        m = _CSRF_RE.search(page)
+        self.csrf = m.group(1) if m else ""
+        self.request(
+            "login",
+            "/auth/login",
+            {"email": self.email, "password": SEED_PASSWORD, "csrf_token": self.csrf},
+        )
+        return "Logout" in self.request("dashboard", "/dashboard")
+
+    def dashboard(self) -> None:
+        self.request("dashboard", "/dashboard")
+
+    def open_requests(self) -> None:
+        self.request("open_requests", "/requests/friends/open")
+
+    def assignments(self) -> None:
+        self.request("assignments", "/assignments")
+
+    def apply(self) -> None:
+        ids = _APPLY_RE.findall(self.request("open_requests", "/requests/friends/open"))
+        if not ids:
+            return
+        req_id = self.rng.choice(ids)
+        page = self.request("apply_form", f"/requests/{req_id}/apply")
+        values = re.findall(r'name="(start_at|end_at)"[^>]*value="([^"]+)"', page)
+        if len(values) < 2:
+            return
+        data = dict(values)
+        data["csrf_token"] = self.csrf
+        self.request("apply_post", f"/requests/{req_id}/apply", data)
+
+    def approve(self) -> None:
+        page = self.request("review", "/assignments/review")
+        ids = _APPROVE_RE.findall(page)
+        if not ids:
+            return
+        aid = self.rng.choice(ids)
+        values = dict(re.findall(rf'name="(ap{aid}-(?:start_at|end_at))"[^>]*value="([^"]+)"', page))
+        values.update(csrf_token=self.csrf, row=aid, action="approve")
+        self.request("approve_post", f"/assignments/{aid}/approve", values)
+
+    def friend_request(self, user_ids: tuple[int, int]) -> None:
+        target = self.rng.randint(*user_ids)
+        self.request("friend_post", f"/social/send/{target}", {"csrf_token": self.csrf})
+
+
+def run_loadtest(
+    app: Flask,
+    clients: int,
+    duration: float,
+    users: int,
+    mix: dict[str, int],
+    busy_threshold_ms: float,
+    seed: int,
+) -> None:
+    with app.app_context():
+        accounts = [
+            email
+            for (email,) in db.session.query(User.email)
+            .filter(User.email.like("user%@paw.com"))
+            .order_by(User.id)
+            .limit(users)
+        ]
+        id_range = db.session.query(db.func.min(User.id), db.func.max(User.id)).one()
+        db.session.remove()
+    if not accounts:
+        raise click.ClickException("No seeded users found; run `flask seed-big` first.")
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    click.echo(f"Serving on {base_url}; {clients} clients, {len(accounts)} accounts, {duration:.0f}s")
+
+    stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    lock = threading.Lock()
+    actions = list(mix)
+    weights = [mix[a] for a in actions]
+    deadline = [0.0]
+
+    def worker(n: int) -> None:
+        rng = random.Random(f"{seed}:{n}")
+        client = Client(base_url, accounts[n % len(accounts)], stats, lock, rng)
+        if not client.login():
+            return
+        while time.perf_counter() < deadline[0]:
+            action = rng.choices(actions, weights)[0]
+            if action == "friend_request":
+                client.friend_request(id_range)
+            else:
+                getattr(client, action)()
+
+    with ServerProbe(app, busy_threshold_ms) as probe:
+        started = time.perf_counter()
+        deadline[0] = started + duration
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    _report(stats, elapsed, probe, busy_threshold_ms)
+    cache = app.extensions["friend_cache"].stats()
+    lookups = cache["hits"] + cache["misses"]
+    click.echo(
+        f"Friend cache: {cache['hits']} hits / {cache['misses']} misses "
+        f"({cache['hits'] / max(lookups, 1):.0%} hit rate), {cache['evictions']} evictions"
+    )
+    dash = app.extensions["dashboard_cache"].stats()
+    click.echo(
+        f"Dashboard cache: {dash['hits']} hits / {dash['misses']} misses "
+        f"({dash['hits'] / max(dash['hits'] + dash['misses'], 1):.0%} hit rate)"
+    )
+
+
+def _report(stats: dict[str, EndpointStats], elapsed: float, probe: ServerProbe, busy_ms: float) -> None:
+    total = sum(len(s.latencies) for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    click.echo(f"\n{total:,} requests in {elapsed:.1f}s -> {total / elapsed:,.1f} req/s, {errors} errors")
+    click.echo(
+        f"{'endpoint':<15} {'count':>7} {'req/s':>7} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+    for name in sorted(stats):
+        s = stats[name]
+        click.echo(
+            f"{name:<15} {len(s.latencies):>7} {len(s.latencies) / elapsed:>7.1f} {s.errors:>5} "
+            f"{s.percentile(50):>7.1f}ms {s.percentile(95):>7.1f}ms {s.percentile(99):>7.1f}ms "
+            f"{max(s.latencies or [0]):>7.1f}ms"
+        )
+
+    labels = [f"<{b}" for b in HISTOGRAM_MS] + [f">={HISTOGRAM_MS[-1]}"]
+    click.echo("\nLatency histogram (ms):")
+    click.echo(f"{'endpoint':<15} " + " ".join(f"{lab:>6}" for lab in labels))
+    for name in sorted(stats):
+        click.echo(f"{name:<15} " + " ".join(f"{n:>6}" for n in stats[name].histogram()))
+
+    click.echo(
+        f"\nSQLite: 'database is locked' errors={probe.locked}, "
+        f"busy waits (writes >= {busy_ms:.0f}ms)={probe.busy_waits} "
+        f"totalling {probe.busy_seconds:.2f}s"
+    )
@@ -0,0 +1,116 @@
+"""Fan-out-on-write feed of friends' open care requests.
+
+Every open ``CareRequest`` has one ``sitter_feed`` row per accepted friend of
+its owner. The routes that change a request or a friendship call into this
+module before they commit, so the feed moves in the same transaction:
+
+* ``publish_request`` after a request is created, edited or changes status;
+* ``link_friends`` / ``unlink_friends`` when a friendship is accepted/removed.
+
+``rebuild_feeds`` recomputes the whole table from the live join (bulk seeding,
+backfill) and ``check_feeds`` reports where the two disagree.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import cast
+
+from sqlalchemy import and_, case, delete, insert, literal, or_, select
+from sqlalchemy.engine import CursorResult
+
+from ..extensions import db
+from ..models.care import CareRequest
+from ..models.feed import SitterFeed
+from ..models.social import Friendship
+
+_COLUMNS = ("sitter_id", "care_request_id", "owner_id", "start_at")
+
+
+def _live_feed(owner_id: int | None = None):
+    """(sitter_id, care_request_id, owner_id, start_at) for every open request x friend."""
+    friend = case(
+        (Friendship.user_low_id == CareRequest.owner_id, Friendship.user_high_id),
+        else_=Friendship.user_low_id,
+    )
+    q = (
+        select(friend, CareRequest.id, CareRequest.owner_id, CareRequest.start_at)
+        .join(
+            Friendship,
+            or_(
+                Friendship.user_low_id == CareRequest.owner_id,
+                Friendship.user_high_id == CareRequest.owner_id,
+            ),
+        )
+        .where(Friendship.status == "accepted", CareRequest.status == "open")
+    )
+    if owner_id is not None:
+        q = q.where(CareRequest.owner_id == owner_id)
+    return q
+
+
+def publish_request(cr: CareRequest) -> None:
+    """Replace the feed rows of one request (none unless it is open)."""
+    db.session.flush()
+    db.session.execute(delete(SitterFeed).where(SitterFeed.care_request_id == cr.id))
+    if cr.status == "open":
+        db.session.execute(
+            insert(SitterFeed).from_select(
+                _COLUMNS, _live_feed(cr.owner_id).where(CareRequest.id == cr.id)
+            )
+        )
+
+
+def unpublish_requests(request_ids: list[int]) -> None:
+    """Drop the feed rows of requests that stopped being open through a Core update."""
+    db.session.execute(delete(SitterFeed).where(SitterFeed.care_request_id.in_(request_ids)))
+
+
+def link_friends(a: int, b: int) -> None:
+    """Copy each user's open requests into the other's feed."""
+    unlink_friends(a, b)
+    for sitter, owner in ((a, b), (b, a)):
+        db.session.execute(
+            insert(SitterFeed).from_select(
+                _COLUMNS,
+                select(literal(sitter), CareRequest.id, CareRequest.owner_id, CareRequest.start_at)
+                .where(CareRequest.owner_id == owner, CareRequest.status == "open"),
+            )
+        )
+
+
+def unlink_friends(a: int, b: int) -> None:
+    db.session.execute(
+        delete(SitterFeed).where(
+            or_(
+                and_(SitterFeed.sitter_id == a, SitterFeed.owner_id == b),
+                and_(SitterFeed.sitter_id == b, SitterFeed.owner_id == a),
+            )
+        )
+    )
+
+
+def rebuild_feeds() -> int:
+    """Recompute ``sitter_feed`` from friendships x open requests; returns the row count."""
+    db.session.execute(delete(SitterFeed))
+    result = db.session.execute(insert(SitterFeed).from_select(_COLUMNS, _live_feed()))
+    db.session.commit()
+    return cast(CursorResult, result).rowcount
+
+
+@dataclass
+class FeedDrift:
+    missing: list[tuple]
+    stale: list[tuple]
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.stale
+
+
+def check_feeds(limit: int = 100) -> FeedDrift:
+    """Compare the feed with the live join; at most ``limit`` rows per side."""
+    feed = select(SitterFeed.sitter_id, SitterFeed.care_request_id, SitterFeed.owner_id, SitterFeed.start_at)
+    live = _live_feed()
+    missing = db.session.execute(live.except_(feed).limit(limit)).all()
+    stale = db.session.execute(feed.except_(live).limit(limit)).all()
+    return FeedDrift(missing=[tuple(r) for r in missing], stale=[tuple(r) for r in stale])
@@ -4,17 +4,20 @@ from flask import (Blueprint, abort, flash, redirect, render_template, request,
                    url_for)
 from flask_login import current_user, login_required
 from flask_wtf import FlaskForm
-from sqlalchemy import and_, or_
 from sqlalchemy.orm import joinedload
 from wtforms import SubmitField, TextAreaField
 from wtforms.fields import DateTimeLocalField
 from wtforms.validators import DataRequired, Length, Optional
 
+from ..assignments.intervals import find_conflicts
+from ..analytics import rollup
 from ..extensions import db
+from ..instrumentation import query_budget
 from ..models.assignment import CareAssignment
 from ..models.care import CareRequest
-from ..models.social import Friendship
-from ..models.user import User
+from ..models.feed import SitterFeed
+from ..pagination import keyset_page
+from ..social.cache import friend_ids
 
 matching_bp = Blueprint("matching", __name__, template_folder="../templates")
 
@@ -27,14 +30,7 @@ class ApplyForm(FlaskForm):
 
 
 def _are_friends(user_id_a: int, user_id_b: int) -> bool:
-    q = Friendship.query.filter(
-        or_(
-            and_(Friendship.requester_id == user_id_a, Friendship.addressee_id == user_id_b),
-            and_(Friendship.requester_id == user_id_b, Friendship.addressee_id == user_id_a),
-        ),
-        Friendship.status == "accepted",
-    )
-    return db.session.query(q.exists()).scalar()
+    return user_id_b in friend_ids(user_id_a)
 
 
 def _valid_interval(start_at, end_at) -> bool:
@@ -46,45 +42,38 @@ def _valid_interval(start_at, end_at) -> bool:
 
 @matching_bp.get("/requests/friends/open")
 @login_required
+@query_budget(4)
 def open_friend_requests():
-    """List open care requests posted by my accepted friends (with simple pagination)."""
-    # Friends
-    rels = Friendship.query.filter(
-        Friendship.status == "accepted",
-        or_(Friendship.requester_id == current_user.id, Friendship.addressee_id == current_user.id),
-    ).all()
-    friend_ids = [(r.addressee_id if r.requester_id == current_user.id else r.requester_id) for r in rels]
-
-    rows, has_next, has_prev, page = [], False, False, 1
-    if friend_ids:
-        page = request.args.get("page", 1, type=int)
-        per_page = 10
-        base = (
-            CareRequest.query.options(joinedload(CareRequest.pet))
-            .filter(CareRequest.status == "open", CareRequest.owner_id.in_(friend_ids))
-            .order_by(CareRequest.start_at.asc())
-        )
-        fetched = base.offset((page - 1) * per_page).limit(per_page + 1).all()
-        has_next = len(fetched) > per_page
-        has_prev = page > 1
-        rows = fetched[:per_page]
-
-    users = User.query.filter(User.id.in_(friend_ids)).all() if friend_ids else []
-    users_map = {u.id: u for u in users}
+    """List open care requests posted by my accepted friends, from my ``sitter_feed``."""
+    base = (
+        CareRequest.query.join(SitterFeed, SitterFeed.care_request_id == CareRequest.id)
+        .options(joinedload(CareRequest.pet), joinedload(CareRequest.owner))
+        .filter(SitterFeed.sitter_id == current_user.id)
+    )
+    page = keyset_page(
+        base,
+        (SitterFeed.start_at, SitterFeed.care_request_id),
+        request.args.get("cursor"),
+        per_page=10,
+        key=lambda r: (r.start_at, r.id),
+    )
+    users_map = {r.owner_id: r.owner for r in page.items}
     return render_template(
         "open_friend_requests.html",
-        rows=rows,
+        rows=page.items,
         users_map=users_map,
-        page=page,
-        has_next=has_next,
-        has_prev=has_prev,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
     )
 
 
 @matching_bp.route("/requests/<int:req_id>/apply", methods=["GET", "POST"])
 @login_required
+@query_budget(10)
 def apply_request(req_id):
-    cr = CareRequest.query.options(joinedload(CareRequest.pet)).get_or_404(req_id)
+    cr = CareRequest.query.options(
+        joinedload(CareRequest.pet), joinedload(CareRequest.owner)
+    ).get_or_404(req_id)
 
     if cr.owner_id == current_user.id:
         abort(403)
@@ -134,11 +123,8 @@ def apply_request(req_id):
             flash("You have already applied for this request.", "info")
             return redirect(url_for("assignments.list_assignments"))
 
-        overlap = CareAssignment.query.filter(
-            CareAssignment.sitter_id == current_user.id,
-            CareAssignment.status.in_(["pending", "active"]),
-            CareAssignment.start_at < end,
-            CareAssignment.end_at > start,
+        overlap = find_conflicts(
+            start, end, sitter_id=current_user.id, statuses=("pending", "active")
         ).first()
         if overlap:
             flash("You already have another assignment overlapping these times.", "warning")
@@ -154,6 +140,7 @@ def apply_request(req_id):
             status="pending",
         )
         db.session.add(a)
+        rollup.move(None, rollup.of_assignment(a))
         db.session.commit()
         flash("Applied. The owner will review your application.", "success")
         return redirect(url_for("assignments.list_assignments"))
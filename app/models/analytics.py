@@ -0,0 +1,22 @@
+from ..extensions import db
+
+
+class AnalyticsMonthly(db.Model):
+    """Per-user monthly totals behind the analytics charts.
+
+    ``role`` is ``owner`` (care requests by their status and ``start_at``
+    month) or ``sitter`` (assignments by their status and month). ``count`` is
+    the number of rows and ``hours`` their summed duration. Kept up to date
+    by ``app.analytics.rollup`` next to the writes.
+    """
+
+    __tablename__ = "analytics_monthly"
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    role = db.Column(db.String(10), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    hours = db.Column(db.Float, nullable=False, default=0.0)
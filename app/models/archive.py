@@ -0,0 +1,66 @@
+from ..extensions import db
+
+
+class CareRequestArchive(db.Model):
+    """A care request moved out of ``care_requests`` by ``flask archive``; same ids and columns."""
+
+    __tablename__ = "care_requests_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    owner_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    pet_id = db.Column(
+        db.Integer, db.ForeignKey("pets.id", ondelete="SET NULL"), nullable=True
+    )
+
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_at = db.Column(db.DateTime, nullable=False)
+
+    location_text = db.Column(db.String(255))
+    notes = db.Column(db.Text)
+
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_care_requests_archive_owner_start", "owner_id", "start_at"),
+    )
+
+    pet = db.relationship("Pet")
+
+
+class CareAssignmentArchive(db.Model):
+    """An assignment archived together with its request."""
+
+    __tablename__ = "care_assignments_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    care_request_id = db.Column(
+        db.Integer, db.ForeignKey("care_requests_archive.id", ondelete="CASCADE"),
+        nullable=False, index=True
+    )
+    sitter_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    pet_id = db.Column(
+        db.Integer, db.ForeignKey("pets.id", ondelete="SET NULL"), nullable=True
+    )
+
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_at = db.Column(db.DateTime, nullable=False)
+
+    sitter_note = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_care_assignments_archive_sitter_start", "sitter_id", "start_at"),
+    )
+
+    pet = db.relationship("Pet")
+    care_request = db.relationship("CareRequestArchive", backref=db.backref("assignments", lazy="dynamic"))
+    sitter = db.relationship("User", foreign_keys=[sitter_id])
@@ -34,6 +34,10 @@ class CareAssignment(db.Model):
 
     __table_args__ = (
         CheckConstraint("end_at > start_at", name="ck_assign_end_after_start"),
+        db.Index("ix_care_assignments_sitter_status_start_end", "sitter_id", "status", "start_at", "end_at"),
+        db.Index("ix_care_assignments_pet_status_start_end", "pet_id", "status", "start_at", "end_at"),
+        db.Index("ix_care_assignments_request_status", "care_request_id", "status"),
+        db.Index("ix_care_assignments_status_end", "status", "end_at"),
     )
 
     pet = db.relationship("Pet", backref=db.backref("assignments", lazy="dynamic"))
@@ -24,6 +24,12 @@ class CareRequest(db.Model):
         db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
 
+    __table_args__ = (
+        db.Index("ix_care_requests_status_owner_start_id", "status", "owner_id", "start_at", "id"),
+        db.Index("ix_care_requests_owner_start", "owner_id", "start_at"),
+        db.Index("ix_care_requests_status_end", "status", "end_at"),
+    )
+
     pet = db.relationship("Pet", backref=db.backref("care_requests", lazy="dynamic"))
 
     owner = db.relationship("User", backref="care_requests")
@@ -0,0 +1,28 @@
+from ..extensions import db
+
+
+class SitterFeed(db.Model):
+    """Open care requests fanned out to every accepted friend of the owner.
+
+    Written by ``app.matching.feed`` next to the request/friendship writes, so
+    a user's feed page is one range scan on ``ix_sitter_feed_sitter_start``.
+    """
+
+    __tablename__ = "sitter_feed"
+
+    sitter_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    care_request_id = db.Column(
+        db.Integer,
+        db.ForeignKey("care_requests.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    owner_id = db.Column(db.Integer, nullable=False)
+    start_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_sitter_feed_sitter_start", "sitter_id", "start_at", "care_request_id"),
+        db.Index("ix_sitter_feed_sitter_owner", "sitter_id", "owner_id"),
+    )
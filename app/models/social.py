@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import CheckConstraint, or_
+from sqlalchemy import CheckConstraint, UniqueConstraint
 
 from ..extensions import db
 
@@ -23,6 +23,19 @@ class Friendship(db.Model):
         index=True,
     )
 
+    # Canonical (min, max) pair of the two users: one row per pair, and
+    # ``between`` is a single seek on the unique index.
+    user_low_id = db.Column(
+        db.Integer,
+        nullable=False,
+        default=lambda ctx: Friendship.pair(*_pair_params(ctx))[0],
+    )
+    user_high_id = db.Column(
+        db.Integer,
+        nullable=False,
+        default=lambda ctx: Friendship.pair(*_pair_params(ctx))[1],
+    )
+
     status = db.Column(db.String(20), nullable=False, default="pending")
 
     created_at = db.Column(
@@ -37,17 +50,22 @@ class Friendship(db.Model):
 
     __table_args__ = (
         CheckConstraint("requester_id <> addressee_id", name="ck_friend_self"),
+        UniqueConstraint("user_low_id", "user_high_id", name="uq_friendships_pair"),
+        db.Index("ix_friendships_pair_high", "user_high_id", "user_low_id"),
+        db.Index("ix_friendships_status_requester", "status", "requester_id", "addressee_id"),
+        db.Index("ix_friendships_status_addressee", "status", "addressee_id", "requester_id"),
     )
 
+    @staticmethod
+    def pair(u1_id: int, u2_id: int) -> tuple[int, int]:
+        return (u1_id, u2_id) if u1_id < u2_id else (u2_id, u1_id)
+
     @staticmethod
     def between(u1_id: int, u2_id: int):
-        return Friendship.query.filter(
-            or_(
-                db.and_(
-                    Friendship.requester_id == u1_id, Friendship.addressee_id == u2_id
-                ),
-                db.and_(
-                    Friendship.requester_id == u2_id, Friendship.addressee_id == u1_id
-                ),
-            )
-        ).first()
+        low, high = Friendship.pair(u1_id, u2_id)
+        return Friendship.query.filter_by(user_low_id=low, user_high_id=high).first()
+
+
+def _pair_params(ctx) -> tuple[int, int]:
+    params = ctx.get_current_parameters()
+    return params["requester_id"], params["addressee_id"]
@@ -0,0 +1,21 @@
+from ..extensions import db
+
+
+class UserStats(db.Model):
+    """Denormalized per-user counters behind the dashboard.
+
+    ``pets`` owned, ``open_requests`` owned, ``pending_approvals`` (pending
+    assignments on the user's requests) and ``active_assignments`` as sitter.
+    Kept in step with the rows by the mapper events in ``app.user_stats``; a
+    user without a row has all zeros.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    pets = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    open_requests = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    pending_approvals = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    active_assignments = db.Column(db.Integer, nullable=False, default=0, server_default="0")
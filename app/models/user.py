@@ -18,6 +18,8 @@ class User(db.Model, UserMixin):
     created_at = db.Column(
         db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
+    # Bumped whenever the user's analytics change; part of /analytics/data.json's ETag.
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     def set_password(self, password: str) -> None:
         self.password_hash = generate_password_hash(password)
@@ -5,11 +5,15 @@ from sqlalchemy import and_
 from wtforms import SubmitField, TextAreaField
 from wtforms.validators import Length, Optional
 
+from ..assignments.intervals import find_conflicts
+from ..analytics import rollup
 from ..extensions import db
+from ..matching import feed
 from ..models.assignment import CareAssignment
 from ..models.care import CareRequest
 from ..models.offer import CareOffer
-from ..models.social import Friendship
+from ..row_actions import row_action, submitted_action
+from ..social.cache import friend_ids
 
 offers_bp = Blueprint("offers", __name__, template_folder="../templates")
 
@@ -19,38 +23,16 @@ class OfferForm(FlaskForm):
     )
     submit = SubmitField("Send offer")
 
-class AcceptForm(FlaskForm):
-    submit = SubmitField("Accept")
-
-class DeclineForm(FlaskForm):
-    submit = SubmitField("Decline")
-
-class WithdrawForm(FlaskForm):
-    submit = SubmitField("Withdraw")
-
 def _are_friends(u1_id: int, u2_id: int) -> bool:
-    f = Friendship.between(u1_id, u2_id)
-    return bool(f and f.status == "accepted")
+    return u2_id in friend_ids(u1_id)
 
 def _has_sitter_overlap(sitter_id: int, start_at, end_at) -> bool:
-    q = CareAssignment.query.filter(
-        CareAssignment.sitter_id == sitter_id,
-        CareAssignment.status == "active",
-        CareAssignment.start_at < end_at,
-        CareAssignment.end_at > start_at,
-    )
-    return db.session.query(q.exists()).scalar()
+    return find_conflicts(start_at, end_at, sitter_id=sitter_id).first() is not None
 
 def _has_pet_overlap(pet_id: int | None, start_at, end_at) -> bool:
     if not pet_id:
         return False
-    q = CareAssignment.query.filter(
-        CareAssignment.pet_id == pet_id,
-        CareAssignment.status == "active",
-        CareAssignment.start_at < end_at,
-        CareAssignment.end_at > start_at,
-    )
-    return db.session.query(q.exists()).scalar()
+    return find_conflicts(start_at, end_at, pet_id=pet_id).first() is not None
 
 @offers_bp.route("/offers/mine", methods=["GET"])
 @login_required
@@ -60,10 +42,12 @@ def my_offers():
         .order_by(CareOffer.created_at.desc())
         .all()
     )
-    withdraw_forms = {
-        r.id: WithdrawForm(prefix=f"w{r.id}") for r in rows if r.status == "offered"
+    actions = {
+        r.id: row_action("offers.offer_withdraw", "withdraw", r.id, "Withdraw", offer_id=r.id)
+        for r in rows
+        if r.status == "offered"
     }
-    return render_template("offers_mine.html", rows=rows, withdraw_forms=withdraw_forms)
+    return render_template("offers_mine.html", rows=rows, actions=actions)
 
 @offers_bp.route("/offers/request/<int:req_id>/new", methods=["GET", "POST"])
 @login_required
@@ -105,8 +89,7 @@ def offer_new(req_id):
 @offers_bp.route("/offers/<int:offer_id>/withdraw", methods=["POST"])
 @login_required
 def offer_withdraw(offer_id):
-    form = WithdrawForm(prefix=f"w{offer_id}")
-    if not form.validate_on_submit():
+    if not submitted_action(offer_id, "withdraw"):
         flash("Invalid action.", "warning")
         return redirect(url_for("offers.my_offers"))
     off = CareOffer.query.get_or_404(offer_id)
@@ -130,25 +113,20 @@ def offers_for_request(req_id):
         .order_by(CareOffer.created_at.desc())
         .all()
     )
-    accept_forms = {
-        r.id: AcceptForm(prefix=f"a{r.id}") for r in rows if r.status == "offered"
-    }
-    decline_forms = {
-        r.id: DeclineForm(prefix=f"d{r.id}") for r in rows if r.status == "offered"
+    actions = {
+        r.id: {
+            "accept": row_action("offers.offer_accept", "accept", r.id, "Accept", offer_id=r.id),
+            "decline": row_action("offers.offer_decline", "decline", r.id, "Decline", offer_id=r.id),
+        }
+        for r in rows
+        if r.status == "offered"
     }
-    return render_template(
-        "offers_for_request.html",
-        req=cr,
-        rows=rows,
-        accept_forms=accept_forms,
-        decline_forms=decline_forms,
-    )
+    return render_template("offers_for_request.html", req=cr, rows=rows, actions=actions)
 
 @offers_bp.route("/offers/<int:offer_id>/accept", methods=["POST"])
 @login_required
 def offer_accept(offer_id):
-    form = AcceptForm(prefix=f"a{offer_id}")
-    if not form.validate_on_submit():
+    if not submitted_action(offer_id, "accept"):
         flash("Invalid action.", "warning")
         return redirect(url_for("schedule.care_list"))
 
@@ -174,9 +152,13 @@ def offer_accept(offer_id):
         status="active",
     )
     db.session.add(assign)
+    rollup.move(None, rollup.of_assignment(assign))
 
     off.status = "accepted_by_owner"
+    before = rollup.of_request(cr)
     cr.status = "confirmed"
+    rollup.move(before, rollup.of_request(cr))
+    feed.publish_request(cr)
     db.session.commit()
 
     flash("Offer accepted. Assignment created.", "success")
@@ -185,8 +167,7 @@ def offer_accept(offer_id):
 @offers_bp.route("/offers/<int:offer_id>/decline", methods=["POST"])
 @login_required
 def offer_decline(offer_id):
-    form = DeclineForm(prefix=f"d{offer_id}")
-    if not form.validate_on_submit():
+    if not submitted_action(offer_id, "decline"):
         flash("Invalid action.", "warning")
         return redirect(url_for("schedule.care_list"))
 
@@ -0,0 +1,91 @@
+"""Keyset (seek) pagination with opaque cursor tokens.
+
+A page is fetched with ``WHERE (k1, k2) > (:last_k1, :last_k2) ORDER BY k1, k2
+LIMIT n``, so it costs the same wherever it is in the list, unlike OFFSET.
+The cursor is the sort key of the last (or first, going back) row on the page,
+packed into a URL-safe token.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import tuple_
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+def encode_cursor(values: tuple, direction: str = "next") -> str:
+    payload = [direction] + [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None, types: tuple[type, ...]) -> tuple[str, tuple] | None:
+    """Return ``(direction, values)``, or None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, *values = json.loads(raw)
+        if direction not in ("next", "prev") or len(values) != len(types):
+            return None
+        return direction, tuple(_load(t, v) for t, v in zip(types, values))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def _load(type_: type, value: Any):
+    if type_ is datetime:
+        return datetime.fromisoformat(value)
+    if not isinstance(value, type_):
+        raise TypeError(value)
+    return value
+
+
+def keyset_page(query, keys, cursor: str | None, per_page: int, key=None) -> Page:
+    """Fetch one page of ``query`` ordered by the ``keys`` columns, ascending.
+
+    ``query`` must not be ordered yet, and the keys must be unique together
+    (end with the primary key). ``key(row)`` returns the keys' values for a
+    row; by default they are read as attributes named like the columns.
+    """
+    types = tuple(k.type.python_type for k in keys)
+    decoded = decode_cursor(cursor, types)
+    columns = tuple_(*keys)
+
+    if decoded and decoded[0] == "prev":
+        rows = (
+            query.filter(columns < tuple_(*decoded[1]))
+            .order_by(*(k.desc() for k in keys))
+            .limit(per_page + 1)
+            .all()
+        )
+        has_more_before, has_more_after = len(rows) > per_page, True
+        rows = rows[:per_page][::-1]
+    else:
+        if decoded:
+            query = query.filter(columns > tuple_(*decoded[1]))
+        rows = query.order_by(*keys).limit(per_page + 1).all()
+        has_more_before, has_more_after = decoded is not None, len(rows) > per_page
+        rows = rows[:per_page]
+
+    def _values(row):
+        if key is not None:
+            return tuple(key(row))
+        return tuple(getattr(row, k.key) for k in keys)
+
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(_values(rows[-1])) if rows and has_more_after else None,
+        prev_cursor=encode_cursor(_values(rows[0]), "prev") if rows and has_more_before else None,
+    )
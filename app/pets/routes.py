@@ -12,6 +12,7 @@ from wtforms.fields import URLField
 from wtforms.validators import URL, DataRequired, Length, NumberRange, Optional
 
 from ..extensions import db
+from ..instrumentation import query_budget
 from ..models.pet import Pet
 
 pets_bp = Blueprint("pets", __name__, template_folder="../templates")
@@ -40,6 +41,7 @@ def _require_owner() -> bool:
 
 @pets_bp.get("/pets")
 @login_required
+@query_budget(2)
 def list_pets():
     pets = (
         Pet.query.filter_by(owner_id=current_user.id)
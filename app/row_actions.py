@@ -0,0 +1,31 @@
+"""Per-row POST buttons for long lists, without a FlaskForm per row.
+
+A list view builds one plain dict per button with ``row_action`` and the
+template renders it with the ``row_action`` macro from ``_row_actions.html``.
+The page fetches its CSRF token once (``CSRFProtect`` checks it on submit), and
+every form also posts the row id and the action name. The receiving view calls
+``submitted_action`` to make sure both match the URL the form was posted to.
+"""
+from __future__ import annotations
+
+from flask import request, url_for
+
+ROW_FIELD = "row"
+ACTION_FIELD = "action"
+
+
+def row_action(endpoint: str, action: str, row_id: int, label: str, **values) -> dict:
+    return {
+        "url": url_for(endpoint, **values),
+        "action": action,
+        "row": row_id,
+        "label": label,
+    }
+
+
+def submitted_action(row_id: int, *allowed: str) -> str | None:
+    """The posted action if it targets ``row_id`` and is one of ``allowed``, else None."""
+    action = request.form.get(ACTION_FIELD)
+    if request.form.get(ROW_FIELD) != str(row_id) or action not in allowed:
+        return None
+    return action
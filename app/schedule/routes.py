@@ -6,7 +6,11 @@ from wtforms import SelectField, StringField, SubmitField, TextAreaField
 from wtforms.fields import DateTimeLocalField
 from wtforms.validators import DataRequired, Length, Optional
 
+from ..analytics import rollup
 from ..extensions import db
+from ..instrumentation import query_budget
+from ..matching import feed
+from ..models.archive import CareRequestArchive
 from ..models.care import CareRequest
 from ..models.pet import Pet
 
@@ -40,11 +44,13 @@ def _owner_request_or_404(req_id: int) -> CareRequest:
 
 @schedule_bp.get("/care/requests")
 @login_required
+@query_budget(3)
 def care_list():
     if not _require_owner():
         return redirect(url_for("dashboard"))
 
     status = (request.args.get("status") or "all").lower()
+    archived = request.args.get("archived") == "1"
 
     q = CareRequest.query.options(
         joinedload(CareRequest.pet)
@@ -52,11 +58,20 @@ def care_list():
         owner_id=current_user.id
     )
 
-    if status in {"open", "confirmed", "cancelled"}:
+    if status in {"open", "confirmed", "cancelled", "expired"}:
         q = q.filter_by(status=status)
 
     requests = q.order_by(CareRequest.start_at.desc()).all()
-    return render_template("care_list.html", requests=requests)
+    if archived:
+        aq = CareRequestArchive.query.options(
+            joinedload(CareRequestArchive.pet)
+        ).filter_by(owner_id=current_user.id)
+        if status in {"confirmed", "cancelled", "expired"}:
+            aq = aq.filter_by(status=status)
+        if status != "open":
+            requests += aq.order_by(CareRequestArchive.start_at.desc()).all()
+            requests.sort(key=lambda r: r.start_at, reverse=True)
+    return render_template("care_list.html", requests=requests, archived=archived)
 
 @schedule_bp.route("/care/requests/new", methods=["GET", "POST"])
 @login_required
@@ -88,6 +103,8 @@ def care_create():
             notes=form.notes.data,
         )
         db.session.add(cr)
+        rollup.move(None, rollup.of_request(cr))
+        feed.publish_request(cr)
         db.session.commit()
 
         flash("Care request created.", "success")
@@ -114,6 +131,7 @@ def care_edit(req_id):
     form.pet_id.data = cr.pet_id or 0
 
     if form.validate_on_submit():
+        before = rollup.of_request(cr)
         cr.pet_id = None if (form.pet_id.data or 0) == 0 else form.pet_id.data
         cr.start_at = form.start_at.data
         cr.end_at = form.end_at.data
@@ -123,6 +141,8 @@ def care_edit(req_id):
 
         cr.location_text = (form.location_text.data or "").strip() or None
         cr.notes = form.notes.data
+        rollup.move(before, rollup.of_request(cr))
+        feed.publish_request(cr)
         db.session.commit()
 
         flash("Care request updated.", "success")
@@ -140,7 +160,10 @@ def care_cancel(req_id):
     if cr.status == "cancelled":
         return redirect(url_for("schedule.care_list"))
 
+    before = rollup.of_request(cr)
     cr.status = "cancelled"
+    rollup.move(before, rollup.of_request(cr))
+    feed.publish_request(cr)
     db.session.commit()
     flash("Care request cancelled.", "info")
     return redirect(url_for("schedule.care_list"))
\ No newline at end of file
@@ -0,0 +1,463 @@
+"""Bulk seeding engine behind ``flask seed-small`` / ``flask seed-big``.
+
+Users are generated in fixed-size blocks. Each block draws from its own
+``random.Random`` derived from ``(seed, block)`` and uses block-local ids, so
+its rows never depend on which process built it or how many workers ran.
+Blocks are written in order with their ids shifted by running offsets, either
+straight into the target database or through per-block SQLite shards that are
+merged with ``ATTACH`` + ``INSERT ... SELECT``.
+"""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import create_engine, func, text
+from werkzeug.security import generate_password_hash
+
+from .extensions import db
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+from .models.pet import Pet
+from .models.social import Friendship
+from .models.user import User
+from . import user_stats
+from .analytics import rollup
+from .assignments.intervals import rebuild_intervals
+from .matching.feed import rebuild_feeds
+from .social.search import FTS_DROP, deferred_fts_sync
+
+SEED_PASSWORD = "demo"
+BLOCK_USERS = 5_000
+
+FIRST_NAMES = [
+    "Alex", "Mira", "Daniel", "Eva", "Ivo", "Nina", "Chris", "Maria", "Petar", "Georgi",
+    "Viktor", "Sofia", "Ani", "Stoyan", "Kalina", "Toma", "Raya", "Mila", "Rumen", "Teo",
+]
+LAST_NAMES = [
+    "Petrov", "Georgieva", "Ivanov", "Dimitrova", "Nikolov", "Stoyanova", "Kolev",
+    "Marinova", "Kostov", "Hristova", "Vasilev", "Todorova", "Alexandrov", "Ilieva",
+]
+
+SPECIES_BREEDS = {
+    "Cat": ["Domestic Shorthair", "British Shorthair", "Siamese", "Maine Coon", "Mix"],
+    "Dog": ["Labrador", "German Shepherd", "Golden Retriever", "Bulldog", "Poodle", "Mix"],
+    "Bird": ["Budgerigar", "Cockatiel", "Canary", "Lovebird", "Parrot"],
+    "Hamster": ["Syrian", "Dwarf Campbell", "Winter White", "Chinese", "Roborovski"],
+    "Rabbit": ["Holland Lop", "Mini Lop", "Netherland Dwarf", "Lionhead", "Mix"],
+}
+PET_NAMES = ["Maca", "Rex", "Bobi", "Luna", "Simba", "Molly", "Kaya", "Pufi", "Rocky", "Tara", "Miro", "Sisi"]
+SITTER_NOTES = ["Happy to help!", "Evening walks OK.", "Can do meds.", "Near the owner.", "Flexible hours."]
+REQUEST_STATUS_WEIGHTS = [
+    ("open", 0.30),
+    ("assigned", 0.20),
+    ("active", 0.20),
+    ("done", 0.25),
+    ("cancelled", 0.05),
+]
+
+TABLES = (User, Friendship, Pet, CareRequest, CareAssignment)
+
+# Id columns shifted by the running offset of the table they point to.
+_REMAP = {
+    "users": {"id": "users"},
+    "friendships": {
+        "id": "friendships",
+        "requester_id": "users",
+        "addressee_id": "users",
+        "user_low_id": "users",
+        "user_high_id": "users",
+    },
+    "pets": {"id": "pets", "owner_id": "users"},
+    "care_requests": {"id": "care_requests", "owner_id": "users", "pet_id": "pets"},
+    "care_assignments": {
+        "id": "care_assignments",
+        "care_request_id": "care_requests",
+        "sitter_id": "users",
+        "pet_id": "pets",
+    },
+}
+
+
+@dataclass(frozen=True)
+class SeedSpec:
+    users: int
+    pets_per_owner_min: int
+    pets_per_owner_max: int
+    reqs_per_pet_min: int
+    reqs_per_pet_max: int
+    seed: int = 42
+    now: datetime = field(default_factory=lambda: datetime.utcnow().replace(microsecond=0))
+    block_users: int = BLOCK_USERS
+
+    @property
+    def blocks(self) -> int:
+        return (self.users + self.block_users - 1) // self.block_users
+
+
+@dataclass
+class BlockRows:
+    block: int
+    rows: dict[str, list[dict]]
+    req_status: Counter
+    asg_status: Counter
+    counts: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+class Throughput:
+    def __init__(self) -> None:
+        self.rows: Counter[str] = Counter()
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+
+    def add(self, name: str, rows: int, seconds: float) -> None:
+        self.rows[name] += rows
+        self.seconds[name] += seconds
+
+    def report(self) -> None:
+        for model in TABLES:
+            name = model.__tablename__
+            n, secs = self.rows[name], self.seconds[name]
+            rate = n / secs if secs > 0 else 0.0
+            click.echo(f"  {name:<17} {n:>10,} rows in {secs:7.2f}s ({rate:,.0f} rows/s)")
+        for name in ("sitter_feed", "intervals", "analytics_monthly", "user_stats"):
+            if self.seconds[name]:
+                n, secs = self.rows[name], self.seconds[name]
+                click.echo(f"  {name:<17} {n:>10,} rows in {secs:7.2f}s (rebuilt)")
+        for name in ("generate", "shards", "commit"):
+            if self.seconds[name]:
+                click.echo(f"  {name:<17} {'':>10}      {self.seconds[name]:7.2f}s")
+
+
+class _BulkWriter:
+    """Buffers rows and writes them with executemany core inserts.
+
+    Buffers are flushed in foreign-key order and committed once per chunk, so
+    memory stays bounded by ``chunk_size`` regardless of the dataset size.
+    """
+
+    def __init__(self, chunk_size: int, stats: Throughput) -> None:
+        self.chunk_size = max(1, chunk_size)
+        self.stats = stats
+        self.buffers: dict[str, list[dict]] = {m.__tablename__: [] for m in TABLES}
+        self._pending = 0
+
+    def add(self, name: str, row: dict) -> None:
+        self.buffers[name].append(row)
+        self._pending += 1
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for model in TABLES:
+            buf = self.buffers[model.__tablename__]
+            if not buf:
+                continue
+            t0 = time.perf_counter()
+            db.session.execute(model.__table__.insert(), buf)
+            self.stats.add(model.__tablename__, len(buf), time.perf_counter() - t0)
+            buf.clear()
+        t0 = time.perf_counter()
+        db.session.commit()
+        self.stats.add("commit", 0, time.perf_counter() - t0)
+        self._pending = 0
+
+
+def _rand_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _rand_email(i: int) -> str:
+    return f"user{i:03d}@paw.com"
+
+
+def _rand_pet(rng: random.Random, pet_id: int, owner_id: int, now: datetime) -> dict:
+    species = rng.choice(list(SPECIES_BREEDS.keys()))
+    return {
+        "id": pet_id,
+        "owner_id": owner_id,
+        "name": rng.choice(PET_NAMES),
+        "species": species,
+        "breed": rng.choice(SPECIES_BREEDS[species]),
+        "age": rng.randint(1, 14),
+        "created_at": now,
+    }
+
+
+def _pick_request_status(rng: random.Random) -> str:
+    r = rng.random()
+    acc = 0.0
+    for label, w in REQUEST_STATUS_WEIGHTS:
+        acc += w
+        if r <= acc:
+            return label
+    return "open"
+
+
+def _make_assignment_for_request(
+    rng: random.Random, assign_id: int, req: dict, sitter_id: int, mode: str, now: datetime
+) -> dict:
+    if mode == "assigned":
+        start = req["start_at"]
+        end = req["end_at"]
+        status = "pending"
+    elif mode == "active":
+        start = now - timedelta(hours=rng.randint(1, 6))
+        end = now + timedelta(hours=rng.randint(2, 12))
+        req["start_at"] = start
+        req["end_at"] = end
+        status = "active"
+    else:
+        duration_h = rng.randint(2, 24)
+        end = now - timedelta(days=rng.randint(1, 20), hours=rng.randint(0, 12))
+        start = end - timedelta(hours=duration_h)
+        status = "done"
+
+    return {
+        "id": assign_id,
+        "care_request_id": req["id"],
+        "sitter_id": sitter_id,
+        "pet_id": req["pet_id"],
+        "start_at": start,
+        "end_at": end,
+        "status": status,
+        "sitter_note": rng.choice(SITTER_NOTES),
+        "created_at": now,
+    }
+
+
+def build_block(spec: SeedSpec, block: int, password_hash: str) -> BlockRows:
+    """Generate one block with ids local to the block (all starting at 1)."""
+    rng = random.Random(f"{spec.seed}:{block}")
+    now = spec.now
+    first = block * spec.block_users
+    count = min(spec.block_users, spec.users - first)
+    rows: dict[str, list[dict]] = {m.__tablename__: [] for m in TABLES}
+
+    owners: list[int] = []
+    sitters: list[int] = []
+    is_sitter_flags = bytearray(count + 1)
+    for uid in range(1, count + 1):
+        role_pick = rng.random()
+        is_owner = role_pick < 0.4 or (0.7 <= role_pick <= 1.0)
+        is_sitter = role_pick > 0.3
+        rows["users"].append({
+            "id": uid,
+            "email": _rand_email(first + uid - 1),
+            "name": _rand_name(rng),
+            "password_hash": password_hash,
+            "is_owner": is_owner,
+            "is_sitter": is_sitter,
+            "created_at": now,
+        })
+        if is_owner:
+            owners.append(uid)
+        if is_sitter:
+            sitters.append(uid)
+            is_sitter_flags[uid] = 1
+
+    # The friend graph lives in memory: ``pairs`` dedupes both directions and
+    # ``friend_sitters`` is the accepted-friend adjacency used for assignments.
+    pairs: set[tuple[int, int]] = set()
+    friend_sitters: dict[int, list[int]] = defaultdict(list)
+
+    def add_friendship(a_id: int, b_id: int, status: str) -> None:
+        key = (a_id, b_id) if a_id < b_id else (b_id, a_id)
+        if a_id == b_id or key in pairs:
+            return
+        pairs.add(key)
+        rows["friendships"].append({
+            "id": len(rows["friendships"]) + 1,
+            "requester_id": a_id,
+            "addressee_id": b_id,
+            "user_low_id": key[0],
+            "user_high_id": key[1],
+            "status": status,
+            "created_at": now,
+            "updated_at": now,
+        })
+        if status == "accepted":
+            if is_sitter_flags[b_id]:
+                friend_sitters[a_id].append(b_id)
+            if is_sitter_flags[a_id]:
+                friend_sitters[b_id].append(a_id)
+
+    for o in owners:
+        candidates = rng.sample(sitters, k=min(4, len(sitters))) if sitters else []
+        for s in candidates[:3]:
+            add_friendship(o, s, "accepted")
+        if len(candidates) >= 4:
+            add_friendship(o, candidates[3], "pending")
+
+    req_status: Counter = Counter()
+    asg_status: Counter = Counter()
+    for o in owners:
+        sitters_of_owner = friend_sitters.get(o, ())
+        for _ in range(rng.randint(spec.pets_per_owner_min, spec.pets_per_owner_max)):
+            pet_id = len(rows["pets"]) + 1
+            rows["pets"].append(_rand_pet(rng, pet_id, o, now))
+
+            for _ in range(rng.randint(spec.reqs_per_pet_min, spec.reqs_per_pet_max)):
+                start = now + timedelta(days=rng.randint(-40, 40), hours=rng.randint(7, 19))
+                st = _pick_request_status(rng)
+                req = {
+                    "id": len(rows["care_requests"]) + 1,
+                    "owner_id": o,
+                    "pet_id": pet_id,
+                    "start_at": start,
+                    "end_at": start + timedelta(hours=rng.randint(2, 36)),
+                    "status": st,
+                    "created_at": now,
+                }
+                if sitters_of_owner and st in {"assigned", "active", "done"}:
+                    sitter = rng.choice(sitters_of_owner)
+                    asg = _make_assignment_for_request(
+                        rng, len(rows["care_assignments"]) + 1, req, sitter, mode=st, now=now
+                    )
+                    rows["care_assignments"].append(asg)
+                    asg_status[asg["status"]] += 1
+                rows["care_requests"].append(req)
+                req_status[st] += 1
+
+    counts = {name: len(r) for name, r in rows.items()}
+    return BlockRows(block, rows, req_status, asg_status, counts)
+
+
+def _shift(name: str, row: dict, offsets: dict[str, int]) -> dict:
+    for col, target in _REMAP[name].items():
+        if row[col] is not None:
+            row[col] += offsets[target]
+    return row
+
+
+def _build_shard(args: tuple[SeedSpec, int, str, str]) -> tuple[str, BlockRows]:
+    spec, block, password_hash, workdir = args
+    t0 = time.perf_counter()
+    built = build_block(spec, block, password_hash)
+    path = os.path.join(workdir, f"shard-{block:05d}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        db.metadata.create_all(engine, tables=[m.__table__ for m in TABLES])
+        with engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            # The search index is rebuilt once in the target database.
+            for stmt in FTS_DROP:
+                conn.exec_driver_sql(stmt)
+            for model in TABLES:
+                rows = built.rows[model.__tablename__]
+                if rows:
+                    conn.execute(model.__table__.insert(), rows)
+    finally:
+        engine.dispose()
+    # Only the counts travel back to the parent; the rows stay in the shard.
+    built.rows = {}
+    built.seconds = time.perf_counter() - t0
+    return path, built
+
+
+def _merge_shard(path: str, offsets: dict[str, int], stats: Throughput) -> None:
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("ATTACH DATABASE ? AS shard", (path,))
+        try:
+            for model in TABLES:
+                name = model.__tablename__
+                cols = [c.name for c in model.__table__.columns]
+                exprs = [
+                    f"{c} + {int(offsets[_REMAP[name][c]])}" if c in _REMAP[name] else c
+                    for c in cols
+                ]
+                t0 = time.perf_counter()
+                res = conn.exec_driver_sql(
+                    f"INSERT INTO {name} ({', '.join(cols)}) "
+                    f"SELECT {', '.join(exprs)} FROM shard.{name} ORDER BY id"
+                )
+                stats.add(name, max(res.rowcount, 0), time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            conn.commit()
+            stats.add("commit", 0, time.perf_counter() - t0)
+        finally:
+            conn.exec_driver_sql("DETACH DATABASE shard")
+    os.remove(path)
+
+
+def _next_id(model) -> int:
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def seed_bulk(spec: SeedSpec, chunk_size: int = 10_000, workers: int = 1) -> None:
+    started = time.perf_counter()
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    offsets = {m.__tablename__: _next_id(m) - 1 for m in TABLES}
+    db.session.commit()
+
+    stats = Throughput()
+    req_status: Counter = Counter()
+    asg_status: Counter = Counter()
+
+    def advance(built: BlockRows) -> None:
+        for name, n in built.counts.items():
+            offsets[name] += n
+        req_status.update(built.req_status)
+        asg_status.update(built.asg_status)
+
+    with deferred_fts_sync():
+        if workers <= 1:
+            writer = _BulkWriter(chunk_size, stats)
+            for block in range(spec.blocks):
+                t0 = time.perf_counter()
+                built = build_block(spec, block, password_hash)
+                stats.add("generate", 0, time.perf_counter() - t0)
+                for model in TABLES:
+                    name = model.__tablename__
+                    for row in built.rows[name]:
+                        writer.add(name, _shift(name, row, offsets))
+                advance(built)
+            writer.flush()
+        else:
+            with tempfile.TemporaryDirectory(prefix="paw-seed-") as workdir:
+                tasks = [(spec, b, password_hash, workdir) for b in range(spec.blocks)]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    # ``map`` yields in block order, so shards merge deterministically
+                    # while later blocks are still being generated.
+                    for path, built in pool.map(_build_shard, tasks):
+                        stats.add("shards", 0, built.seconds)
+                        _merge_shard(path, offsets, stats)
+                        advance(built)
+
+    t0 = time.perf_counter()
+    stats.add("sitter_feed", rebuild_feeds(), time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    stats.add("intervals", rebuild_intervals(), time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    stats.add("analytics_monthly", rollup.backfill(), time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    stats.add("user_stats", user_stats.rebuild(), time.perf_counter() - t0)
+
+    if db.engine.dialect.name == "sqlite":
+        # Fresh planner statistics, otherwise SQLite guesses between the
+        # single-column and composite indexes on freshly bulk-loaded tables.
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(stats.rows.values())
+    click.echo(
+        f"Inserted {total_rows:,} rows in {elapsed:.2f}s "
+        f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s, workers={max(workers, 1)}):"
+    )
+    stats.report()
+    click.echo(
+        "✔ Seed completed:\n"
+        f"  Users: {stats.rows['users']}\n"
+        f"  Pets: {stats.rows['pets']}\n"
+        f"  Requests: {stats.rows['care_requests']} (open: {req_status['open']})\n"
+        f"  Assignments: {stats.rows['care_assignments']} (pending: {asg_status['pending']}, "
+        f"active: {asg_status['active']}, done: {asg_status['done']})"
+    )
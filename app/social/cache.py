@@ -0,0 +1,99 @@
+"""Per-user accepted-friend id sets, cached in process.
+
+``friend_ids(user_id)`` returns a frozenset from an LRU with a TTL; the social
+routes call ``invalidate`` for both users after every write to their pair.
+The TTL bounds staleness for writers that bypass those routes (CLI, other
+processes).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Flask, current_app
+from sqlalchemy import or_
+
+from ..extensions import db
+from ..models.social import Friendship
+
+
+class FriendCache:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[int, tuple[float, frozenset[int]]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> frozenset[int]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        ids = _load_friend_ids(user_id)
+
+        with self._lock:
+            # An invalidation that raced with the load wins; the next call reloads.
+            if generation == self._generation:
+                self._data[user_id] = (now + self.ttl, ids)
+                self._data.move_to_end(user_id)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return ids
+
+    def invalidate(self, *user_ids: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for uid in user_ids:
+                self._data.pop(uid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _load_friend_ids(user_id: int) -> frozenset[int]:
+    rows = db.session.query(Friendship.requester_id, Friendship.addressee_id).filter(
+        Friendship.status == "accepted",
+        or_(Friendship.requester_id == user_id, Friendship.addressee_id == user_id),
+    )
+    return frozenset(a if r == user_id else r for r, a in rows)
+
+
+def init_app(app: Flask) -> None:
+    app.extensions["friend_cache"] = FriendCache(
+        maxsize=app.config["FRIEND_CACHE_SIZE"], ttl=app.config["FRIEND_CACHE_TTL"]
+    )
+
+
+def friend_cache() -> FriendCache:
+    return current_app.extensions["friend_cache"]
+
+
+def friend_ids(user_id: int) -> frozenset[int]:
+    return friend_cache().get(user_id)
+
+
+def invalidate(*user_ids: int) -> None:
+    friend_cache().invalidate(*user_ids)
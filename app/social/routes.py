@@ -1,42 +1,38 @@
 from flask import Blueprint, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
+from ..instrumentation import query_budget
+from ..matching import feed
 from ..models.social import Friendship
 from ..models.user import User
+from . import cache as friend_cache
+from .search import search_users
 
 social_bp = Blueprint("social", __name__, template_folder="../templates")
 
 @social_bp.route("/search", methods=["GET"])
 @login_required
+@query_budget(3)
 def search():
     q_raw = (request.args.get("q") or "").strip()
     results, status_map = [], {}
 
     if q_raw:
-        q_lower = q_raw.lower()
-        base = User.query.filter(User.id != current_user.id)
-
-        if "@" in q_raw:
-            results = (base
-                       .filter(func.lower(User.email).contains(q_lower))
-                       .order_by(User.id.asc())
-                       .limit(50).all())
-        else:
-            tokens = [t for t in q_lower.split() if t]
-            q = base
-            for t in tokens:
-                q = q.filter(func.lower(User.name).contains(t))
-            results = q.order_by(User.id.asc()).limit(50).all()
+        results = search_users(q_raw, exclude_id=current_user.id, limit=50)
 
         if results:
             ids = [u.id for u in results]
+            me = current_user.id
             rels = (Friendship.query
-                    .filter(or_(Friendship.requester_id == current_user.id,
-                                Friendship.addressee_id == current_user.id))
-                    .filter(or_(Friendship.requester_id.in_(ids),
-                                Friendship.addressee_id.in_(ids)))
+                    .filter(or_(
+                        and_(Friendship.user_low_id == me,
+                             Friendship.user_high_id.in_([i for i in ids if i > me])),
+                        and_(Friendship.user_high_id == me,
+                             Friendship.user_low_id.in_([i for i in ids if i < me])),
+                    ))
                     .all())
 
             status_map = {uid: "none" for uid in ids}
@@ -63,12 +59,7 @@ def send_request(user_id):
 
     other = User.query.get_or_404(user_id)
 
-    existing = Friendship.query.filter(
-        or_(
-            and_(Friendship.requester_id == current_user.id, Friendship.addressee_id == user_id),
-            and_(Friendship.requester_id == user_id, Friendship.addressee_id == current_user.id),
-        )
-    ).first()
+    existing = Friendship.between(current_user.id, user_id)
 
     if existing:
         if existing.status == "accepted":
@@ -76,13 +67,21 @@ def send_request(user_id):
         if existing.status == "pending":
             if existing.requester_id == user_id:
                 existing.status = "accepted"
+                feed.link_friends(current_user.id, user_id)
                 db.session.commit()
+                friend_cache.invalidate(current_user.id, user_id)
                 return redirect(url_for("social.friends"))
             return _redirect_back_to_search()
 
     fr = Friendship(requester_id=current_user.id, addressee_id=user_id, status="pending")
     db.session.add(fr)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # The other side sent a request at the same moment; the pair is unique.
+        db.session.rollback()
+        return _redirect_back_to_search()
+    friend_cache.invalidate(current_user.id, user_id)
     return redirect(url_for("social.sent"))
 
 @social_bp.post("/cancel/<int:user_id>")
@@ -92,6 +91,7 @@ def cancel(user_id):
     if fr:
         db.session.delete(fr)
         db.session.commit()
+        friend_cache.invalidate(current_user.id, user_id)
     return redirect(url_for("social.sent"))
 
 @social_bp.post("/accept/<int:user_id>")
@@ -100,7 +100,9 @@ def accept(user_id):
     fr = Friendship.query.filter_by(requester_id=user_id, addressee_id=current_user.id, status="pending").first()
     if fr:
         fr.status = "accepted"
+        feed.link_friends(current_user.id, user_id)
         db.session.commit()
+        friend_cache.invalidate(current_user.id, user_id)
     return redirect(url_for("social.friends"))
 
 @social_bp.post("/decline/<int:user_id>")
@@ -110,10 +112,23 @@ def decline(user_id):
     if fr:
         db.session.delete(fr)
         db.session.commit()
+        friend_cache.invalidate(current_user.id, user_id)
     return redirect(url_for("social.incoming"))
 
+@social_bp.post("/remove/<int:user_id>")
+@login_required
+def remove_friend(user_id):
+    fr = Friendship.between(current_user.id, user_id)
+    if fr and fr.status == "accepted":
+        db.session.delete(fr)
+        feed.unlink_friends(current_user.id, user_id)
+        db.session.commit()
+        friend_cache.invalidate(current_user.id, user_id)
+    return redirect(url_for("social.friends"))
+
 @social_bp.get("/sent")
 @login_required
+@query_budget(3)
 def sent():
     rels = Friendship.query.filter_by(requester_id=current_user.id, status="pending").all()
     ids = [r.addressee_id for r in rels]
@@ -124,6 +139,7 @@ def sent():
 
 @social_bp.get("/incoming")
 @login_required
+@query_budget(3)
 def incoming():
     rels = Friendship.query.filter_by(addressee_id=current_user.id, status="pending").all()
     ids = [r.requester_id for r in rels]
@@ -134,11 +150,8 @@ def incoming():
 
 @social_bp.get("/friends")
 @login_required
+@query_budget(3)
 def friends():
-    rels = Friendship.query.filter(
-        or_(Friendship.requester_id == current_user.id, Friendship.addressee_id == current_user.id),
-        Friendship.status == "accepted"
-    ).all()
-    ids = [(r.addressee_id if r.requester_id == current_user.id else r.requester_id) for r in rels]
+    ids = friend_cache.friend_ids(current_user.id)
     users = User.query.filter(User.id.in_(ids)).all() if ids else []
     return render_template("social_friends.html", users=users)
\ No newline at end of file
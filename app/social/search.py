@@ -0,0 +1,158 @@
+"""User search: SQLite FTS5 over name and email, LIKE everywhere else.
+
+``users_fts`` is an external-content FTS5 table over ``users`` kept in sync by
+triggers. The unicode61 tokenizer folds case and diacritics, and every query
+token becomes a prefix match; Cyrillic tokens are also matched in their Latin
+transliteration, which is how names are stored. Results are ranked with bm25,
+name matches weighing more than email matches.
+"""
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import DDL, Float, Integer, event, func, text
+from sqlalchemy.exc import OperationalError
+
+from ..extensions import db
+from ..models.user import User
+
+FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name, email, content='users', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+)
+
+FTS_DROP = (
+    "DROP TRIGGER IF EXISTS users_fts_au",
+    "DROP TRIGGER IF EXISTS users_fts_ad",
+    "DROP TRIGGER IF EXISTS users_fts_ai",
+    "DROP TABLE IF EXISTS users_fts",
+)
+
+# Name hits outrank email hits (bm25 column weights).
+BM25_WEIGHTS = (10.0, 1.0)
+
+for _stmt in FTS_DDL:
+    event.listen(User.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(
+    User.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS users_fts").execute_if(dialect="sqlite"),
+)
+
+
+@contextmanager
+def deferred_fts_sync():
+    """Bulk loads: skip the per-row insert trigger, rebuild the index once at the end."""
+    has_fts = db.engine.dialect.name == "sqlite" and db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'")
+    ).first()
+    if not has_fts:
+        yield
+        return
+    db.session.execute(text("DROP TRIGGER IF EXISTS users_fts_ai"))
+    db.session.commit()
+    try:
+        yield
+    finally:
+        db.session.execute(text(FTS_DDL[1]))
+        db.session.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        db.session.commit()
+
+
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+    "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "sht", "ъ": "a", "ь": "y", "ю": "yu", "я": "ya",
+    "ё": "yo", "э": "e", "ы": "y",
+}
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def transliterate(token: str) -> str:
+    return "".join(_CYRILLIC.get(ch, ch) for ch in token.lower())
+
+
+def match_expression(query: str) -> str | None:
+    """FTS5 MATCH string: every token as a quoted prefix, all tokens required.
+
+    Queries containing ``@`` are matched against the email column only, like
+    the LIKE search does.
+    """
+    terms = []
+    for token in _TOKEN.findall(query.lower()):
+        variants = {token, transliterate(token)}
+        quoted = " OR ".join(f'"{v}"*' for v in sorted(variants))
+        terms.append(f"({quoted})" if len(variants) > 1 else quoted)
+    if not terms:
+        return None
+    expr = " AND ".join(terms)
+    return f"email : ({expr})" if "@" in query else expr
+
+
+def search_users(query: str, exclude_id: int | None = None, limit: int = 50) -> list[User]:
+    query = query.strip()
+    if not query:
+        return []
+    if db.engine.dialect.name == "sqlite" and current_app.extensions.get("user_search_fts", True):
+        try:
+            return _search_fts(query, exclude_id, limit)
+        except OperationalError as exc:
+            # Database created without the FTS migration: fall back for good.
+            if "users_fts" not in str(exc):
+                raise
+            db.session.rollback()
+            current_app.extensions["user_search_fts"] = False
+            current_app.logger.warning("users_fts missing, user search falls back to LIKE")
+    return _search_like(query, exclude_id, limit)
+
+
+def _search_fts(query: str, exclude_id: int | None, limit: int) -> list[User]:
+    expr = match_expression(query)
+    if expr is None:
+        return []
+    hits = (
+        text(
+            # Every match is scored; FTS5 keeps only the best :n while sorting.
+            "SELECT rowid AS id, bm25(users_fts, :w_name, :w_email) AS rank "
+            "FROM users_fts WHERE users_fts MATCH :q "
+            "ORDER BY rank LIMIT :n"
+        )
+        .bindparams(
+            q=expr,
+            n=limit + 1,
+            w_name=BM25_WEIGHTS[0],
+            w_email=BM25_WEIGHTS[1],
+        )
+        .columns(id=Integer, rank=Float)
+        .subquery()
+    )
+    q = User.query.join(hits, hits.c.id == User.id)
+    if exclude_id is not None:
+        q = q.filter(User.id != exclude_id)
+    return q.order_by(hits.c.rank, User.id).limit(limit).all()
+
+
+def _search_like(query: str, exclude_id: int | None, limit: int) -> list[User]:
+    q_lower = query.lower()
+    q = User.query
+    if exclude_id is not None:
+        q = q.filter(User.id != exclude_id)
+    if "@" in query:
+        q = q.filter(func.lower(User.email).contains(q_lower))
+    else:
+        for token in q_lower.split():
+            q = q.filter(func.lower(User.name).contains(token))
+    return q.order_by(User.id.asc()).limit(limit).all()
@@ -0,0 +1,77 @@
+"""Cold-start import cost of the app, as reported by ``python -X importtime``.
+
+``profile_startup`` runs ``create_app()`` in a fresh interpreter, either as a
+web worker (blueprints registered eagerly) or as a ``flask`` command that
+doesn't serve pages (``FAST_STARTUP=1``), and returns the wall time of the
+import + ``create_app`` together with one row per imported module.
+"""
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+_SCRIPT = (
+    "import time\n"
+    "t = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(f'{(time.perf_counter() - t) * 1000.0:.3f}')\n"
+)
+
+
+@dataclass(frozen=True)
+class ModuleImport:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    mode: str
+    total_ms: float
+    modules: list[ModuleImport]
+
+    def top(self, n: int, key: str = "cumulative") -> list[ModuleImport]:
+        attr = "self_ms" if key == "self" else "cumulative_ms"
+        return sorted(self.modules, key=lambda m: getattr(m, attr), reverse=True)[:n]
+
+
+def parse_importtime(text: str) -> list[ModuleImport]:
+    """Rows of ``-X importtime`` output (stderr); other lines are skipped."""
+    rows = []
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append(ModuleImport(
+                module=m.group(4),
+                self_ms=int(m.group(1)) / 1000.0,
+                cumulative_ms=int(m.group(2)) / 1000.0,
+                depth=len(m.group(3)) // 2,
+            ))
+    return rows
+
+
+def profile_startup(mode: str = "web") -> StartupProfile:
+    env = dict(os.environ, FAST_STARTUP="1" if mode == "cli" else "0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"create_app() failed in the profiling run:\n{proc.stderr[-2000:]}")
+    total_ms = float(proc.stdout.strip().splitlines()[-1])
+    return StartupProfile(mode=mode, total_ms=total_ms, modules=parse_importtime(proc.stderr))
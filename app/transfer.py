@@ -0,0 +1,254 @@
+"""Streaming export and import of the base tables (``flask export`` / ``flask import``).
+
+An export is a directory with one gzip file per table, ``<table>.ndjson.gz``
+(one JSON object per line) or ``<table>.csv.gz`` (header row, ``\\N`` for
+NULL), and a ``manifest.json`` with the format and the row counts. Rows are
+read with ``yield_per`` and written as they arrive, so memory does not grow
+with the table.
+
+Every table is read in one read transaction, so the files are a single
+snapshot and agree with each other whatever is written meanwhile. The cost
+is that a long export pins the SQLite WAL (it cannot be checkpointed past
+the snapshot) until it finishes.
+
+Import reads the files in foreign-key order and writes ``chunk_size`` rows at
+a time with executemany core inserts, one transaction per chunk, into empty
+tables; ids are kept. The derived tables (``sitter_feed``, the R*Trees,
+``analytics_monthly``, ``user_stats``, ``users_fts``) are not exported but
+rebuilt afterwards, as after seeding.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import Boolean, DateTime, Integer, Row, func, select, text
+
+from . import user_stats
+from .analytics import rollup
+from .assignments.intervals import rebuild_intervals
+from .extensions import db
+from .matching.feed import rebuild_feeds
+from .models.archive import CareAssignmentArchive, CareRequestArchive
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+from .models.pet import Pet
+from .models.social import Friendship
+from .models.user import User
+from .social.search import deferred_fts_sync
+
+# Foreign-key order: every table only points at tables before it.
+TABLES = (User, Friendship, Pet, CareRequest, CareAssignment, CareRequestArchive, CareAssignmentArchive)
+FORMATS = ("ndjson", "csv")
+MANIFEST = "manifest.json"
+CSV_NULL = "\\N"
+
+
+@dataclass
+class TableTransfer:
+    name: str
+    rows: int = 0
+    bytes: int = 0  # compressed file size
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class TransferResult:
+    format: str
+    tables: list[TableTransfer] = field(default_factory=list)
+    seconds: float = 0.0  # including the rebuilds after an import
+    # An export: when its single read transaction started.
+    snapshot_at: datetime | None = None
+
+    @property
+    def rows(self) -> int:
+        return sum(t.rows for t in self.tables)
+
+
+def _path(directory: Path, name: str, fmt: str) -> Path:
+    return directory / f"{name}.{fmt}.gz"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_encode(value):
+    if value is None:
+        return CSV_NULL
+    if isinstance(value, bool):
+        return int(value)
+    return _encode(value)
+
+
+def _decoder(column, fmt: str):
+    def decode(value):
+        if value is None or (fmt == "csv" and value == CSV_NULL):
+            return None
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if fmt == "csv" and isinstance(column.type, Boolean):
+            return value == "1"
+        if fmt == "csv" and isinstance(column.type, Integer):
+            return int(value)
+        return value
+
+    return decode
+
+
+def _stream(table, chunk_size: int) -> Iterator[Row]:
+    result = db.session.execute(
+        select(table).order_by(*table.primary_key.columns).execution_options(yield_per=chunk_size)
+    )
+    yield from result
+
+
+def _begin_snapshot() -> None:
+    """Start the session's next transaction as one snapshot for all the reads that follow."""
+    db.session.commit()
+    if db.engine.dialect.name == "postgresql":
+        db.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    elif db.engine.dialect.name == "sqlite":
+        # pysqlite opens no transaction for a SELECT; each would see its own snapshot.
+        db.session.connection().exec_driver_sql("BEGIN")
+
+
+def export_tables(directory: str | os.PathLike, fmt: str = "ndjson", chunk_size: int = 5_000) -> TransferResult:
+    """Write every table of ``TABLES`` into ``directory`` from one snapshot; returns the per-table numbers."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    result = TransferResult(format=fmt)
+    _begin_snapshot()
+    result.snapshot_at = datetime.utcnow()
+    for model in TABLES:
+        table = model.__table__
+        names = [c.name for c in table.c]
+        stats = TableTransfer(table.name)
+        t0 = time.perf_counter()
+        path = _path(directory, table.name, fmt)
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+            if fmt == "csv":
+                writer = csv.writer(out)
+                writer.writerow(names)
+                for row in _stream(table, chunk_size):
+                    writer.writerow([_csv_encode(v) for v in row])
+                    stats.rows += 1
+            else:
+                for row in _stream(table, chunk_size):
+                    out.write(json.dumps(dict(zip(names, map(_encode, row))), ensure_ascii=False))
+                    out.write("\n")
+                    stats.rows += 1
+        stats.seconds = time.perf_counter() - t0
+        stats.bytes = path.stat().st_size
+        result.tables.append(stats)
+    db.session.commit()
+
+    manifest = {
+        "format": fmt,
+        "exported_at": result.snapshot_at.isoformat(timespec="seconds"),
+        "snapshot": True,  # all tables read in one transaction
+        "tables": {t.name: t.rows for t in result.tables},
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _read(path: Path, table, fmt: str) -> Iterator[dict]:
+    decoders = {c.name: _decoder(c, fmt) for c in table.c}
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.reader(f)
+            names = next(reader, None)
+            if names is None:
+                raise ValueError(f"{path.name}: empty CSV file, expected a header row")
+            for values in reader:
+                yield {n: decoders[n](v) for n, v in zip(names, values)}
+        else:
+            for line in f:
+                if line.strip():
+                    yield {n: decoders[n](v) for n, v in json.loads(line).items()}
+
+
+def _insert_batches(table, rows: Iterator[dict], chunk_size: int) -> int:
+    done = 0
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            done += len(batch)
+            batch.clear()
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        done += len(batch)
+    return done
+
+
+def _reset_sequences() -> None:
+    if db.engine.dialect.name != "postgresql":
+        return
+    for model in TABLES:
+        table = model.__table__
+        if table.c.id.autoincrement is False:
+            continue
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+        ))
+    db.session.commit()
+
+
+def import_tables(directory: str | os.PathLike, chunk_size: int = 5_000) -> TransferResult:
+    """Load an export written by ``export_tables`` into empty tables, then rebuild the derived ones."""
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+    fmt = manifest["format"]
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    busy = [m.__tablename__ for m in TABLES if db.session.scalar(select(func.count()).select_from(m))]
+    if busy:
+        raise ValueError(f"target tables are not empty: {', '.join(busy)} (purge them first)")
+
+    started = time.perf_counter()
+    result = TransferResult(format=fmt)
+    with deferred_fts_sync():
+        for model in TABLES:
+            table = model.__table__
+            path = _path(directory, table.name, fmt)
+            stats = TableTransfer(table.name)
+            if path.exists():
+                t0 = time.perf_counter()
+                stats.rows = _insert_batches(table, _read(path, table, fmt), max(1, chunk_size))
+                stats.seconds = time.perf_counter() - t0
+                stats.bytes = path.stat().st_size
+            result.tables.append(stats)
+
+    _reset_sequences()
+    rebuild_feeds()
+    rebuild_intervals()
+    rollup.backfill()
+    user_stats.rebuild()
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,237 @@
+"""Upkeep of ``user_stats``, the dashboard counters.
+
+Each pet, care request and assignment contributes to at most two counters:
+
+* a pet: ``pets`` of its owner;
+* an ``open`` request: ``open_requests`` of its owner;
+* a ``pending`` assignment: ``pending_approvals`` of the request's owner;
+* an ``active`` assignment: ``active_assignments`` of its sitter.
+
+The ``after_insert`` / ``after_update`` / ``after_delete`` mapper events take
+the difference between a row's contribution before and after the change (so
+only status transitions and reassignments count) and collect it on the
+session. ``after_flush`` writes a flush's differences as upserts in the same
+transaction: one for users known by id, one for owners looked up from their
+request ids.
+
+Core bulk writes bypass the events: seeding calls ``rebuild``, set-based
+status transitions (``app.lifecycle``) call ``add``. ``verify`` compares the
+table with a recount, as ``flask stats-verify`` does.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import cast
+
+from sqlalchemy import case, delete, event, func, insert, inspect, literal, or_, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session, object_session
+
+from .extensions import db
+from .models.assignment import CareAssignment
+from .models.care import CareRequest
+from .models.pet import Pet
+from .models.stats import UserStats
+from .models.user import User
+
+COUNTERS = ("pets", "open_requests", "pending_approvals", "active_assignments")
+
+_PENDING = "user_stats_deltas"
+
+
+def _contribution(obj, value) -> list[tuple[str, int, str]]:
+    """(kind, id, counter) the row counts towards; ``value(key)`` reads a column."""
+    if isinstance(obj, Pet):
+        return [("user", value("owner_id"), "pets")]
+    if isinstance(obj, CareRequest):
+        return [("user", value("owner_id"), "open_requests")] if value("status") == "open" else []
+    status = value("status")
+    if status == "pending":
+        return [("request", value("care_request_id"), "pending_approvals")]
+    if status == "active":
+        return [("user", value("sitter_id"), "active_assignments")]
+    return []
+
+
+def _before(obj):
+    state = inspect(obj)
+
+    def value(key):
+        hist = state.attrs[key].history
+        return hist.deleted[0] if hist.deleted else getattr(obj, key)
+
+    return value
+
+
+def _after(obj):
+    return lambda key: getattr(obj, key)
+
+
+def _record(obj, before, after) -> None:
+    session = object_session(obj)
+    if session is None:
+        return
+    deltas = session.info.setdefault(_PENDING, Counter())
+    if before is not None:
+        for key in _contribution(obj, before):
+            deltas[key] -= 1
+    if after is not None:
+        for key in _contribution(obj, after):
+            deltas[key] += 1
+
+
+def _on_insert(mapper, connection, target) -> None:
+    _record(target, None, _after(target))
+
+
+def _on_update(mapper, connection, target) -> None:
+    _record(target, _before(target), _after(target))
+
+
+def _on_delete(mapper, connection, target) -> None:
+    _record(target, _before(target), None)
+
+
+def _keep_old_value(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+for _model, _keys in (
+    (Pet, ("owner_id",)),
+    (CareRequest, ("owner_id", "status")),
+    (CareAssignment, ("sitter_id", "care_request_id", "status")),
+):
+    event.listen(_model, "after_insert", _on_insert)
+    event.listen(_model, "after_update", _on_update)
+    event.listen(_model, "after_delete", _on_delete)
+    # Load the old value before a set on an expired attribute, so the
+    # update event can still see what the row counted towards.
+    for _key in _keys:
+        event.listen(getattr(_model, _key), "set", _keep_old_value, active_history=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _reset(session, _flush_context, _instances) -> None:
+    # Leftovers of a flush that failed before ``after_flush``.
+    session.info.pop(_PENDING, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply(session, _flush_context) -> None:
+    deltas = session.info.pop(_PENDING, None)
+    if not deltas:
+        return
+    by_user: dict[int, Counter] = {}
+    by_request: dict[int, int] = {}
+    for (kind, key, counter), d in deltas.items():
+        if not d or key is None:
+            continue
+        if kind == "user":
+            by_user.setdefault(key, Counter())[counter] += d
+        else:
+            by_request[key] = by_request.get(key, 0) + d
+    conn = session.connection()
+    if by_user:
+        rows = [{"user_id": uid, **{c: n.get(c, 0) for c in COUNTERS}} for uid, n in by_user.items()]
+        conn.execute(_upsert(_insert().values(rows)))
+    if by_request:
+        delta = case(by_request, value=CareRequest.id)
+        q = (
+            select(CareRequest.owner_id, func.sum(delta))
+            .where(CareRequest.id.in_(by_request))
+            .group_by(CareRequest.owner_id)
+        )
+        conn.execute(_upsert(_insert().from_select(["user_id", "pending_approvals"], q)))
+
+
+def _insert():
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(UserStats)
+
+
+def _upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={c: getattr(UserStats, c) + getattr(stmt.excluded, c) for c in COUNTERS},
+    )
+
+
+def add(counter: str, q) -> None:
+    """Set-based counterpart of the events: add ``q``'s (user_id, delta) rows to ``counter``."""
+    db.session.execute(_upsert(_insert().from_select(["user_id", counter], q)))
+
+
+def _recount():
+    """(user_id, *COUNTERS) recomputed from the base tables, one row per user with any."""
+
+    def part(user_id, counter, q):
+        return q.with_only_columns(
+            user_id.label("user_id"),
+            *((func.count() if c == counter else literal(0)).label(c) for c in COUNTERS),
+        ).group_by(user_id)
+
+    parts = union_all(
+        part(Pet.owner_id, "pets", select(Pet)),
+        part(CareRequest.owner_id, "open_requests",
+             select(CareRequest).where(CareRequest.status == "open")),
+        part(CareRequest.owner_id, "pending_approvals",
+             select(CareRequest)
+             .join(CareAssignment, CareAssignment.care_request_id == CareRequest.id)
+             .where(CareAssignment.status == "pending")),
+        part(CareAssignment.sitter_id, "active_assignments",
+             select(CareAssignment).where(CareAssignment.status == "active")),
+    ).subquery()
+    return select(parts.c.user_id, *(func.sum(parts.c[c]) for c in COUNTERS)).group_by(parts.c.user_id)
+
+
+def rebuild() -> int:
+    """Recompute ``user_stats`` from scratch; returns the row count."""
+    db.session.execute(delete(UserStats))
+    result = db.session.execute(insert(UserStats).from_select(["user_id", *COUNTERS], _recount()))
+    # Cached dashboards were read from the old counters.
+    db.session.execute(User.__table__.update().values(data_version=User.__table__.c.data_version + 1))
+    db.session.commit()
+    return cast(CursorResult, result).rowcount
+
+
+@dataclass
+class StatsDrift:
+    total: int
+    rows: list[tuple]  # (user_id, counter, stored, actual)
+
+    @property
+    def ok(self) -> bool:
+        return self.total == 0
+
+
+def verify(limit: int = 100) -> StatsDrift:
+    """Users whose stored counters differ from a recount; at most ``limit`` listed."""
+    actual = _recount().cte("actual")
+    a_id, *a_cols = actual.c
+
+    def side(recounts):
+        cols = []
+        for c, recount in zip(COUNTERS, recounts):
+            cols += [func.coalesce(getattr(UserStats, c), 0).label(f"stored_{c}"), recount.label(c)]
+        return cols
+
+    # A FULL JOIN as two LEFT JOINs: SQLite only has FULL JOIN from 3.39 on.
+    both = union_all(
+        select(a_id.label("user_id"), *side(func.coalesce(a, 0) for a in a_cols))
+        .select_from(actual.outerjoin(UserStats, UserStats.user_id == a_id)),
+        select(UserStats.user_id, *side(literal(0) for _ in COUNTERS))
+        .select_from(UserStats.__table__.outerjoin(actual, a_id == UserStats.user_id))
+        .where(a_id.is_(None)),
+    ).subquery()
+    user_id = both.c.user_id
+    q = select(*both.c).where(or_(*(both.c[f"stored_{c}"] != both.c[c] for c in COUNTERS)))
+    total = db.session.execute(select(func.count()).select_from(q.subquery())).scalar_one()
+    rows = []
+    for r in db.session.execute(q.order_by(user_id).limit(limit)):
+        for i, counter in enumerate(COUNTERS):
+            stored, recount = r[1 + 2 * i], r[2 + 2 * i]
+            if stored != recount:
+                rows.append((r[0], counter, stored, recount))
+    return StatsDrift(total=total, rows=rows)
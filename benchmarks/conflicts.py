@@ -0,0 +1,152 @@
+"""Overlap-check latency for sitters with long histories, R*Tree against B-tree.
+
+    python -m benchmarks.conflicts
+    python -m benchmarks.conflicts --history 20000 --repeat 200 --out benchmarks/results/conflicts.json
+
+Builds (and caches) a database where a few sitters, and one pet each, have
+``--history`` assignments spread over the past years, then times
+``find_conflicts`` through the R*Tree and through the plain range predicate.
+Past assignments stay ``active``/``pending`` until something closes them, which
+is exactly what makes the B-tree path slow.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.assignments.intervals import _TREES, _conflicts, rebuild_intervals
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.pet import Pet
+from app.models.user import User
+
+from .datasets import CACHE_DIR, SEED, SEED_NOW, make_app, schema_digest
+from .run import percentile
+
+SITTERS = 5
+YEARS = 8
+
+
+def dataset_path(history: int) -> Path:
+    return CACHE_DIR / f"conflicts-{history}-seed{SEED}-{schema_digest()}.db"
+
+
+def ensure_dataset(history: int, rebuild: bool = False) -> Path:
+    path = dataset_path(history)
+    if path.exists() and not rebuild:
+        return path
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".building")
+    for p in (tmp, Path(f"{tmp}-wal"), Path(f"{tmp}-shm")):
+        p.unlink(missing_ok=True)
+
+    rng = random.Random(SEED)
+    app = make_app(tmp)
+    with app.app_context():
+        db.create_all()
+        owner = User(email="owner@bench", name="Owner", password_hash="x", is_owner=True)
+        sitters = [User(email=f"s{i}@bench", name=f"Sitter {i}", password_hash="x", is_sitter=True)
+                   for i in range(SITTERS)]
+        db.session.add_all([owner, *sitters])
+        db.session.flush()
+        pets = [Pet(owner_id=owner.id, name=f"Pet {i}", species="Dog") for i in range(SITTERS)]
+        db.session.add_all(pets)
+        db.session.flush()
+        cr = CareRequest(owner_id=owner.id, start_at=SEED_NOW, end_at=SEED_NOW + timedelta(hours=1),
+                         status="confirmed")
+        db.session.add(cr)
+        db.session.flush()
+
+        span = int(timedelta(days=365 * YEARS).total_seconds())
+        rows = []
+        for sitter, pet in zip(sitters, pets):
+            for _ in range(history):
+                start = SEED_NOW - timedelta(seconds=rng.randrange(span))
+                rows.append({
+                    "care_request_id": cr.id,
+                    "sitter_id": sitter.id,
+                    "pet_id": pet.id,
+                    "start_at": start,
+                    "end_at": start + timedelta(hours=rng.choice([2, 4, 8, 24, 72])),
+                    "status": rng.choices(["active", "pending", "done", "declined"], [5, 2, 2, 1])[0],
+                })
+        db.session.execute(CareAssignment.__table__.insert(), rows)
+        db.session.commit()
+        rebuild_intervals()
+        db.session.execute(db.text("ANALYZE"))
+        db.session.execute(db.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+
+    tmp.replace(path)
+    return path
+
+
+def _windows() -> dict[str, tuple[datetime, datetime]]:
+    return {
+        "next week": (SEED_NOW + timedelta(days=7), SEED_NOW + timedelta(days=7, hours=8)),
+        "yesterday": (SEED_NOW - timedelta(days=1), SEED_NOW - timedelta(days=1) + timedelta(hours=8)),
+        "3 years ago": (SEED_NOW - timedelta(days=3 * 365), SEED_NOW - timedelta(days=3 * 365, hours=-8)),
+    }
+
+
+def run(history: int, repeat: int) -> dict:
+    path = ensure_dataset(history)
+    app = make_app(path)
+    results: dict[str, dict] = {}
+    with app.app_context():
+        sitter_id = db.session.query(CareAssignment.sitter_id).limit(1).scalar()
+        pet_id = db.session.query(CareAssignment.pet_id).limit(1).scalar()
+        for label, (start, end) in _windows().items():
+            for kind, key_attr, key, tree in (
+                ("sitter", "sitter_id", sitter_id, _TREES[0][0]),
+                ("pet", "pet_id", pet_id, _TREES[1][0]),
+            ):
+                for path_name, use in (("rtree", tree), ("btree", None)):
+                    timings = []
+                    found = None
+                    for _ in range(repeat):
+                        t = time.perf_counter()
+                        found = _conflicts(start, end, key_attr, key, ("pending", "active"), None, use).first()
+                        timings.append((time.perf_counter() - t) * 1000.0)
+                    results.setdefault(f"{kind} / {label}", {})[path_name] = {
+                        "hit": found is not None,
+                        "p50_ms": round(percentile(timings, 50), 3),
+                        "p95_ms": round(percentile(timings, 95), 3),
+                    }
+    return {"meta": {"history": history, "sitters": SITTERS, "repeat": repeat}, "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.conflicts")
+    parser.add_argument("--history", type=int, default=5_000, help="Assignments per sitter.")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    report = run(args.history, args.repeat)
+    print(f"history={args.history:,} per sitter, repeat={args.repeat}")
+    print(f"{'lookup':<26} {'rtree p50':>10} {'rtree p95':>10} {'btree p50':>10} {'btree p95':>10}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<26} {r['rtree']['p50_ms']:>8.3f}ms {r['rtree']['p95_ms']:>8.3f}ms "
+            f"{r['btree']['p50_ms']:>8.3f}ms {r['btree']['p95_ms']:>8.3f}ms"
+        )
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Scaled benchmark databases, seeded once and cached on disk."""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app import create_app
+from app.extensions import db
+from app.seeding import SeedSpec, seed_bulk
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+# Users per scale; the seed mix yields roughly 13 rows per user across tables.
+SCALES = {
+    "10k": 750,
+    "100k": 7_500,
+    "1m": 75_000,
+}
+
+SEED = 42
+# A fixed anchor keeps cached datasets identical between machines and runs.
+SEED_NOW = datetime(2026, 1, 15, 12, 0)
+
+
+def schema_digest() -> str:
+    """Short hash of the model DDL, so schema changes invalidate cached datasets."""
+    dialect = sqlite_dialect.dialect()
+    ddl = []
+    for table in db.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(ix).compile(dialect=dialect)) for ix in sorted(table.indexes, key=lambda i: i.name))
+    return hashlib.sha1("\n".join(ddl).encode()).hexdigest()[:8]
+
+
+def dataset_path(scale: str) -> Path:
+    return CACHE_DIR / f"paw-{scale}-seed{SEED}-{schema_digest()}.db"
+
+
+def make_app(db_path: Path):
+    return create_app({
+        "TESTING": True,
+        "WTF_CSRF_ENABLED": False,
+        "SECRET_KEY": "bench",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path.as_posix()}",
+    })
+
+
+def ensure_dataset(scale: str, rebuild: bool = False) -> Path:
+    if scale not in SCALES:
+        raise ValueError(f"unknown scale {scale!r}; choose from {', '.join(SCALES)}")
+    path = dataset_path(scale)
+    if path.exists() and not rebuild:
+        return path
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".building")
+    for p in (tmp, Path(f"{tmp}-wal"), Path(f"{tmp}-shm")):
+        p.unlink(missing_ok=True)
+
+    app = make_app(tmp)
+    with app.app_context():
+        db.create_all()
+        spec = SeedSpec(
+            users=SCALES[scale],
+            pets_per_owner_min=1,
+            pets_per_owner_max=3,
+            reqs_per_pet_min=2,
+            reqs_per_pet_max=5,
+            seed=SEED,
+            now=SEED_NOW,
+        )
+        seed_bulk(spec, chunk_size=20_000, workers=os.cpu_count() or 1)
+        db.session.execute(db.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        db.session.remove()
+        db.engine.dispose()
+
+    tmp.replace(path)
+    return path
+
+
+def working_copy(scale: str) -> Path:
+    """Copy the cached dataset so a run can write to it without touching the cache."""
+    src = ensure_dataset(scale)
+    dst = CACHE_DIR / f"work-{scale}.db"
+    for p in (dst, Path(f"{dst}-wal"), Path(f"{dst}-shm")):
+        p.unlink(missing_ok=True)
+    with sqlite3.connect(src) as s, sqlite3.connect(dst) as d:
+        s.backup(d)
+    return dst
@@ -0,0 +1,173 @@
+"""Per-row action cost on long lists: a FlaskForm per row against row-action dicts.
+
+    python -m benchmarks.row_actions
+    python -m benchmarks.row_actions --rows 1000 --repeat 20 --out benchmarks/results/row_actions.json
+
+Builds a throwaway database with ``--rows`` pending applications on one
+request and as many offers, then for the review page, the offers of a request
+and "my offers" times:
+
+* ``forms``: building the per-row FlaskForms the views used to create;
+* ``dicts``: building the ``row_action`` dicts they create now;
+* ``view``: the whole GET as it is served now.
+
+CSRF is enabled, as in production, so the forms pay for their token handling.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from flask_wtf import FlaskForm
+from wtforms import SubmitField
+
+from app import create_app
+from app.assignments.routes import ApproveForm
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.offer import CareOffer
+from app.models.pet import Pet
+from app.models.user import User
+from app.offers.routes import offers_bp
+from app.row_actions import row_action
+
+from .datasets import SEED_NOW
+from .run import percentile
+
+
+class _Submit(FlaskForm):
+    submit = SubmitField()
+
+
+def _per_row_forms(view: str, rows: list) -> None:
+    for r in rows:
+        if view == "review":
+            f = ApproveForm(prefix=f"ap{r.id}")
+            f.start_at.data, f.end_at.data = r.start_at, r.end_at
+            _Submit(prefix=f"dc{r.id}")
+        elif view == "offers":
+            _Submit(prefix=f"a{r.id}")
+            _Submit(prefix=f"d{r.id}")
+        else:
+            _Submit(prefix=f"w{r.id}")
+
+
+def _per_row_dicts(view: str, rows: list) -> None:
+    for r in rows:
+        if view == "review":
+            row_action("assignments.approve_assignment", "approve", r.id, "Approve", assign_id=r.id)
+            row_action("assignments.decline_assignment", "decline", r.id, "Decline", assign_id=r.id)
+        elif view == "offers":
+            row_action("offers.offer_accept", "accept", r.id, "Accept", offer_id=r.id)
+            row_action("offers.offer_decline", "decline", r.id, "Decline", offer_id=r.id)
+        else:
+            row_action("offers.offer_withdraw", "withdraw", r.id, "Withdraw", offer_id=r.id)
+
+
+def _build(app, rows: int) -> dict:
+    with app.app_context():
+        db.create_all()
+        owner = User(email="owner@bench", name="Owner", password_hash="x", is_owner=True)
+        sitter = User(email="sitter@bench", name="Sitter", password_hash="x", is_sitter=True)
+        db.session.add_all([owner, sitter])
+        db.session.flush()
+        pet = Pet(owner_id=owner.id, name="Pet", species="Dog")
+        db.session.add(pet)
+        db.session.flush()
+        cr = CareRequest(owner_id=owner.id, pet_id=pet.id, start_at=SEED_NOW,
+                         end_at=SEED_NOW + timedelta(days=rows), status="open")
+        db.session.add(cr)
+        db.session.flush()
+        db.session.add_all(
+            CareAssignment(care_request_id=cr.id, sitter_id=sitter.id, pet_id=pet.id,
+                           start_at=SEED_NOW + timedelta(days=i),
+                           end_at=SEED_NOW + timedelta(days=i, hours=4), status="pending")
+            for i in range(rows)
+        )
+        db.session.add_all(
+            CareOffer(care_request_id=cr.id, sitter_id=sitter.id, status="offered")
+            for _ in range(rows)
+        )
+        db.session.commit()
+        ctx = {"owner": owner.id, "sitter": sitter.id, "request": cr.id}
+        db.session.remove()
+    return ctx
+
+
+def run(rows: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "TESTING": True,
+            "SECRET_KEY": "bench",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{(Path(tmp) / 'rows.db').as_posix()}",
+        })
+        app.register_blueprint(offers_bp)
+        ctx = _build(app, rows)
+
+        views = {
+            "review": ("owner", "/assignments/review"),
+            "offers": ("owner", f"/offers/request/{ctx['request']}"),
+            "mine": ("sitter", "/offers/mine"),
+        }
+        results: dict[str, dict] = {}
+        for view, (actor, path) in views.items():
+            with app.app_context():
+                items = CareAssignment.query.all() if view == "review" else CareOffer.query.all()
+                db.session.expunge_all()
+
+            timings: dict[str, list[float]] = {"forms": [], "dicts": [], "view": []}
+            for _ in range(repeat):
+                for name, fn in (("forms", _per_row_forms), ("dicts", _per_row_dicts)):
+                    with app.test_request_context(path):
+                        t = time.perf_counter()
+                        fn(view, items)
+                        timings[name].append((time.perf_counter() - t) * 1000.0)
+
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess["_user_id"] = str(ctx[actor])
+                sess["_fresh"] = True
+            for _ in range(repeat):
+                t = time.perf_counter()
+                rv = client.get(path)
+                timings["view"].append((time.perf_counter() - t) * 1000.0)
+                assert rv.status_code == 200, (path, rv.status_code)
+
+            results[view] = {
+                name: {"p50_ms": round(percentile(ts, 50), 3), "p95_ms": round(percentile(ts, 95), 3)}
+                for name, ts in timings.items()
+            }
+    return {"meta": {"rows": rows, "repeat": repeat}, "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.row_actions")
+    parser.add_argument("--rows", type=int, default=1_000, help="Rows per list.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.repeat)
+    print(f"rows={args.rows:,}, repeat={args.repeat}")
+    print(f"{'view':<8} {'forms p50':>10} {'dicts p50':>10} {'view p50':>10} {'view p95':>10}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<8} {r['forms']['p50_ms']:>8.2f}ms {r['dicts']['p50_ms']:>8.2f}ms "
+            f"{r['view']['p50_ms']:>8.2f}ms {r['view']['p95_ms']:>8.2f}ms"
+        )
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Endpoint benchmarks against cached, scaled datasets.
+
+    python -m benchmarks.run --scale 10k
+    python -m benchmarks.run --scale 100k --out benchmarks/results/100k.json
+    python -m benchmarks.run --scale 100k --compare benchmarks/baselines/100k.json
+
+Every scenario goes through the Flask test client against a working copy of
+the cached dataset. Latency percentiles and SQL statement counts are written
+as JSON. ``--compare`` exits with status 1 when a scenario regressed against
+the stored baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import event, func
+
+from app.extensions import db
+from app.matching.feed import publish_request
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.feed import SitterFeed
+from app.models.pet import Pet
+from app.models.social import Friendship
+from app.models.user import User
+from app.pagination import encode_cursor
+
+from .datasets import SCALES, make_app, working_copy
+
+# ``per_page`` of matching.open_friend_requests.
+FEED_PER_PAGE = 10
+
+
+@dataclass
+class Scenario:
+    name: str
+    actor: str
+    method: str
+    path: Callable[[dict], str]
+    data: Callable[[dict], dict] | None = None
+
+
+SCENARIOS = [
+    Scenario("dashboard", "owner", "GET", lambda c: "/dashboard"),
+    Scenario("matching.open_friend_requests", "sitter", "GET", lambda c: "/requests/friends/open"),
+    Scenario(
+        "matching.open_friend_requests[last]",
+        "sitter",
+        "GET",
+        lambda c: f"/requests/friends/open?cursor={c['feed_last_cursor']}",
+    ),
+    Scenario("social.search", "sitter", "GET", lambda c: "/social/search?q=mar"),
+    Scenario("analytics.overview", "owner", "GET", lambda c: "/analytics"),
+    Scenario("assignments.list_assignments", "owner", "GET", lambda c: "/assignments"),
+    Scenario("assignments.review_list", "owner", "GET", lambda c: "/assignments/review"),
+    Scenario(
+        "matching.apply_request[overlap]",
+        "sitter",
+        "POST",
+        lambda c: f"/requests/{c['apply_req_id']}/apply",
+        lambda c: {"start_at": c["apply_start"], "end_at": c["apply_end"]},
+    ),
+]
+
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _pick_actors() -> dict:
+    """Choose the heaviest owner and sitter and stage the apply overlap path."""
+    owner_id = (
+        db.session.query(CareRequest.owner_id)
+        .join(CareAssignment, CareAssignment.care_request_id == CareRequest.id)
+        .filter(CareAssignment.status == "pending")
+        .group_by(CareRequest.owner_id)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+
+    friends = (
+        db.session.query(Friendship.addressee_id.label("uid"))
+        .filter(Friendship.status == "accepted")
+        .union_all(
+            db.session.query(Friendship.requester_id).filter(Friendship.status == "accepted")
+        )
+        .subquery()
+    )
+    sitter_id = (
+        db.session.query(friends.c.uid)
+        .join(User, User.id == friends.c.uid)
+        .filter(User.is_sitter.is_(True))
+        .group_by(friends.c.uid)
+        .order_by(func.count().desc())
+        .limit(1)
+        .scalar()
+    )
+
+    friend = (
+        db.session.query(Pet)
+        .join(
+            Friendship,
+            ((Friendship.requester_id == sitter_id) & (Friendship.addressee_id == Pet.owner_id))
+            | ((Friendship.addressee_id == sitter_id) & (Friendship.requester_id == Pet.owner_id)),
+        )
+        .filter(Friendship.status == "accepted")
+        .first()
+    )
+
+    # Stage an open request from a friend plus an overlapping pending
+    # assignment for the sitter, so the POST stops at the overlap check.
+    start = (datetime.utcnow() + timedelta(days=2)).replace(second=0, microsecond=0)
+    end = start + timedelta(hours=8)
+    req = CareRequest(owner_id=friend.owner_id, pet_id=friend.id, start_at=start, end_at=end, status="open")
+    other = CareRequest(owner_id=friend.owner_id, pet_id=friend.id, start_at=start, end_at=end, status="assigned")
+    db.session.add_all([req, other])
+    db.session.flush()
+    db.session.add(
+        CareAssignment(
+            care_request_id=other.id,
+            sitter_id=sitter_id,
+            pet_id=friend.id,
+            start_at=start,
+            end_at=end,
+            status="pending",
+        )
+    )
+    publish_request(req)
+    db.session.commit()
+
+    # Cursor for the last page of the sitter's feed, to compare against page 1.
+    # The view pages ``sitter_feed`` ascending by (start_at, care_request_id),
+    # so the cursor is the row just before the final FEED_PER_PAGE rows.
+    boundary = (
+        db.session.query(SitterFeed.start_at, SitterFeed.care_request_id)
+        .filter(SitterFeed.sitter_id == sitter_id)
+        .order_by(SitterFeed.start_at.desc(), SitterFeed.care_request_id.desc())
+        .offset(FEED_PER_PAGE)
+        .limit(1)
+        .one_or_none()
+    )
+
+    return {
+        "owner": owner_id,
+        "sitter": sitter_id,
+        "apply_req_id": req.id,
+        "apply_start": start.strftime("%Y-%m-%dT%H:%M"),
+        "apply_end": end.strftime("%Y-%m-%dT%H:%M"),
+        # A feed of one page has no cursor: its last page is page 1.
+        "feed_last_cursor": encode_cursor(tuple(boundary)) if boundary else "",
+    }
+
+
+def _table_counts() -> dict[str, int]:
+    return {
+        m.__tablename__: db.session.query(func.count(m.id)).scalar()
+        for m in (User, Friendship, Pet, CareRequest, CareAssignment)
+    }
+
+
+def run(scale: str, repeat: int, warmup: int, only: list[str] | None) -> dict:
+    db_path = working_copy(scale)
+    app = make_app(db_path)
+    results: dict[str, dict] = {}
+
+    with app.app_context():
+        ctx = _pick_actors()
+        tables = _table_counts()
+        engine = db.engine
+
+    # Requests run outside any app context so each one gets a fresh context,
+    # session and ``g`` exactly like a real request does.
+    statements = [0]
+
+    def _count(*_args, **_kw) -> None:
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        for sc in SCENARIOS:
+            if only and sc.name not in only:
+                continue
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess["_user_id"] = str(ctx[sc.actor])
+                sess["_fresh"] = True
+
+            path = sc.path(ctx)
+            data = sc.data(ctx) if sc.data else None
+            timings: list[float] = []
+            queries: list[int] = []
+            status = None
+            for i in range(warmup + repeat):
+                statements[0] = 0
+                t0 = time.perf_counter()
+                rv = client.open(path, method=sc.method, data=data)
+                elapsed = (time.perf_counter() - t0) * 1000.0
+                status = rv.status_code
+                if i >= warmup:
+                    timings.append(elapsed)
+                    queries.append(statements[0])
+
+            results[sc.name] = {
+                "status": status,
+                "samples": len(timings),
+                "p50_ms": round(percentile(timings, 50), 3),
+                "p95_ms": round(percentile(timings, 95), 3),
+                "p99_ms": round(percentile(timings, 99), 3),
+                "mean_ms": round(sum(timings) / len(timings), 3),
+                "queries": max(queries),
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    return {
+        "meta": {
+            "scale": scale,
+            "users": SCALES[scale],
+            "tables": tables,
+            "repeat": repeat,
+            "warmup": warmup,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return one line per regressed scenario (p50/p95 slower or more queries)."""
+    problems = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = base[key] * (1.0 + threshold)
+            if cur[key] > limit:
+                problems.append(f"{name}: {key} {cur[key]:.2f} > {base[key]:.2f} (+{threshold:.0%})")
+        if cur["queries"] > base["queries"]:
+            problems.append(f"{name}: queries {cur['queries']} > {base['queries']}")
+    return problems
+
+
+def _print_table(report: dict) -> None:
+    print(f"scale={report['meta']['scale']} tables={report['meta']['tables']}")
+    print(f"{'scenario':<36} {'status':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<36} {r['status']:>6} {r['p50_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms "
+            f"{r['p99_ms']:>8.2f}ms {r['queries']:>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", action="append", help="Scenario name; may repeat.")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown (0.20 = 20%%).")
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.repeat, args.warmup, args.only)
+    _print_table(report)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        problems = compare(report, baseline, args.threshold)
+        for line in problems:
+            print(f"REGRESSION {line}")
+        if problems:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""User search latency, FTS5 against the LIKE fallback.
+
+    python -m benchmarks.search --users 1000000
+    python -m benchmarks.search --users 100000 --repeat 50 --out benchmarks/results/search.json
+
+Builds (and caches) a users-only database, then times ``search_users`` for a
+handful of typed queries on both paths.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from app.extensions import db
+from app.models.user import User
+from app.seeding import FIRST_NAMES, LAST_NAMES
+from app.social.search import _search_fts, _search_like, deferred_fts_sync
+
+from .datasets import CACHE_DIR, SEED, make_app, schema_digest
+from .run import percentile
+
+QUERIES = ["mar", "stoy", "maria petrov", "стоян", "user12345", "user4@paw"]
+BATCH = 50_000
+
+
+def dataset_path(users: int) -> Path:
+    return CACHE_DIR / f"users-{users}-seed{SEED}-{schema_digest()}.db"
+
+
+def ensure_users(users: int, rebuild: bool = False) -> Path:
+    path = dataset_path(users)
+    if path.exists() and not rebuild:
+        return path
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".building")
+    for p in (tmp, Path(f"{tmp}-wal"), Path(f"{tmp}-shm")):
+        p.unlink(missing_ok=True)
+
+    rng = random.Random(SEED)
+    app = make_app(tmp)
+    with app.app_context():
+        db.create_all()
+        insert = User.__table__.insert()
+        with deferred_fts_sync():
+            for start in range(1, users + 1, BATCH):
+                rows = [
+                    {
+                        "id": i,
+                        "email": f"user{i}@paw.com",
+                        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        "password_hash": "x",
+                        "is_owner": True,
+                        "is_sitter": True,
+                    }
+                    for i in range(start, min(start + BATCH, users + 1))
+                ]
+                db.session.execute(insert, rows)
+            db.session.commit()
+        db.session.execute(db.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        db.session.remove()
+        db.engine.dispose()
+
+    tmp.replace(path)
+    return path
+
+
+def run(users: int, repeat: int) -> dict:
+    t0 = time.perf_counter()
+    path = ensure_users(users)
+    built = time.perf_counter() - t0
+    app = make_app(path)
+    results: dict[str, dict] = {}
+    with app.test_request_context():
+        for q in QUERIES:
+            for name, fn in (("fts", _search_fts), ("like", _search_like)):
+                timings = []
+                hits = 0
+                for _ in range(repeat):
+                    t = time.perf_counter()
+                    hits = len(fn(q, None, 50))
+                    timings.append((time.perf_counter() - t) * 1000.0)
+                    db.session.rollback()
+                results.setdefault(q, {})[name] = {
+                    "hits": hits,
+                    "p50_ms": round(percentile(timings, 50), 3),
+                    "p95_ms": round(percentile(timings, 95), 3),
+                }
+    return {"meta": {"users": users, "repeat": repeat, "dataset_s": round(built, 1)}, "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.search")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    report = run(args.users, args.repeat)
+    print(f"users={args.users:,} repeat={args.repeat}")
+    print(f"{'query':<16} {'fts p50':>10} {'fts p95':>10} {'like p50':>10} {'like p95':>10} {'hits':>5}")
+    for q, r in report["results"].items():
+        print(
+            f"{q:<16} {r['fts']['p50_ms']:>8.2f}ms {r['fts']['p95_ms']:>8.2f}ms "
+            f"{r['like']['p50_ms']:>8.2f}ms {r['like']['p95_ms']:>8.2f}ms {r['fts']['hits']:>5}"
+        )
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,4 +16,24 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-nenova")
     SQLALCHEMY_DATABASE_URI = _get_database_uri()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    MAX_CONTENT_LENGTH = 10 * 1024 * 1024 
+    MAX_CONTENT_LENGTH = 10 * 1024 * 1024
+
+    # Opt-in SQL instrumentation: Server-Timing header + rotating slow-query log.
+    SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "0") == "1"
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+    SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG", str(INSTANCE_DIR / "slow_queries.log"))
+    SLOW_QUERY_LOG_BYTES = 5 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS = 5
+    # N+1 detector and per-view query budgets ("log" | "raise"; empty = off).
+    SQL_LAZY_LOADS = os.environ.get("SQL_LAZY_LOADS", "")
+    SQL_LAZY_LOAD_LIMIT = int(os.environ.get("SQL_LAZY_LOAD_LIMIT", "1"))
+    SQL_QUERY_BUDGETS = os.environ.get("SQL_QUERY_BUDGETS", "log")
+    # Accepted-friend id sets per user (LRU entries, TTL in seconds).
+    FRIEND_CACHE_SIZE = int(os.environ.get("FRIEND_CACHE_SIZE", "10000"))
+    FRIEND_CACHE_TTL = float(os.environ.get("FRIEND_CACHE_TTL", "60"))
+    # Defer importing and registering the blueprints until a request needs them
+    # ("1" | "0"; "auto" = only for `flask` commands that don't serve pages).
+    FAST_STARTUP = os.environ.get("FAST_STARTUP", "auto")
+    # Per-user dashboard numbers, keyed by users.data_version (LRU entries, TTL in seconds).
+    DASHBOARD_CACHE_SIZE = int(os.environ.get("DASHBOARD_CACHE_SIZE", "10000"))
+    DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", "300"))
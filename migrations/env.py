@@ -89,9 +89,17 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # Virtual tables (FTS5, R*Tree) and their shadow tables are created by raw
+    # DDL, not by the models, so autogenerate must not try to drop them.
+    virtual_prefixes = ("users_fts", "sitter_intervals", "pet_intervals")
+
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (type_ == "table" and reflected and name.startswith(virtual_prefixes))
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,52 @@
+"""users FTS5 search index
+
+Revision ID: 3735fa7f00e6
+Revises: 96524dc54a0f
+Create Date: 2026-10-17 12:03:27.640915
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3735fa7f00e6'
+down_revision = '96524dc54a0f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other databases keep the LIKE search path.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+        "name, email, content='users', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, name, email) "
+        "VALUES ('delete', old.id, old.name, old.email); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, name, email) "
+        "VALUES ('delete', old.id, old.name, old.email); "
+        "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END"
+    )
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+    op.execute("DROP TABLE IF EXISTS users_fts")
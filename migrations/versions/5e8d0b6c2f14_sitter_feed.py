@@ -0,0 +1,50 @@
+"""sitter_feed fan-out table
+
+Revision ID: 5e8d0b6c2f14
+Revises: c41f2a9b7d30
+Create Date: 2026-10-17 14:05:12.877310
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5e8d0b6c2f14'
+down_revision = 'c41f2a9b7d30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sitter_feed',
+    sa.Column('sitter_id', sa.Integer(), nullable=False),
+    sa.Column('care_request_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['care_request_id'], ['care_requests.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['sitter_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sitter_id', 'care_request_id')
+    )
+    with op.batch_alter_table('sitter_feed', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sitter_feed_care_request_id'), ['care_request_id'], unique=False)
+        batch_op.create_index('ix_sitter_feed_sitter_start', ['sitter_id', 'start_at', 'care_request_id'], unique=False)
+        batch_op.create_index('ix_sitter_feed_sitter_owner', ['sitter_id', 'owner_id'], unique=False)
+
+    # Backfill: one row per open request per accepted friend of its owner.
+    op.execute(
+        "INSERT INTO sitter_feed (sitter_id, care_request_id, owner_id, start_at) "
+        "SELECT CASE WHEN f.user_low_id = r.owner_id THEN f.user_high_id ELSE f.user_low_id END, "
+        "       r.id, r.owner_id, r.start_at "
+        "FROM care_requests AS r "
+        "JOIN friendships AS f ON f.user_low_id = r.owner_id OR f.user_high_id = r.owner_id "
+        "WHERE f.status = 'accepted' AND r.status = 'open'"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('sitter_feed', schema=None) as batch_op:
+        batch_op.drop_index('ix_sitter_feed_sitter_owner')
+        batch_op.drop_index('ix_sitter_feed_sitter_start')
+        batch_op.drop_index(batch_op.f('ix_sitter_feed_care_request_id'))
+
+    op.drop_table('sitter_feed')
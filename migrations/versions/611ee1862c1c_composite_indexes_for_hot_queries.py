@@ -0,0 +1,47 @@
+"""composite indexes for hot queries
+
+Revision ID: 611ee1862c1c
+Revises: 081dd431528a
+Create Date: 2026-10-17 09:12:40.118402
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '611ee1862c1c'
+down_revision = '081dd431528a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_care_requests_status_owner_start', ['status', 'owner_id', 'start_at'], unique=False)
+        batch_op.create_index('ix_care_requests_owner_start', ['owner_id', 'start_at'], unique=False)
+
+    with op.batch_alter_table('care_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_care_assignments_sitter_status_start_end', ['sitter_id', 'status', 'start_at', 'end_at'], unique=False)
+        batch_op.create_index('ix_care_assignments_pet_status_start_end', ['pet_id', 'status', 'start_at', 'end_at'], unique=False)
+        batch_op.create_index('ix_care_assignments_request_status', ['care_request_id', 'status'], unique=False)
+
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.create_index('ix_friendships_status_requester', ['status', 'requester_id', 'addressee_id'], unique=False)
+        batch_op.create_index('ix_friendships_status_addressee', ['status', 'addressee_id', 'requester_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.drop_index('ix_friendships_status_addressee')
+        batch_op.drop_index('ix_friendships_status_requester')
+
+    with op.batch_alter_table('care_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_assignments_request_status')
+        batch_op.drop_index('ix_care_assignments_pet_status_start_end')
+        batch_op.drop_index('ix_care_assignments_sitter_status_start_end')
+
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_requests_owner_start')
+        batch_op.drop_index('ix_care_requests_status_owner_start')
@@ -0,0 +1,62 @@
+"""canonical friendship pairs
+
+Revision ID: 96524dc54a0f
+Revises: 611ee1862c1c
+Create Date: 2026-10-17 10:41:05.522930
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '96524dc54a0f'
+down_revision = '611ee1862c1c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_low_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('user_high_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        "UPDATE friendships SET "
+        "user_low_id = CASE WHEN requester_id < addressee_id THEN requester_id ELSE addressee_id END, "
+        "user_high_id = CASE WHEN requester_id < addressee_id THEN addressee_id ELSE requester_id END"
+    )
+
+    # Requests sent in both directions mean both users agreed.
+    op.execute(
+        "UPDATE friendships SET status = 'accepted' "
+        "WHERE status = 'pending' AND EXISTS ("
+        "  SELECT 1 FROM friendships AS f2"
+        "  WHERE f2.requester_id = friendships.addressee_id"
+        "    AND f2.addressee_id = friendships.requester_id"
+        "    AND f2.status = 'pending')"
+    )
+
+    # Keep one row per pair: an accepted one if there is any, else the oldest.
+    op.execute(
+        "DELETE FROM friendships WHERE id NOT IN ("
+        "  SELECT id FROM ("
+        "    SELECT id, ROW_NUMBER() OVER ("
+        "      PARTITION BY user_low_id, user_high_id"
+        "      ORDER BY CASE status WHEN 'accepted' THEN 0 ELSE 1 END, id"
+        "    ) AS rn FROM friendships"
+        "  ) AS ranked WHERE rn = 1)"
+    )
+
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.alter_column('user_low_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('user_high_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('uq_friendships_pair', ['user_low_id', 'user_high_id'])
+        batch_op.create_index('ix_friendships_pair_high', ['user_high_id', 'user_low_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('friendships', schema=None) as batch_op:
+        batch_op.drop_index('ix_friendships_pair_high')
+        batch_op.drop_constraint('uq_friendships_pair', type_='unique')
+        batch_op.drop_column('user_high_id')
+        batch_op.drop_column('user_low_id')
@@ -0,0 +1,42 @@
+"""assignment interval R*Trees
+
+Revision ID: 9b2e47d1a6c8
+Revises: 5e8d0b6c2f14
+Create Date: 2026-10-17 15:02:44.019653
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9b2e47d1a6c8'
+down_revision = '5e8d0b6c2f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # R*Tree is SQLite-only; other databases use the B-tree range predicate.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for tree, key in (('sitter_intervals', 'sitter_id'), ('pet_intervals', 'pet_id')):
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {tree} "
+            "USING rtree(id, key_lo, key_hi, t_lo, t_hi)"
+        )
+        op.execute(
+            f"INSERT INTO {tree} (id, key_lo, key_hi, t_lo, t_hi) "
+            f"SELECT id, {key}, {key}, "
+            "CAST(strftime('%s', start_at) AS INTEGER), "
+            "CAST(strftime('%s', end_at) AS INTEGER) + 1 "
+            f"FROM care_assignments WHERE {key} IS NOT NULL "
+            "AND status IN ('pending', 'active')"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TABLE IF EXISTS pet_intervals")
+    op.execute("DROP TABLE IF EXISTS sitter_intervals")
@@ -0,0 +1,30 @@
+"""(status, end_at) indexes for the lifecycle worker
+
+Revision ID: a7d3e5b9c2f4
+Revises: f2a9c4d7b318
+Create Date: 2026-10-17 20:41:03.552190
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5b9c2f4'
+down_revision = 'f2a9c4d7b318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('care_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_care_assignments_status_end', ['status', 'end_at'], unique=False)
+
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_care_requests_status_end', ['status', 'end_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_requests_status_end')
+
+    with op.batch_alter_table('care_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_assignments_status_end')
@@ -0,0 +1,67 @@
+"""care_requests_archive and care_assignments_archive
+
+Revision ID: b3f8d2a6c914
+Revises: a7d3e5b9c2f4
+Create Date: 2026-10-17 21:12:47.904315
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8d2a6c914'
+down_revision = 'a7d3e5b9c2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('care_requests_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('pet_id', sa.Integer(), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('location_text', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['pet_id'], ['pets.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('care_requests_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_care_requests_archive_owner_start', ['owner_id', 'start_at'], unique=False)
+
+    op.create_table('care_assignments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('care_request_id', sa.Integer(), nullable=False),
+    sa.Column('sitter_id', sa.Integer(), nullable=False),
+    sa.Column('pet_id', sa.Integer(), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('sitter_note', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['care_request_id'], ['care_requests_archive.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['pet_id'], ['pets.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['sitter_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('care_assignments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_care_assignments_archive_care_request_id'), ['care_request_id'], unique=False)
+        batch_op.create_index('ix_care_assignments_archive_sitter_start', ['sitter_id', 'start_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('care_assignments_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_assignments_archive_sitter_start')
+        batch_op.drop_index(batch_op.f('ix_care_assignments_archive_care_request_id'))
+
+    op.drop_table('care_assignments_archive')
+    with op.batch_alter_table('care_requests_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_requests_archive_owner_start')
+
+    op.drop_table('care_requests_archive')
@@ -0,0 +1,29 @@
+"""care_requests keyset index
+
+Revision ID: c41f2a9b7d30
+Revises: 3735fa7f00e6
+Create Date: 2026-10-17 13:20:51.204117
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c41f2a9b7d30'
+down_revision = '3735fa7f00e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_requests_status_owner_start')
+        batch_op.create_index('ix_care_requests_status_owner_start_id', ['status', 'owner_id', 'start_at', 'id'], unique=False)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE care_requests')
+
+
+def downgrade():
+    with op.batch_alter_table('care_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_requests_status_owner_start_id')
+        batch_op.create_index('ix_care_requests_status_owner_start', ['status', 'owner_id', 'start_at'], unique=False)
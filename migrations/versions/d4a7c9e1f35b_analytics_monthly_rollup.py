@@ -0,0 +1,53 @@
+"""analytics_monthly rollup
+
+Revision ID: d4a7c9e1f35b
+Revises: 9b2e47d1a6c8
+Create Date: 2026-10-17 18:42:37.105114
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c9e1f35b'
+down_revision = '9b2e47d1a6c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_monthly',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=10), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'role', 'month', 'status')
+    )
+
+    # Backfill: the same aggregation as ``app.analytics.rollup.backfill``.
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "to_char({t}.start_at, 'YYYY-MM')"
+        hours = "extract(epoch FROM {t}.end_at - {t}.start_at) / 3600.0"
+    else:
+        month = "strftime('%Y-%m', {t}.start_at)"
+        hours = "(julianday({t}.end_at) - julianday({t}.start_at)) * 24.0"
+    for role, table, user_col in (
+        ('owner', 'care_requests', 'owner_id'),
+        ('sitter', 'care_assignments', 'sitter_id'),
+    ):
+        m = month.format(t=table)
+        h = hours.format(t=table)
+        op.execute(
+            "INSERT INTO analytics_monthly (user_id, role, month, status, count, hours) "
+            f"SELECT {user_col}, '{role}', {m}, status, count(*), "
+            f"sum(CASE WHEN end_at > start_at THEN {h} ELSE 0.0 END) "
+            f"FROM {table} WHERE {user_col} IS NOT NULL "
+            f"GROUP BY {user_col}, {m}, status"
+        )
+
+
+def downgrade():
+    op.drop_table('analytics_monthly')
@@ -0,0 +1,25 @@
+"""users.data_version for analytics ETags
+
+Revision ID: e8b3f0a6d2c4
+Revises: d4a7c9e1f35b
+Create Date: 2026-10-17 19:20:51.440326
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f0a6d2c4'
+down_revision = 'd4a7c9e1f35b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    # A batch copy of ``users`` trips over the foreign keys pointing at it;
+    # SQLite >= 3.35 drops the column in place.
+    op.execute('ALTER TABLE users DROP COLUMN data_version')
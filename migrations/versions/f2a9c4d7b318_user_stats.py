@@ -0,0 +1,48 @@
+"""user_stats dashboard counters
+
+Revision ID: f2a9c4d7b318
+Revises: e8b3f0a6d2c4
+Create Date: 2026-10-17 20:05:12.318544
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c4d7b318'
+down_revision = 'e8b3f0a6d2c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('pets', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('open_requests', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pending_approvals', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('active_assignments', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill: the same recount as ``app.user_stats.rebuild``.
+    op.execute(
+        "INSERT INTO user_stats (user_id, pets, open_requests, pending_approvals, active_assignments) "
+        "SELECT user_id, sum(pets), sum(open_requests), sum(pending_approvals), sum(active_assignments) "
+        "FROM ("
+        " SELECT owner_id AS user_id, count(*) AS pets, 0 AS open_requests,"
+        " 0 AS pending_approvals, 0 AS active_assignments FROM pets GROUP BY owner_id"
+        " UNION ALL SELECT owner_id, 0, count(*), 0, 0 FROM care_requests"
+        " WHERE status = 'open' GROUP BY owner_id"
+        " UNION ALL SELECT r.owner_id, 0, 0, count(*), 0 FROM care_requests r"
+        " JOIN care_assignments a ON a.care_request_id = r.id"
+        " WHERE a.status = 'pending' GROUP BY r.owner_id"
+        " UNION ALL SELECT sitter_id, 0, 0, 0, count(*) FROM care_assignments"
+        " WHERE status = 'active' GROUP BY sitter_id"
+        ") AS counts GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
@@ -3,6 +3,7 @@ import sys
 from datetime import datetime, timedelta
 
 import pytest
+from sqlalchemy import func
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if ROOT_DIR not in sys.path:
@@ -10,11 +11,13 @@ if ROOT_DIR not in sys.path:
 
 from app import create_app
 from app.extensions import db
+from app.matching.feed import publish_request
 from app.models.assignment import CareAssignment
 from app.models.care import CareRequest
 from app.models.pet import Pet
 from app.models.social import Friendship
 from app.models.user import User
+from app.seeding import SeedSpec, seed_bulk
 
 def _assert_memory_db(uri: str):
     if uri != "sqlite:///:memory:":
@@ -28,8 +31,7 @@ def app():
     os.environ["FLASK_ENV"] = "testing"
     os.environ.pop("DATABASE_URL", None)
 
-    flask_app = create_app()
-    flask_app.config.update(
+    flask_app = create_app(dict(
         TESTING=True,
         SECRET_KEY="test-secret-key",
         WTF_CSRF_ENABLED=False,
@@ -37,7 +39,7 @@ def app():
         SQLALCHEMY_ENGINE_OPTIONS={"connect_args": {"check_same_thread": False}},
         SERVER_NAME="localhost",
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
-    )
+    ))
 
     _assert_memory_db(flask_app.config["SQLALCHEMY_DATABASE_URI"])
 
@@ -93,6 +95,7 @@ def sample_data(app, make_user):
         status="open",
     )
     db.session.add(cr)
+    publish_request(cr)
     db.session.commit()
 
     return {
@@ -109,4 +112,62 @@ def future_interval():
     return (
         (now + timedelta(days=1, hours=2)).strftime("%Y-%m-%dT%H:%M"),
         (now + timedelta(days=1, hours=20)).strftime("%Y-%m-%dT%H:%M"),
-    )
\ No newline at end of file
+    )
+
+@pytest.fixture(scope="module")
+def scaled(tmp_path_factory):
+    """Seeded dataset shared by a test module, with a staged open request.
+
+    Lazy loads and query budgets are set to raise.
+    """
+    app = create_app(dict(
+        TESTING=True,
+        SECRET_KEY="test-secret-key",
+        WTF_CSRF_ENABLED=False,
+        SQLALCHEMY_DATABASE_URI="sqlite:///:memory:",
+        SQL_INSTRUMENTATION=True,
+        SQL_LAZY_LOADS="raise",
+        SQL_QUERY_BUDGETS="raise",
+        SLOW_QUERY_LOG=str(tmp_path_factory.mktemp("logs") / "slow.log"),
+    ))
+    with app.app_context():
+        db.create_all()
+        seed_bulk(SeedSpec(
+            users=80,
+            pets_per_owner_min=2,
+            pets_per_owner_max=4,
+            reqs_per_pet_min=4,
+            reqs_per_pet_max=8,
+            seed=3,
+            now=datetime(2026, 1, 15, 12),
+        ))
+        owner_id = (
+            db.session.query(CareRequest.owner_id)
+            .join(CareAssignment, CareAssignment.care_request_id == CareRequest.id)
+            .filter(CareAssignment.status == "pending")
+            .group_by(CareRequest.owner_id)
+            .order_by(func.count().desc())
+            .limit(1)
+            .scalar()
+        )
+        rel = Friendship.query.filter_by(status="accepted", requester_id=owner_id).first() \
+            or Friendship.query.filter_by(status="accepted", addressee_id=owner_id).first()
+        sitter_id = rel.addressee_id if rel.requester_id == owner_id else rel.requester_id
+        db.session.execute(
+            db.text("UPDATE users SET is_owner = 1, is_sitter = 1 WHERE id IN (:o, :s)"),
+            {"o": owner_id, "s": sitter_id},
+        )
+        start = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(days=3)
+        pet_id = db.session.execute(
+            db.text("SELECT id FROM pets WHERE owner_id = :o LIMIT 1"), {"o": owner_id}
+        ).scalar()
+        cr = CareRequest(owner_id=owner_id, pet_id=pet_id, start_at=start,
+                         end_at=start + timedelta(hours=6), status="open")
+        db.session.add(cr)
+        publish_request(cr)
+        db.session.commit()
+        ctx = {"owner": owner_id, "sitter": sitter_id, "request": cr.id, "start": start}
+        db.session.remove()
+    yield app, ctx
+    with app.app_context():
+        db.drop_all()
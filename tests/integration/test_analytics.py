@@ -1,6 +1,158 @@
+from datetime import datetime, timedelta
+
+from app.analytics import rollup
+from app.analytics.queries import (
+    request_status_counts,
+    requests_per_month,
+    sitter_hours_per_month,
+)
+from app.analytics.routes import _last_n_months_labels
+from app.extensions import db
+from app.models.analytics import AnalyticsMonthly
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+
+
 def test_analytics_page_renders(client, login_as, sample_data):
     login_as(sample_data["owner"])
     rv = client.get("/analytics")
     assert rv.status_code == 200
     assert b"Plotly.newPlot" in rv.data
-    assert b"Requests by status" in rv.data
\ No newline at end of file
+    assert b"Requests by status" in rv.data
+
+def test_series_from_backfilled_rollup(app, sample_data):
+    owner, sitter, pet = sample_data["owner"], sample_data["sitter"], sample_data["pet"]
+    months = _last_n_months_labels(6)
+    first = datetime.strptime(months[0], "%Y-%m")
+    this = datetime.strptime(months[-1], "%Y-%m")
+
+    def request(start, status):
+        cr = CareRequest(owner_id=owner.id, pet_id=pet.id, start_at=start,
+                         end_at=start + timedelta(hours=5), status=status)
+        db.session.add(cr)
+        db.session.flush()
+        return cr
+
+    old = request(first - timedelta(days=400), "done")
+    request(first - timedelta(seconds=1), "cancelled")
+    request(first, "confirmed")
+    request(this + timedelta(days=2, hours=3), "open")
+    for start, hours, status in (
+        (first - timedelta(days=3), 10, "done"),
+        (first + timedelta(hours=1), 2.5, "done"),
+        (first + timedelta(days=1), 1.25, "active"),
+        (first + timedelta(days=2), 8, "declined"),
+        (this + timedelta(hours=6), 24, "pending"),
+    ):
+        db.session.add(CareAssignment(care_request_id=old.id, sitter_id=sitter.id, pet_id=pet.id,
+                                      start_at=start, end_at=start + timedelta(hours=hours),
+                                      status=status))
+    db.session.commit()
+    rollup.backfill()
+
+    assert request_status_counts(owner.id) == {
+        "open": 2, "done": 1, "cancelled": 1, "confirmed": 1
+    }
+    counts = requests_per_month(owner.id, months)
+    assert list(counts) == months
+    assert counts[months[0]] == 1
+    assert sum(counts.values()) == 2 + (sample_data["request"].start_at.strftime("%Y-%m") in months)
+
+    hours = sitter_hours_per_month(sitter.id, months)
+    assert hours[months[0]] == 3.75
+    assert hours[months[-1]] == 24.0
+    assert sum(hours.values()) == 27.75
+
+
+def _snapshot():
+    return {
+        (r.user_id, r.role, r.month, r.status): (r.count, round(r.hours, 6))
+        for r in AnalyticsMonthly.query.all()
+        if r.count or abs(r.hours) > 1e-9
+    }
+
+
+def test_write_paths_keep_rollup_in_step(client, login_as, sample_data):
+    owner, sitter = sample_data["owner"], sample_data["sitter"]
+    rollup.backfill()
+    start = (datetime.utcnow() + timedelta(days=40)).replace(second=0, microsecond=0)
+    fmt = "%Y-%m-%dT%H:%M"
+
+    login_as(owner)
+    client.post("/care/requests/new", data={
+        "pet_id": sample_data["pet"].id,
+        "start_at": start.strftime(fmt),
+        "end_at": (start + timedelta(hours=6)).strftime(fmt),
+    })
+    cr = CareRequest.query.filter_by(start_at=start).one()
+    client.post(f"/care/requests/{cr.id}/edit", data={
+        "pet_id": sample_data["pet"].id,
+        "start_at": (start + timedelta(days=35)).strftime(fmt),
+        "end_at": (start + timedelta(days=35, hours=8)).strftime(fmt),
+    })
+    pending = CareAssignment(care_request_id=cr.id, sitter_id=sitter.id, pet_id=cr.pet_id,
+                             start_at=cr.start_at, end_at=cr.end_at, status="pending")
+    db.session.add(pending)
+    rollup.move(None, rollup.of_assignment(pending))
+    db.session.commit()
+    client.post(f"/assignments/{pending.id}/approve", data={
+        f"ap{pending.id}-start_at": cr.start_at.strftime(fmt),
+        f"ap{pending.id}-end_at": (cr.start_at + timedelta(hours=3)).strftime(fmt),
+        "row": str(pending.id),
+        "action": "approve",
+    })
+    client.post(f"/assignments/{pending.id}/cancel")
+    client.post(f"/care/requests/{sample_data['request'].id}/cancel")
+
+    db.session.expire_all()
+    assert cr.start_at == start + timedelta(days=35)
+    assert pending.status == "cancelled"
+    incremental = _snapshot()
+    rollup.backfill()
+    assert _snapshot() == incremental
+    assert incremental[(owner.id, "owner", cr.start_at.strftime("%Y-%m"), "open")] == (1, 8.0)
+    assert incremental[(sitter.id, "sitter", cr.start_at.strftime("%Y-%m"), "cancelled")] == (1, 3.0)
+
+
+def test_backfill_since_leaves_closed_months_alone(app, sample_data):
+    owner = sample_data["owner"]
+    rollup.backfill()
+    db.session.add(AnalyticsMonthly(user_id=owner.id, role="owner", month="2001-01",
+                                    status="done", count=7, hours=1.0))
+    db.session.commit()
+
+    rollup.backfill(rollup.current_month())
+    assert db.session.get(AnalyticsMonthly, (owner.id, "owner", "2001-01", "done")).count == 7
+    rollup.backfill()
+    assert db.session.get(AnalyticsMonthly, (owner.id, "owner", "2001-01", "done")) is None
+
+
+def test_range_mode(client, login_as, sample_data):
+    login_as(sample_data["owner"])
+    rv = client.get("/analytics?months=24")
+    assert rv.status_code == 200
+    assert b"last 24 months" in rv.data
+
+
+def test_data_json_is_conditional(client, login_as, sample_data):
+    owner = sample_data["owner"]
+    rollup.backfill()
+    login_as(owner)
+
+    rv = client.get("/analytics/data.json?months=12")
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert body["status"] == {"labels": ["open"], "values": [1]}
+    assert len(body["requests"]["labels"]) == 12
+    etag = rv.headers["ETag"]
+
+    again = client.get("/analytics/data.json?months=12", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert client.get("/analytics/data.json?months=6", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post(f"/care/requests/{sample_data['request'].id}/cancel")
+    changed = client.get("/analytics/data.json?months=12", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["status"] == {"labels": ["cancelled"], "values": [1]}
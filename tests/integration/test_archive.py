@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app import archive, user_stats
+from app.analytics import rollup
+from app.extensions import db
+from app.models.archive import CareAssignmentArchive, CareRequestArchive
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+
+LONG_AGO = datetime.utcnow() - timedelta(days=400)
+
+
+def _count(model) -> int:
+    return db.session.scalar(select(func.count()).select_from(model))
+
+
+def _snapshot():
+    from app.models.analytics import AnalyticsMonthly
+
+    return {
+        (r.user_id, r.role, r.month, r.status): (r.count, round(r.hours, 6))
+        for r in AnalyticsMonthly.query.all()
+        if r.count or abs(r.hours) > 1e-9
+    }
+
+
+def _history(sample_data, start, status="confirmed", assignment_status="done", notes=None):
+    owner, sitter, pet = sample_data["owner"], sample_data["sitter"], sample_data["pet"]
+    cr = CareRequest(owner_id=owner.id, pet_id=pet.id, start_at=start, end_at=start + timedelta(hours=8),
+                     status=status, notes=notes)
+    db.session.add(cr)
+    db.session.flush()
+    db.session.add(CareAssignment(care_request_id=cr.id, sitter_id=sitter.id, pet_id=pet.id,
+                                  start_at=cr.start_at, end_at=cr.end_at, status=assignment_status))
+    db.session.commit()
+    return cr
+
+
+def test_archives_finished_history_only(app, sample_data):
+    old_id = _history(sample_data, LONG_AGO).id
+    unfinished = _history(sample_data, LONG_AGO, assignment_status="active")
+    recent = _history(sample_data, datetime.utcnow() - timedelta(days=20))
+    rollup.backfill()
+    charts = _snapshot()
+
+    result = archive.archive(timedelta(days=180))
+    assert (result.requests, result.assignments) == (1, 1)
+
+    assert db.session.get(CareRequestArchive, old_id).assignments.one().status == "done"
+    assert {r.id for r in CareRequest.query} == {sample_data["request"].id, unfinished.id, recent.id}
+    assert _count(CareAssignment) == 2
+    assert user_stats.verify().ok
+
+    rollup.backfill()
+    assert _snapshot() == charts
+
+
+def test_archives_done_requests_with_their_assignments(app, sample_data):
+    done = _history(sample_data, LONG_AGO, status="done")
+    db.session.add(CareAssignment(care_request_id=done.id, sitter_id=sample_data["stranger"].id,
+                                  pet_id=done.pet_id, start_at=done.start_at, end_at=done.end_at,
+                                  status="declined"))
+    db.session.commit()
+    done_id = done.id
+
+    result = archive.archive(timedelta(days=180))
+    assert (result.requests, result.assignments) == (1, 2)
+    assert db.session.get(CareRequest, done_id) is None
+    archived = db.session.get(CareRequestArchive, done_id)
+    assert archived.status == "done"
+    assert sorted(a.status for a in archived.assignments) == ["declined", "done"]
+    assert user_stats.verify().ok
+
+
+def test_archives_in_chunks(app, sample_data):
+    for i in range(5):
+        _history(sample_data, LONG_AGO + timedelta(days=i), status="cancelled", assignment_status="declined")
+
+    result = archive.archive(timedelta(days=180), chunk_size=2)
+    assert result.requests == 5
+    assert result.chunks == 3
+    assert _count(CareAssignmentArchive) == 5
+    assert archive.archive(timedelta(days=180)).requests == 0
+
+
+def test_list_views_include_archived_on_request(client, login_as, sample_data):
+    _history(sample_data, LONG_AGO, notes="Old trip to the sea")
+    archive.archive(timedelta(days=180))
+
+    login_as(sample_data["owner"])
+    assert b"Old trip to the sea" not in client.get("/care/requests").data
+    rv = client.get("/care/requests?archived=1")
+    assert b"Old trip to the sea" in rv.data
+    assert b"Archived" in rv.data
+    assert b"Old trip to the sea" not in client.get("/care/requests?archived=1&status=open").data
+
+    login_as(sample_data["sitter"])
+    assert b"Archived</span>" not in client.get("/assignments").data
+    assert b"Archived</span>" in client.get("/assignments?archived=1").data
+
+
+def test_cli(app, sample_data):
+    _history(sample_data, LONG_AGO)
+    runner = app.test_cli_runner()
+    rv = runner.invoke(args=["archive", "--older-than", "26w", "--chunk-size", "10"])
+    assert rv.exit_code == 0, rv.output
+    assert "2 rows archived in 1 chunks" in rv.output
+
+    rv = runner.invoke(args=["archive", "--older-than", "half a year"])
+    assert rv.exit_code == 2
+    assert "--older-than" in rv.output
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("180d", timedelta(days=180)), ("26w", timedelta(weeks=26)), ("72H", timedelta(hours=72)),
+])
+def test_parse_age(text, expected):
+    assert archive.parse_age(text) == expected
@@ -0,0 +1,128 @@
+import random
+from datetime import timedelta
+
+from app.assignments.batch import BatchItem, approve_batch
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.feed import SitterFeed
+
+
+def _assign(sample_data, start, end, status="pending", sitter=None):
+    a = CareAssignment(
+        care_request_id=sample_data["request"].id,
+        sitter_id=(sitter or sample_data["sitter"]).id,
+        pet_id=sample_data["pet"].id,
+        start_at=start,
+        end_at=end,
+        status=status,
+    )
+    db.session.add(a)
+    db.session.commit()
+    return a
+
+
+def _minutes(cr):
+    # The approve form works in whole minutes.
+    cr.start_at = cr.start_at.replace(second=0, microsecond=0)
+    cr.end_at = cr.end_at.replace(second=0, microsecond=0)
+    db.session.commit()
+    return cr.start_at
+
+
+def test_batch_reports_each_item(client, login_as, sample_data):
+    cr = sample_data["request"]
+    t0 = _minutes(cr)
+    h = timedelta(hours=1)
+    existing = _assign(sample_data, t0 + 20 * h, t0 + 22 * h, status="active",
+                       sitter=sample_data["stranger"])
+    first = _assign(sample_data, t0, t0 + 4 * h)
+    clash = _assign(sample_data, t0 + 2 * h, t0 + 6 * h, sitter=sample_data["stranger"])
+    later = _assign(sample_data, t0 + 6 * h, t0 + 8 * h)
+    blocked = _assign(sample_data, t0 + 21 * h, t0 + 23 * h)
+    adjusted = _assign(sample_data, t0 + 9 * h, t0 + 12 * h, sitter=sample_data["stranger"])
+    outside = _assign(sample_data, t0 + 13 * h, t0 + 30 * h)
+
+    login_as(sample_data["owner"])
+    r = client.post("/assignments/approve-batch", data={
+        "ids": [str(a.id) for a in (first, clash, later, blocked, adjusted, outside)] + ["9999"],
+        f"ap{adjusted.id}-start_at": (t0 + 10 * h).strftime("%Y-%m-%dT%H:%M"),
+        f"ap{adjusted.id}-end_at": (t0 + 11 * h).strftime("%Y-%m-%dT%H:%M"),
+    })
+    assert r.status_code == 200
+    assert b"Approved 3 of 7." in r.data
+
+    db.session.expire_all()
+    assert [first.status, later.status, adjusted.status] == ["active"] * 3
+    assert [clash.status, blocked.status, outside.status] == ["pending"] * 3
+    assert adjusted.start_at == t0 + 10 * h
+    assert f"Conflicts with assignment #{first.id} (pet)".encode() in r.data
+    assert f"Conflicts with assignment #{existing.id} (pet)".encode() in r.data
+    assert b"Outside the request window." in r.data
+    assert b"Not found." in r.data
+
+
+def test_review_page_sends_each_window_with_the_batch(client, login_as, sample_data):
+    cr = sample_data["request"]
+    t0 = _minutes(cr)
+    a = _assign(sample_data, t0, t0 + timedelta(hours=2))
+    login_as(sample_data["owner"])
+    html = client.get("/assignments/review").get_data(as_text=True)
+    for field, value in (("start_at", a.start_at), ("end_at", a.end_at)):
+        assert (
+            f'name="ap{a.id}-{field}" value="{value.strftime("%Y-%m-%dT%H:%M")}" form="batch-approve"'
+        ) in html
+
+
+def test_full_window_confirms_request(client, login_as, sample_data):
+    cr = sample_data["request"]
+    _minutes(cr)
+    a = _assign(sample_data, cr.start_at, cr.end_at)
+    assert SitterFeed.query.filter_by(care_request_id=cr.id).count() == 1
+
+    login_as(sample_data["owner"])
+    client.post("/assignments/approve-batch", data={"ids": [str(a.id)]})
+
+    db.session.expire_all()
+    assert a.status == "active"
+    assert cr.status == "confirmed"
+    assert SitterFeed.query.filter_by(care_request_id=cr.id).count() == 0
+
+
+def test_only_owner_can_batch(client, login_as, sample_data):
+    cr = sample_data["request"]
+    a = _assign(sample_data, cr.start_at, cr.end_at)
+    login_as(sample_data["sitter"])
+    r = client.post("/assignments/approve-batch", data={"ids": [str(a.id)]})
+    assert b"Approved 0 of 1." in r.data
+    db.session.expire_all()
+    assert a.status == "pending"
+
+
+def test_sweep_matches_greedy_reference(app, sample_data):
+    cr = sample_data["request"]
+    cr.end_at = cr.start_at + timedelta(days=30)
+    db.session.commit()
+    rng = random.Random(11)
+    sitters = [sample_data["sitter"], sample_data["stranger"]]
+    rows = []
+    for _ in range(120):
+        start = cr.start_at + timedelta(minutes=rng.randrange(0, 60 * 24 * 28))
+        end = start + timedelta(minutes=rng.choice([30, 90, 240, 600]))
+        rows.append(_assign(sample_data, start, end, status=rng.choice(["pending"] * 3 + ["active"]),
+                            sitter=rng.choice(sitters)))
+    pending = [a for a in rows if a.status == "pending"]
+    active = [a for a in rows if a.status == "active"]
+
+    # Reference: earliest start wins, every pair checked directly.
+    expected, taken = set(), list(active)
+    for a in sorted(pending, key=lambda a: (a.start_at, a.id)):
+        if not any(
+            (b.sitter_id == a.sitter_id or b.pet_id == a.pet_id)
+            and b.start_at < a.end_at and b.end_at > a.start_at
+            for b in taken
+        ):
+            expected.add(a.id)
+            taken.append(a)
+
+    results = approve_batch(sample_data["owner"].id, [BatchItem(a.id) for a in pending])
+    assert {r.assignment_id for r in results if r.ok} == expected
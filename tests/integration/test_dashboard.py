@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import dashboard
+from app.extensions import db
+from app.matching.feed import publish_request
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.pet import Pet
+
+
+def _statements(app, client, path):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("SELECT users.id AS users_id"):  # the login's user load
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        rv = client.get(path)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert rv.status_code == 200
+    return rv, statements
+
+
+def _version(user):
+    db.session.refresh(user)
+    return user.data_version
+
+
+def test_repeat_dashboard_issues_no_statement(app, client, login_as, sample_data):
+    login_as(sample_data["owner"])
+    rv, first = _statements(app, client, "/dashboard")
+    assert len(first) == 2
+    assert b"Roshlyo" in rv.data
+
+    rv, second = _statements(app, client, "/dashboard")
+    assert second == []
+    assert b"Roshlyo" in rv.data
+
+
+def test_stats_follow_writes(app, sample_data):
+    owner, sitter, stranger = sample_data["owner"], sample_data["sitter"], sample_data["stranger"]
+    versions = {u.id: _version(u) for u in (owner, sitter, stranger)}
+
+    db.session.refresh(sitter)
+    assert dashboard.load(sitter).stats["friends_open_reqs"] == 1
+
+    now = datetime.utcnow()
+    cr = CareRequest(owner_id=owner.id, pet_id=sample_data["pet"].id,
+                     start_at=now + timedelta(days=5), end_at=now + timedelta(days=6), status="open")
+    db.session.add(cr)
+    publish_request(cr)
+    db.session.commit()
+
+    # The owner's own request and the friend's feed count both moved.
+    assert _version(owner) > versions[owner.id]
+    assert _version(sitter) > versions[sitter.id]
+    assert _version(stranger) == versions[stranger.id]
+    assert dashboard.load(sitter).stats["friends_open_reqs"] == 2
+
+    db.session.add(CareAssignment(care_request_id=cr.id, sitter_id=sitter.id, pet_id=cr.pet_id,
+                                  start_at=cr.start_at, end_at=cr.end_at, status="pending"))
+    db.session.commit()
+    stats = dashboard.load(owner).stats
+    assert stats["pending_approvals"] == 1
+    assert stats["open_requests"] == 2
+
+    db.session.add(Pet(owner_id=owner.id, name="Sharo", species="Dog"))
+    db.session.commit()
+    dash = dashboard.load(owner)
+    assert dash.stats["pets"] == 2
+    assert [r.pet_name for r in dash.recent] == ["Roshlyo", "Roshlyo"]
+
+
+def test_entry_expires_when_a_running_assignment_ends(app, sample_data):
+    owner, sitter = sample_data["owner"], sample_data["sitter"]
+    now = datetime.utcnow()
+    db.session.add(CareAssignment(care_request_id=sample_data["request"].id, sitter_id=sitter.id,
+                                  pet_id=sample_data["pet"].id, start_at=now - timedelta(hours=1),
+                                  end_at=now + timedelta(seconds=30), status="active"))
+    db.session.commit()
+    db.session.refresh(sitter)
+
+    dash = dashboard.load(sitter)
+    assert dash.stats["sitter_assignments"] == 1
+    assert dash.expires <= time.monotonic() + 31
+    assert dashboard.load(sitter) is dash
+
+
+def test_ended_active_assignment_is_not_counted(app, sample_data):
+    sitter = sample_data["sitter"]
+    now = datetime.utcnow()
+    db.session.add(CareAssignment(care_request_id=sample_data["request"].id, sitter_id=sitter.id,
+                                  pet_id=sample_data["pet"].id, start_at=now - timedelta(hours=3),
+                                  end_at=now - timedelta(hours=1), status="active"))
+    db.session.commit()
+    db.session.refresh(sitter)
+
+    assert dashboard.load(sitter).stats["sitter_assignments"] == 0
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.matching.feed import check_feeds, rebuild_feeds
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.feed import SitterFeed
+from app.models.social import Friendship
+
+
+def _feed(sitter_id):
+    return [
+        (f.care_request_id, f.start_at)
+        for f in SitterFeed.query.filter_by(sitter_id=sitter_id).order_by(SitterFeed.care_request_id)
+    ]
+
+
+def _form(start, end):
+    return {"pet_id": 0, "start_at": start.strftime("%Y-%m-%dT%H:%M"), "end_at": end.strftime("%Y-%m-%dT%H:%M")}
+
+
+def test_request_writes_update_feed(client, login_as, sample_data):
+    owner, sitter, stranger = sample_data["owner"], sample_data["sitter"], sample_data["stranger"]
+    first = sample_data["request"]
+    assert _feed(sitter.id) == [(first.id, first.start_at)]
+    assert _feed(stranger.id) == []
+
+    login_as(owner)
+    start = (datetime.utcnow() + timedelta(days=5)).replace(second=0, microsecond=0)
+    client.post("/care/requests/new", data=_form(start, start + timedelta(hours=3)))
+    new = CareRequest.query.order_by(CareRequest.id.desc()).first()
+    assert _feed(sitter.id) == [(first.id, first.start_at), (new.id, start)]
+
+    later = start + timedelta(days=1)
+    client.post(f"/care/requests/{new.id}/edit", data=_form(later, later + timedelta(hours=3)))
+    assert _feed(sitter.id)[-1] == (new.id, later)
+
+    client.post(f"/care/requests/{new.id}/cancel")
+    assert _feed(sitter.id) == [(first.id, first.start_at)]
+    assert check_feeds().ok
+
+
+def test_confirmed_request_leaves_feed(client, login_as, sample_data):
+    cr = sample_data["request"]
+    # The approve form works in whole minutes.
+    cr.start_at = cr.start_at.replace(second=0, microsecond=0)
+    cr.end_at = cr.end_at.replace(second=0, microsecond=0)
+    db.session.commit()
+    a = CareAssignment(care_request_id=cr.id, sitter_id=sample_data["sitter"].id, pet_id=cr.pet_id,
+                       start_at=cr.start_at, end_at=cr.end_at, status="pending")
+    db.session.add(a)
+    db.session.commit()
+
+    login_as(sample_data["owner"])
+    client.post(f"/assignments/{a.id}/approve", data={
+        f"ap{a.id}-start_at": cr.start_at.strftime("%Y-%m-%dT%H:%M"),
+        f"ap{a.id}-end_at": cr.end_at.strftime("%Y-%m-%dT%H:%M"),
+        "row": str(a.id),
+        "action": "approve",
+    })
+    assert db.session.get(CareRequest, cr.id).status == "confirmed"
+    assert _feed(sample_data["sitter"].id) == []
+    assert check_feeds().ok
+
+
+def test_friendship_accept_and_remove_update_feed(client, login_as, sample_data):
+    owner, stranger, cr = sample_data["owner"], sample_data["stranger"], sample_data["request"]
+    db.session.add(Friendship(requester_id=stranger.id, addressee_id=owner.id, status="pending"))
+    db.session.commit()
+
+    login_as(owner)
+    client.post(f"/social/accept/{stranger.id}")
+    assert _feed(stranger.id) == [(cr.id, cr.start_at)]
+
+    client.post(f"/social/remove/{stranger.id}")
+    assert Friendship.between(owner.id, stranger.id) is None
+    assert _feed(stranger.id) == []
+    assert _feed(sample_data["sitter"].id) == [(cr.id, cr.start_at)]
+    assert check_feeds().ok
+
+
+def test_check_and_rebuild_commands(app, sample_data):
+    cr, sitter = sample_data["request"], sample_data["sitter"]
+    SitterFeed.query.delete()
+    db.session.add(SitterFeed(sitter_id=sample_data["stranger"].id, care_request_id=cr.id,
+                              owner_id=cr.owner_id, start_at=cr.start_at))
+    db.session.commit()
+
+    drift = check_feeds()
+    assert drift.missing == [(sitter.id, cr.id, cr.owner_id, cr.start_at)]
+    assert [r[0] for r in drift.stale] == [sample_data["stranger"].id]
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["check-feeds"])
+    assert result.exit_code == 1
+    assert "1 missing, 1 stale" in result.output
+
+    result = runner.invoke(args=["rebuild-feeds"])
+    assert result.exit_code == 0
+    assert runner.invoke(args=["check-feeds"]).exit_code == 0
+    assert rebuild_feeds() == 1
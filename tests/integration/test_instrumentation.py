@@ -0,0 +1,41 @@
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+
+
+def test_server_timing_and_slow_query_log(tmp_path):
+    log_path = tmp_path / "slow.log"
+    app = create_app(dict(
+        TESTING=True,
+        SECRET_KEY="test-secret-key",
+        WTF_CSRF_ENABLED=False,
+        SQLALCHEMY_DATABASE_URI="sqlite:///:memory:",
+        SQL_INSTRUMENTATION=True,
+        SLOW_QUERY_MS=0,
+        SLOW_QUERY_LOG=str(log_path),
+    ))
+    with app.app_context():
+        db.create_all()
+        user = User(email="owner@example.com", name="Owner", is_owner=True)
+        user.set_password("pass")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+        sess["_fresh"] = True
+
+    rv = client.get("/dashboard")
+    assert rv.status_code == 200
+    timing = rv.headers.getlist("Server-Timing")
+    assert any(t.startswith("db;dur=") and "queries" in t for t in timing)
+    assert any(t.startswith("app;dur=") for t in timing)
+    assert "endpoint=dashboard" in log_path.read_text()
+
+
+def test_instrumentation_is_off_by_default(client, login_as, sample_data):
+    login_as(sample_data["owner"])
+    rv = client.get("/dashboard")
+    assert "Server-Timing" not in rv.headers
@@ -0,0 +1,132 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+
+from app.assignments.intervals import active_conflict, find_conflicts, rebuild_intervals, sitter_intervals
+from app.extensions import db
+from app.models.assignment import CareAssignment
+
+BASE = datetime(2026, 3, 1, 8, 0)
+
+
+def _assign(sample_data, start, hours, status="active", sitter=None):
+    cr = sample_data["request"]
+    a = CareAssignment(
+        care_request_id=cr.id,
+        sitter_id=(sitter or sample_data["sitter"]).id,
+        pet_id=cr.pet_id,
+        start_at=start,
+        end_at=start + timedelta(hours=hours),
+        status=status,
+    )
+    db.session.add(a)
+    db.session.commit()
+    return a
+
+
+def _ids(q):
+    return sorted(a.id for a in q)
+
+
+def test_matches_range_predicate(app, sample_data):
+    rng = random.Random(7)
+    rows = [
+        _assign(
+            sample_data,
+            BASE + timedelta(minutes=rng.randrange(0, 60 * 24 * 60), seconds=rng.randrange(60)),
+            rng.choice([1, 3, 8, 24, 72]),
+            status=rng.choice(["active", "pending", "done", "declined"]),
+        )
+        for _ in range(300)
+    ]
+    sitter, pet = sample_data["sitter"].id, sample_data["pet"].id
+    for _ in range(100):
+        start = BASE + timedelta(minutes=rng.randrange(-600, 60 * 24 * 61))
+        end = start + timedelta(minutes=rng.randrange(1, 60 * 48))
+        for statuses in (("active",), ("pending", "active")):
+            expected = sorted(
+                a.id for a in rows if a.status in statuses and a.start_at < end and a.end_at > start
+            )
+            assert _ids(find_conflicts(start, end, sitter_id=sitter, statuses=statuses)) == expected
+            assert _ids(find_conflicts(start, end, pet_id=pet, statuses=statuses)) == expected
+
+
+def test_touching_intervals_do_not_conflict(app, sample_data):
+    a = _assign(sample_data, BASE, 4)
+    end = a.end_at
+    assert find_conflicts(end, end + timedelta(hours=1), sitter_id=a.sitter_id).first() is None
+    assert find_conflicts(end - timedelta(seconds=1), end, sitter_id=a.sitter_id).first() is a
+    assert find_conflicts(BASE, end, sitter_id=a.sitter_id, exclude_id=a.id).first() is None
+    assert find_conflicts(BASE, end, sitter_id=sample_data["stranger"].id).first() is None
+
+
+def test_tree_follows_status_changes_and_deletes(app, sample_data):
+    def boxes():
+        return sorted(db.session.execute(select(sitter_intervals.c.id)).scalars())
+
+    a = _assign(sample_data, BASE, 4, status="pending")
+    b = _assign(sample_data, BASE + timedelta(days=1), 4)
+    assert boxes() == [a.id, b.id]
+
+    a.status = "declined"
+    b.start_at = BASE + timedelta(days=2)
+    b.end_at = BASE + timedelta(days=2, hours=1)
+    db.session.commit()
+    assert boxes() == [b.id]
+    assert find_conflicts(BASE + timedelta(days=1), BASE + timedelta(days=1, hours=4),
+                          sitter_id=b.sitter_id).first() is None
+    assert find_conflicts(BASE + timedelta(days=2), BASE + timedelta(days=3),
+                          sitter_id=b.sitter_id).first() is b
+
+    db.session.delete(b)
+    db.session.commit()
+    assert boxes() == []
+
+    _assign(sample_data, BASE, 2)
+    db.session.execute(text("DELETE FROM sitter_intervals"))
+    db.session.commit()
+    assert rebuild_intervals() == 2
+    assert len(boxes()) == 1
+
+
+def test_conflict_query_is_driven_by_the_rtree(app, sample_data):
+    a = _assign(sample_data, BASE, 4)
+    q = find_conflicts(BASE, BASE + timedelta(hours=1), sitter_id=a.sitter_id)
+    compiled = q.statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[k] for k in compiled.positiontup)
+    plan = "\n".join(
+        row[-1]
+        for row in db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params)
+    )
+    assert "sitter_intervals VIRTUAL TABLE" in plan, plan
+    assert "rowid=?" in plan, plan
+
+
+def test_active_conflict_flags_match_find_conflicts(app, sample_data):
+    rng = random.Random(3)
+    sitters = [sample_data["sitter"], sample_data["stranger"]]
+    for _ in range(200):
+        _assign(
+            sample_data,
+            BASE + timedelta(minutes=rng.randrange(0, 60 * 24 * 30), seconds=rng.randrange(60)),
+            rng.choice([1, 3, 8, 24]),
+            status=rng.choice(["active", "pending", "done"]),
+            sitter=rng.choice(sitters),
+        )
+    rows = db.session.query(
+        CareAssignment, active_conflict("sitter_id"), active_conflict("pet_id")
+    ).filter(CareAssignment.status == "pending")
+    for a, sitter, pet in rows:
+        expected_sitter = find_conflicts(a.start_at, a.end_at, sitter_id=a.sitter_id, exclude_id=a.id)
+        expected_pet = find_conflicts(a.start_at, a.end_at, pet_id=a.pet_id, exclude_id=a.id)
+        assert bool(sitter) == (expected_sitter.first() is not None)
+        assert bool(pet) == (expected_pet.first() is not None)
+
+
+def test_needs_exactly_one_key(app):
+    with pytest.raises(ValueError):
+        find_conflicts(BASE, BASE + timedelta(hours=1))
+    with pytest.raises(ValueError):
+        find_conflicts(BASE, BASE + timedelta(hours=1), sitter_id=1, pet_id=1)
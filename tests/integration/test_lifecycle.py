@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import lifecycle, user_stats
+from app.analytics import rollup
+from app.assignments.intervals import sitter_intervals
+from app.extensions import db
+from app.models.analytics import AnalyticsMonthly
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.feed import SitterFeed
+from app.models.stats import UserStats
+from app.models.user import User
+from app.matching.feed import publish_request
+
+
+def _snapshot():
+    # Set-based moves compute hours in SQL, ``move`` in Python: compare to 1e-6.
+    return {
+        (r.user_id, r.role, r.month, r.status): (r.count, round(r.hours, 6))
+        for r in AnalyticsMonthly.query.all()
+        if r.count or abs(r.hours) > 1e-6
+    }
+
+
+def _assign(sample_data, start, hours, status="active"):
+    cr = sample_data["request"]
+    a = CareAssignment(care_request_id=cr.id, sitter_id=sample_data["sitter"].id, pet_id=cr.pet_id,
+                       start_at=start, end_at=start + timedelta(hours=hours), status=status)
+    db.session.add(a)
+    rollup.move(None, rollup.of_assignment(a))
+    db.session.commit()
+    return a
+
+
+def test_tick_moves_due_rows_and_derived_tables(app, sample_data):
+    owner, sitter, cr = sample_data["owner"], sample_data["sitter"], sample_data["request"]
+    rollup.backfill()
+    past = datetime.utcnow() - timedelta(days=3)
+    done = _assign(sample_data, past, 4)
+    running = _assign(sample_data, datetime.utcnow() - timedelta(hours=1), 4)
+    versions = {u.id: u.data_version for u in (owner, sitter)}
+
+    result = lifecycle.tick(now=cr.end_at + timedelta(minutes=1))
+    assert result.counts == {"assignments_done": 2, "requests_expired": 1}
+    assert not result.backlog
+
+    db.session.expire_all()
+    assert (done.status, running.status, cr.status) == ("done", "done", "expired")
+    assert db.session.scalar(select(func.count()).select_from(SitterFeed)) == 0
+    assert db.session.scalar(select(func.count()).select_from(sitter_intervals)) == 0
+    assert user_stats.verify().ok
+    for user_id, version in versions.items():
+        assert db.session.get(User, user_id).data_version > version
+
+    incremental = _snapshot()
+    rollup.backfill()
+    assert _snapshot() == incremental
+    assert incremental[(sitter.id, "sitter", past.strftime("%Y-%m"), "done")][0] >= 1
+
+
+def test_tick_leaves_rows_that_are_not_due(app, sample_data):
+    cr = sample_data["request"]
+    upcoming = _assign(sample_data, datetime.utcnow() + timedelta(hours=2), 4)
+
+    assert lifecycle.tick().total == 0
+    db.session.expire_all()
+    assert (upcoming.status, cr.status) == ("active", "open")
+    assert db.session.scalar(select(func.count()).select_from(SitterFeed)) == 1
+
+
+def test_backlog_is_drained_chunk_by_chunk(app, sample_data):
+    past = datetime.utcnow() - timedelta(days=10)
+    for i in range(3):
+        _assign(sample_data, past + timedelta(hours=6 * i), 2)
+
+    first = lifecycle.tick(chunk_size=1, max_chunks=2)
+    assert first.counts["assignments_done"] == 2
+    assert first.backlog
+
+    second = lifecycle.tick(chunk_size=1, max_chunks=2)
+    assert second.counts["assignments_done"] == 1
+    assert not second.backlog
+    assert user_stats.verify().ok
+
+
+def test_expired_request_declines_its_pending_applications(app, sample_data):
+    owner, sitter, cr = sample_data["owner"], sample_data["sitter"], sample_data["request"]
+    rollup.backfill()
+    pending = _assign(sample_data, cr.start_at, 2, status="pending")
+    assert user_stats.verify().ok
+    version = sitter.data_version
+
+    lifecycle.tick(now=cr.end_at + timedelta(minutes=1))
+
+    db.session.expire_all()
+    assert (cr.status, pending.status) == ("expired", "declined")
+    assert db.session.get(User, sitter.id).data_version > version
+    assert db.session.scalar(select(func.count()).select_from(sitter_intervals)) == 0
+    assert user_stats.verify().ok
+    assert db.session.get(UserStats, owner.id).pending_approvals == 0
+
+    incremental = _snapshot()
+    rollup.backfill()
+    assert _snapshot() == incremental
+
+
+def test_expired_requests_leave_the_friend_feed(client, login_as, sample_data):
+    owner, pet = sample_data["owner"], sample_data["pet"]
+    past = datetime.utcnow() - timedelta(days=2)
+    stale = CareRequest(owner_id=owner.id, pet_id=pet.id, start_at=past, end_at=past + timedelta(hours=5),
+                        status="open")
+    db.session.add(stale)
+    publish_request(stale)
+    db.session.commit()
+
+    assert lifecycle.tick().counts == {"assignments_done": 0, "requests_expired": 1}
+    feed = db.session.scalars(select(SitterFeed.care_request_id)).all()
+    assert feed == [sample_data["request"].id]
+
+    login_as(owner)
+    rv = client.get("/care/requests?status=expired")
+    assert rv.status_code == 200
+    assert b"Expired" in rv.data
+
+
+def test_cli_runs_one_tick(app, sample_data):
+    _assign(sample_data, datetime.utcnow() - timedelta(days=1), 3)
+    rv = app.test_cli_runner().invoke(args=["lifecycle", "run", "--once", "--chunk-size", "10"])
+    assert rv.exit_code == 0, rv.output
+    assert "assignments_done=1" in rv.output
+    assert "1 transitions" in rv.output
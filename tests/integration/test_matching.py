@@ -1,4 +1,9 @@
+import re
+
+from app.extensions import db
+from app.matching.feed import rebuild_feeds
 from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
 
 
 def test_open_friend_requests_list(client, login_as, sample_data):
@@ -61,4 +66,53 @@ def test_apply_success_and_overlap_block(client, login_as, sample_data, future_i
         follow_redirects=True,
     )
     assert rv2.status_code in (200, 302, 400, 403, 409)
-    assert q.count() == 1 
\ No newline at end of file
+    assert q.count() == 1 
+
+def _page(client, url):
+    rv = client.get(url)
+    assert rv.status_code == 200
+    html = rv.data.decode()
+    ids = [int(i) for i in re.findall(r"<strong>#(\d+)</strong>", html)]
+    links = dict(
+        (label, href.replace("&amp;", "&"))
+        for href, label in re.findall(r'href="([^"]+)">(?:&larr; )?(Prev|Next)', html)
+    )
+    return ids, links
+
+
+def test_open_friend_requests_keyset_pages(client, login_as, sample_data):
+    first = sample_data["request"]
+    # Shared start times, so the id tie-breaker decides the order inside a group.
+    for i in range(24):
+        db.session.add(CareRequest(
+            owner_id=first.owner_id,
+            pet_id=first.pet_id,
+            start_at=first.start_at + (i // 4) * (first.end_at - first.start_at),
+            end_at=first.end_at,
+            status="open",
+        ))
+    db.session.commit()
+    rebuild_feeds()
+    expected = [
+        r.id for r in CareRequest.query.order_by(CareRequest.start_at, CareRequest.id)
+    ]
+
+    login_as(sample_data["sitter"])
+    seen, pages, url = [], [], "/requests/friends/open"
+    while url:
+        ids, links = _page(client, url)
+        assert "page=" not in url
+        seen += ids
+        pages.append((ids, links.get("Prev")))
+        url = links.get("Next")
+    assert seen == expected
+    assert [len(ids) for ids, _ in pages] == [10, 10, 5]
+    assert pages[0][1] is None
+
+    ids, links = _page(client, pages[-1][1])
+    assert ids == pages[-2][0]
+    ids, links = _page(client, links["Prev"])
+    assert ids == pages[0][0]
+    assert "Prev" not in links
+
+    assert _page(client, "/requests/friends/open?cursor=garbage")[0] == pages[0][0]
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from flask import g
+
+from app.extensions import db
+from app.instrumentation import LazyLoadError, query_budgets
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+
+GET_VIEWS = {
+    "dashboard": "/dashboard",
+    "matching.open_friend_requests": "/requests/friends/open",
+    "assignments.list_assignments": "/assignments",
+    "assignments.review_list": "/assignments/review",
+    "schedule.care_list": "/care/requests",
+    "pets.list_pets": "/pets",
+    "social.search": "/social/search?q=a",
+    "social.sent": "/social/sent",
+    "social.incoming": "/social/incoming",
+    "social.friends": "/social/friends",
+    "analytics.overview": "/analytics",
+    "analytics.data": "/analytics/data.json",
+}
+
+
+def _client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+        sess["_fresh"] = True
+    return client
+
+
+def _queries(rv) -> int:
+    for item in rv.headers.getlist("Server-Timing"):
+        if item.startswith("db;"):
+            return int(item.split('desc="', 1)[1].split(" ", 1)[0])
+    raise AssertionError("no Server-Timing db entry")
+
+
+def test_every_budgeted_view_is_covered(scaled):
+    app, _ctx = scaled
+    assert set(query_budgets(app)) == set(GET_VIEWS) | {"matching.apply_request"}
+
+
+@pytest.mark.parametrize("endpoint", sorted(GET_VIEWS))
+@pytest.mark.parametrize("actor", ["owner", "sitter"])
+def test_views_stay_within_query_budget(scaled, endpoint, actor):
+    app, ctx = scaled
+    rv = _client(app, ctx[actor]).get(GET_VIEWS[endpoint])
+    assert rv.status_code == 200
+    assert _queries(rv) <= query_budgets(app)[endpoint]
+
+
+@pytest.mark.parametrize("endpoint", ["schedule.care_list", "assignments.list_assignments"])
+def test_archived_mode_stays_within_query_budget(scaled, endpoint):
+    app, ctx = scaled
+    rv = _client(app, ctx["owner"]).get(GET_VIEWS[endpoint] + "?archived=1")
+    assert rv.status_code == 200
+    assert _queries(rv) <= query_budgets(app)[endpoint]
+
+
+def test_apply_stays_within_query_budget(scaled):
+    app, ctx = scaled
+    client = _client(app, ctx["sitter"])
+    path = f"/requests/{ctx['request']}/apply"
+    rv = client.get(path)
+    assert rv.status_code == 200
+    assert _queries(rv) <= query_budgets(app)["matching.apply_request"]
+
+    rv = client.post(path, data={
+        "start_at": ctx["start"].strftime("%Y-%m-%dT%H:%M"),
+        "end_at": (ctx["start"] + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M"),
+    })
+    assert rv.status_code == 302
+    assert _queries(rv) <= query_budgets(app)["matching.apply_request"]
+
+
+def test_repeated_lazy_load_raises(scaled):
+    app, ctx = scaled
+    with app.test_request_context("/"):
+        app.preprocess_request()
+        rows = CareRequest.query.filter_by(owner_id=ctx["owner"]).limit(20).all()
+        with pytest.raises(LazyLoadError, match="CareRequest.assignments"):
+            for r in rows:
+                r.assignments.count()
+        db.session.remove()
+
+
+def test_explicit_filter_is_not_a_dynamic_load(scaled):
+    app, ctx = scaled
+    with app.test_request_context("/"):
+        app.preprocess_request()
+        rows = CareRequest.query.filter_by(owner_id=ctx["owner"]).limit(20).all()
+        for r in rows:
+            CareAssignment.query.filter_by(care_request_id=r.id).count()
+            CareAssignment.query.filter_by(pet_id=r.pet_id, status="active").first()
+        assert not g.lazy_loads
+        db.session.remove()
+
+
+def test_many_to_one_lazy_loads_are_counted(scaled):
+    app, ctx = scaled
+    with app.test_request_context("/"):
+        app.preprocess_request()
+        rows = CareAssignment.query.limit(20).all()
+        db.session.expire_all()
+        with pytest.raises(LazyLoadError, match="CareAssignment.(pet|care_request)"):
+            for a in rows:
+                a.care_request
+        db.session.remove()
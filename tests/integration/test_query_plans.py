@@ -0,0 +1,218 @@
+import re
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, func, or_, select, tuple_
+
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.feed import SitterFeed
+from app.models.social import Friendship
+from app.pagination import encode_cursor
+
+HOT_VIEWS = [
+    ("owner", "GET", "/dashboard"),
+    ("sitter", "GET", "/dashboard"),
+    ("sitter", "GET", "/requests/friends/open"),
+    ("sitter", "GET", "/requests/friends/open?cursor={cursor}"),
+    ("owner", "GET", "/assignments"),
+    ("sitter", "GET", "/assignments"),
+    ("owner", "GET", "/assignments/review"),
+    ("owner", "GET", "/care/requests"),
+    ("owner", "GET", "/pets"),
+    ("sitter", "GET", "/social/friends"),
+    ("sitter", "GET", "/social/sent"),
+    ("sitter", "GET", "/social/incoming"),
+    ("sitter", "GET", "/social/search?q=mar"),
+    ("owner", "GET", "/analytics"),
+    ("owner", "GET", "/analytics/data.json?months=24"),
+    ("sitter", "GET", "/requests/{request}/apply"),
+    ("sitter", "POST", "/requests/{request}/apply"),
+    ("owner", "POST", "/assignments/{pending}/approve"),
+    ("owner", "POST", "/assignments/approve-batch"),
+]
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def _capture(app, actor_id, method, path, data):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(actor_id)
+        sess["_fresh"] = True
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        rv = client.open(path, method=method, data=data)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert rv.status_code in (200, 302)
+    return statements
+
+
+def _full_scans(statement, parameters):
+    tables = set(db.metadata.tables)
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).fetchall()
+    return [
+        row[-1]
+        for row in rows
+        if (m := _FULL_SCAN.match(row[-1])) and m.group(1).rstrip("_0123456789") in tables
+    ]
+
+
+@pytest.mark.parametrize("actor,method,path", HOT_VIEWS)
+def test_hot_queries_use_indexes(scaled, actor, method, path):
+    app, ctx = scaled
+    data = None
+    with app.app_context():
+        pending = (
+            CareAssignment.query.join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
+            .filter(CareRequest.owner_id == ctx["owner"], CareAssignment.status == "pending")
+            .first()
+        )
+        if "apply" in path and method == "POST":
+            data = {
+                "start_at": ctx["start"].strftime("%Y-%m-%dT%H:%M"),
+                "end_at": ctx["start"].replace(hour=(ctx["start"].hour + 1) % 24).strftime("%Y-%m-%dT%H:%M"),
+            }
+        elif "approve-batch" in path:
+            data = {"ids": [str(pending.id)]}
+        elif "approve" in path:
+            data = {
+                f"ap{pending.id}-start_at": pending.start_at.strftime("%Y-%m-%dT%H:%M"),
+                f"ap{pending.id}-end_at": pending.end_at.strftime("%Y-%m-%dT%H:%M"),
+                "row": str(pending.id),
+                "action": "approve",
+            }
+        cursor = encode_cursor((ctx["start"], ctx["request"]))
+        url = path.format(request=ctx["request"], pending=pending.id, cursor=cursor)
+        db.session.remove()
+
+    statements = _capture(app, ctx[actor], method, url, data)
+    assert statements
+
+    with app.app_context():
+        scans = {
+            statement: found
+            for statement, parameters in statements
+            if (found := _full_scans(statement, parameters))
+        }
+    assert not scans, scans
+
+
+def _plan(stmt) -> str:
+    compiled = stmt.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[k] for k in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params)
+    return "\n".join(row[-1] for row in rows)
+
+
+def _hot_queries(ctx):
+    start = ctx["start"]
+    end = start + timedelta(hours=4)
+    me = ctx["sitter"]
+    return {
+        "ix_care_requests_status_owner_start_id": select(CareRequest)
+        .where(
+            CareRequest.status == "open",
+            CareRequest.owner_id.in_([ctx["owner"], me]),
+            tuple_(CareRequest.start_at, CareRequest.id) > tuple_(start, 1),
+        )
+        .order_by(CareRequest.start_at, CareRequest.id)
+        .limit(11),
+        "ix_care_requests_owner_start": select(CareRequest)
+        .where(CareRequest.owner_id == ctx["owner"])
+        .order_by(CareRequest.start_at.desc())
+        .limit(5),
+        "ix_care_assignments_sitter_status_start_end": select(CareAssignment.id)
+        .where(
+            CareAssignment.sitter_id == me,
+            CareAssignment.status.in_(["pending", "active"]),
+            CareAssignment.start_at < end,
+            CareAssignment.end_at > start,
+        )
+        .limit(1),
+        "ix_care_assignments_pet_status_start_end": select(CareAssignment.id)
+        .where(
+            CareAssignment.pet_id == 1,
+            CareAssignment.status == "active",
+            CareAssignment.start_at < end,
+            CareAssignment.end_at > start,
+        )
+        .limit(1),
+        "ix_care_assignments_request_status": select(func.count())
+        .select_from(CareAssignment)
+        .join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
+        .where(CareRequest.owner_id == ctx["owner"], CareAssignment.status == "pending"),
+        "ix_friendships_status_requester": select(Friendship.requester_id, Friendship.addressee_id)
+        .where(
+            Friendship.status == "accepted",
+            or_(Friendship.requester_id == me, Friendship.addressee_id == me),
+        ),
+        # The due rows of ``lifecycle.tick``.
+        "ix_care_assignments_status_end": select(CareAssignment.id)
+        .where(CareAssignment.status == "active", CareAssignment.end_at < start)
+        .order_by(CareAssignment.end_at)
+        .limit(500),
+        "ix_care_requests_status_end": select(CareRequest.id)
+        .where(CareRequest.status == "open", CareRequest.end_at < start)
+        .order_by(CareRequest.end_at)
+        .limit(500),
+    }
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        "ix_care_requests_status_owner_start_id",
+        "ix_care_requests_owner_start",
+        "ix_care_assignments_sitter_status_start_end",
+        "ix_care_assignments_pet_status_start_end",
+        "ix_care_assignments_request_status",
+        "ix_friendships_status_requester",
+        "ix_care_assignments_status_end",
+        "ix_care_requests_status_end",
+    ],
+)
+def test_hot_query_uses_composite_index(scaled, index):
+    app, ctx = scaled
+    with app.app_context():
+        plan = _plan(_hot_queries(ctx)[index])
+    assert index in plan, plan
+    assert not any(_FULL_SCAN.match(line) for line in plan.splitlines()), plan
+
+
+def test_friendship_pair_lookup_is_a_single_seek(scaled):
+    app, ctx = scaled
+    low, high = Friendship.pair(ctx["owner"], ctx["sitter"])
+    with app.app_context():
+        plan = _plan(select(Friendship).where(
+            Friendship.user_low_id == low, Friendship.user_high_id == high
+        ))
+    assert plan.splitlines() == [plan] and "(user_low_id=? AND user_high_id=?)" in plan, plan
+
+
+def test_feed_page_is_one_ordered_range_scan(scaled):
+    app, ctx = scaled
+    with app.app_context():
+        plan = _plan(
+            select(SitterFeed.care_request_id)
+            .where(
+                SitterFeed.sitter_id == ctx["sitter"],
+                tuple_(SitterFeed.start_at, SitterFeed.care_request_id) > tuple_(ctx["start"], 1),
+            )
+            .order_by(SitterFeed.start_at, SitterFeed.care_request_id)
+            .limit(11)
+        )
+    assert "ix_sitter_feed_sitter_start" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.assignment import CareAssignment
+
+
+def _row(cr, sitter, start, hours, status="pending"):
+    return CareAssignment(
+        care_request_id=cr.id,
+        sitter_id=sitter.id,
+        pet_id=cr.pet_id,
+        start_at=start,
+        end_at=start + timedelta(hours=hours),
+        status=status,
+    )
+
+
+def test_review_flags_conflicts(client, login_as, sample_data):
+    cr = sample_data["request"]
+    sitter, stranger = sample_data["sitter"], sample_data["stranger"]
+    db.session.add_all([
+        _row(cr, sitter, cr.start_at, 4, status="active"),
+        _row(cr, stranger, cr.start_at + timedelta(hours=12), 2),
+    ])
+    db.session.commit()
+    clash = _row(cr, sitter, cr.start_at + timedelta(hours=1), 2)
+    db.session.add(clash)
+    db.session.commit()
+
+    login_as(sample_data["owner"])
+    r = client.get("/assignments/review")
+    assert r.status_code == 200
+    assert r.data.count(b"<strong>Conflict:</strong>") == 1
+    assert b"the sitter already has an active assignment" in r.data
+    assert b"Roshlyo is already booked" in r.data
+
+
+def test_review_is_one_statement_for_many_rows(app, client, login_as, sample_data):
+    cr = sample_data["request"]
+    cr.end_at = cr.start_at + timedelta(days=60)
+    sitters = [sample_data["sitter"], sample_data["stranger"]]
+    db.session.add_all(
+        _row(cr, sitters[i % 2], cr.start_at + timedelta(hours=3 * i), 4,
+             status="active" if i % 5 == 0 else "pending")
+        for i in range(500)
+    )
+    db.session.commit()
+    login_as(sample_data["owner"])
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        r = client.get("/assignments/review")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert r.status_code == 200
+    assert r.data.count(b"<strong>Conflict:</strong>") > 0
+    assert sum("care_assignments" in s for s in statements) == 1
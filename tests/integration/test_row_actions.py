@@ -0,0 +1,85 @@
+import pytest
+
+from app.extensions import db
+from app.models.assignment import CareAssignment
+
+
+@pytest.fixture()
+def pending(sample_data):
+    cr = sample_data["request"]
+    a = CareAssignment(care_request_id=cr.id, sitter_id=sample_data["sitter"].id, pet_id=cr.pet_id,
+                       start_at=cr.start_at, end_at=cr.end_at, status="pending")
+    db.session.add(a)
+    db.session.commit()
+    return a
+
+
+@pytest.fixture()
+def offers(app, sample_data):
+    from app.models.offer import CareOffer
+    from app.offers.routes import offers_bp
+
+    # The offers blueprint is not registered by create_app.
+    app.register_blueprint(offers_bp)
+    db.create_all()
+    rows = [
+        CareOffer(care_request_id=sample_data["request"].id, sitter_id=u.id, status="offered")
+        for u in (sample_data["sitter"], sample_data["stranger"])
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def test_review_renders_row_actions(client, login_as, sample_data, pending):
+    login_as(sample_data["owner"])
+    page = client.get("/assignments/review").data.decode()
+    assert f'name="row" value="{pending.id}"' in page
+    assert 'name="action" value="approve"' in page
+    assert 'name="action" value="decline"' in page
+
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"action": "decline"},
+    {"action": "decline", "row": "0"},
+    {"action": "approve", "row": "{id}"},
+])
+def test_decline_rejects_mismatched_action(client, login_as, sample_data, pending, data):
+    login_as(sample_data["owner"])
+    data = {k: v.format(id=pending.id) for k, v in data.items()}
+    client.post(f"/assignments/{pending.id}/decline", data=data)
+    db.session.expire_all()
+    assert pending.status == "pending"
+
+
+def test_decline_with_row_action(client, login_as, sample_data, pending):
+    login_as(sample_data["owner"])
+    client.post(f"/assignments/{pending.id}/decline", data={"action": "decline", "row": str(pending.id)})
+    db.session.expire_all()
+    assert pending.status == "declined"
+
+
+def test_offer_actions(client, login_as, sample_data, offers):
+    mine, other = offers
+    login_as(sample_data["owner"])
+    page = client.get(f"/offers/request/{sample_data['request'].id}").data.decode()
+    assert page.count('name="action" value="accept"') == 2
+
+    client.post(f"/offers/{mine.id}/decline", data={"action": "decline", "row": str(other.id)})
+    db.session.expire_all()
+    assert mine.status == "offered"
+
+    client.post(f"/offers/{mine.id}/decline", data={"action": "decline", "row": str(mine.id)})
+    db.session.expire_all()
+    assert mine.status == "declined_by_owner"
+
+
+def test_withdraw_offer(client, login_as, sample_data, offers):
+    mine = offers[0]
+    login_as(sample_data["sitter"])
+    assert f'name="row" value="{mine.id}"' in client.get("/offers/mine").data.decode()
+
+    client.post(f"/offers/{mine.id}/withdraw", data={"action": "withdraw", "row": str(mine.id)})
+    db.session.expire_all()
+    assert mine.status == "withdrawn"
@@ -0,0 +1,78 @@
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models.user import User
+from app.social.search import match_expression, search_users
+
+
+def _names(users):
+    return [u.name for u in users]
+
+
+def test_match_expression_prefixes_and_transliterates():
+    assert match_expression("mar") == '"mar"*'
+    assert match_expression("Стоян Mar") == '("stoyan"* OR "стоян"*) AND "mar"*'
+    assert match_expression('"; --') is None
+
+
+def test_prefix_search_folds_case_and_diacritics(app, make_user):
+    make_user("marta@example.com", "Marta Stoyanova")
+    make_user("mara@example.com", "Mára Petrova")
+    make_user("ivo@example.com", "Ivo Ivanov")
+
+    assert sorted(_names(search_users("mar"))) == ["Marta Stoyanova", "Mára Petrova"]
+    assert _names(search_users("MARA")) == ["Mára Petrova"]
+    assert _names(search_users("stoy mar")) == ["Marta Stoyanova"]
+    assert search_users("  ") == []
+
+
+def test_cyrillic_query_matches_latin_names(app, make_user):
+    make_user("s@example.com", "Stoyan Kolev")
+    make_user("z@example.com", "Zhivka Hristova")
+
+    assert _names(search_users("Стоян")) == ["Stoyan Kolev"]
+    assert _names(search_users("жив")) == ["Zhivka Hristova"]
+
+
+def test_name_hits_rank_above_email_hits(app, make_user):
+    by_email = make_user("petrov.family@example.com", "Ani Dimitrova")
+    by_name = make_user("ani@example.com", "Teo Petrov")
+
+    assert [u.id for u in search_users("petrov")] == [by_name.id, by_email.id]
+    assert _names(search_users("ani@example")) == ["Teo Petrov"]
+
+
+def test_best_hits_are_found_among_many_matches(app, make_user):
+    # Thousands of weak (email-only) matches with lower ids than the strong one.
+    db.session.execute(User.__table__.insert(), [
+        {"email": f"petrov{i}@example.com", "name": f"Guest {i}", "password_hash": "x"}
+        for i in range(3000)
+    ])
+    db.session.commit()
+    best = make_user("teo@example.com", "Teo Petrov")
+
+    hits = search_users("petrov", limit=10)
+    assert hits[0].id == best.id
+    assert len(hits) == 10
+
+
+def test_index_follows_updates_and_deletes(app, make_user):
+    u = make_user("r@example.com", "Rumen Kostov")
+    gone = make_user("g@example.com", "Rumen Vasilev")
+
+    u.name = "Rumen Todorov"
+    db.session.delete(gone)
+    db.session.commit()
+
+    assert search_users("kostov") == []
+    assert _names(search_users("rumen")) == ["Rumen Todorov"]
+    assert _names(search_users("todo", exclude_id=u.id)) == []
+
+
+def test_falls_back_to_like_without_fts_table(app, make_user):
+    make_user("mila@example.com", "Mila Koleva")
+    db.session.execute(text("DROP TABLE users_fts"))
+    db.session.commit()
+
+    assert _names(search_users("mila")) == ["Mila Koleva"]
+    assert app.extensions["user_search_fts"] is False
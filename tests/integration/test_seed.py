@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.care import CareRequest
+from app.models.social import Friendship
+from app.models.user import User
+from app.seeding import TABLES, SeedSpec, seed_bulk
+
+
+def test_seed_small_bulk_counts(app):
+    rv = app.test_cli_runner().invoke(args=["seed-small", "--users", "30"])
+    assert rv.exit_code == 0, rv.output
+    assert "rows/s" in rv.output
+    assert User.query.count() == 30
+    assert CareRequest.query.count() > 0
+
+    hashes = db.session.query(func.count(func.distinct(User.password_hash))).scalar()
+    assert hashes == 1
+    assert User.query.first().check_password("demo")
+
+
+def test_seed_assignments_go_to_friend_sitters(app):
+    rv = app.test_cli_runner().invoke(
+        args=["seed-big", "--users", "40", "--chunk-size", "7"]
+    )
+    assert rv.exit_code == 0, rv.output
+
+    pairs = {
+        tuple(sorted((f.requester_id, f.addressee_id)))
+        for f in Friendship.query.filter_by(status="accepted")
+    }
+    rows = (
+        db.session.query(CareAssignment, CareRequest)
+        .join(CareRequest, CareRequest.id == CareAssignment.care_request_id)
+        .all()
+    )
+    assert rows
+    for a, r in rows:
+        assert tuple(sorted((a.sitter_id, r.owner_id))) in pairs
+        assert a.pet_id == r.pet_id
+        assert a.sitter.is_sitter
+
+
+def _dump():
+    out = {}
+    for m in TABLES:
+        cols = [c for c in m.__table__.columns if c.name != "password_hash"]
+        rows = db.session.execute(select(*cols).order_by(m.__table__.c.id))
+        out[m.__tablename__] = [tuple(r) for r in rows]
+    return out
+
+
+def test_seed_is_identical_for_any_worker_count(app):
+    spec = SeedSpec(
+        users=25,
+        pets_per_owner_min=1,
+        pets_per_owner_max=2,
+        reqs_per_pet_min=1,
+        reqs_per_pet_max=3,
+        seed=7,
+        now=datetime(2025, 6, 1, 12),
+        block_users=10,
+    )
+    seed_bulk(spec, chunk_size=13, workers=1)
+    serial = _dump()
+    assert len(serial["users"]) == 25
+
+    rv = app.test_cli_runner().invoke(args=["purge-data"])
+    assert rv.exit_code == 0, rv.output
+
+    seed_bulk(spec, chunk_size=13, workers=2)
+    assert _dump() == serial
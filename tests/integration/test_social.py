@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.social import Friendship
+from app.social.cache import FriendCache, friend_ids
+
+
+def test_friendship_stores_canonical_pair(app, make_user):
+    a = make_user("a@example.com", "A")
+    b = make_user("b@example.com", "B")
+    db.session.add(Friendship(requester_id=b.id, addressee_id=a.id, status="pending"))
+    db.session.commit()
+
+    f = Friendship.between(a.id, b.id)
+    assert (f.user_low_id, f.user_high_id) == (a.id, b.id)
+    assert Friendship.between(b.id, a.id).id == f.id
+
+    db.session.add(Friendship(requester_id=a.id, addressee_id=b.id, status="pending"))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_send_request_back_accepts_pending(client, login_as, make_user):
+    a = make_user("a@example.com", "A")
+    b = make_user("b@example.com", "B")
+    db.session.add(Friendship(requester_id=a.id, addressee_id=b.id, status="pending"))
+    db.session.commit()
+
+    login_as(b)
+    rv = client.post(f"/social/send/{a.id}")
+    assert rv.status_code == 302
+    assert Friendship.query.count() == 1
+    assert Friendship.between(a.id, b.id).status == "accepted"
+
+
+def test_search_shows_friendship_status(client, login_as, make_user):
+    # ``me`` gets the middle id, so the pair lookup needs both the low and high side.
+    lower = make_user("low@example.com", "Marta Low")
+    me = make_user("me@example.com", "Middle")
+    higher = make_user("high@example.com", "Marta High")
+    db.session.add_all([
+        Friendship(requester_id=me.id, addressee_id=lower.id, status="accepted"),
+        Friendship(requester_id=higher.id, addressee_id=me.id, status="pending"),
+    ])
+    db.session.commit()
+
+    login_as(me)
+    rv = client.get("/social/search?q=marta")
+    assert rv.status_code == 200
+    assert b'<span class="badge ok">Friends</span>' in rv.data
+    assert b"Requested you" in rv.data
+
+
+def test_friend_cache_counts_and_evicts(app, make_user):
+    a = make_user("a@example.com", "A")
+    b = make_user("b@example.com", "B")
+    c = make_user("c@example.com", "C")
+    db.session.add(Friendship(requester_id=a.id, addressee_id=b.id, status="accepted"))
+    db.session.commit()
+
+    cache = FriendCache(maxsize=1, ttl=60)
+    assert cache.get(a.id) == frozenset({b.id})
+    assert cache.get(a.id) == frozenset({b.id})
+    assert cache.get(c.id) == frozenset()
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2, "evictions": 1}
+
+    expired = FriendCache(ttl=0)
+    expired.get(a.id)
+    expired.get(a.id)
+    assert expired.stats()["hits"] == 0
+
+
+def test_accept_invalidates_both_users(client, login_as, make_user):
+    a = make_user("a@example.com", "A")
+    b = make_user("b@example.com", "B")
+    db.session.add(Friendship(requester_id=a.id, addressee_id=b.id, status="pending"))
+    db.session.commit()
+    assert friend_ids(a.id) == frozenset()
+    assert friend_ids(b.id) == frozenset()
+
+    login_as(b)
+    client.post(f"/social/accept/{a.id}")
+    assert friend_ids(a.id) == frozenset({b.id})
+    assert friend_ids(b.id) == frozenset({a.id})
+
+
+def test_warm_cache_skips_friendships_table(client, login_as, sample_data):
+    login_as(sample_data["sitter"])
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    client.get("/requests/friends/open")
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        rv = client.get("/requests/friends/open")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert rv.status_code == 200
+    assert statements
+    assert not any("friendships" in s for s in statements)
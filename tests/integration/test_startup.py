@@ -0,0 +1,59 @@
+import json
+
+import click
+
+from app import create_app
+
+
+def _fast_app():
+    return create_app(dict(
+        TESTING=True,
+        SECRET_KEY="test-secret-key",
+        SQLALCHEMY_DATABASE_URI="sqlite:///:memory:",
+        FAST_STARTUP="1",
+    ))
+
+
+def test_fast_startup_defers_blueprints_to_first_request():
+    app = _fast_app()
+    assert "auth.login" not in app.view_functions
+
+    with click.Context(click.Command("seed-small"), info_name="seed-small"):
+        with app.app_context():
+            pass
+    assert "auth.login" not in app.view_functions
+
+    rv = app.test_client().get("/auth/login")
+    assert rv.status_code == 200
+    assert "analytics.data" in app.view_functions
+
+
+def test_page_commands_register_blueprints():
+    app = _fast_app()
+    with click.Context(click.Command("routes"), info_name="routes"):
+        with app.app_context():
+            assert "auth.login" in app.view_functions
+
+
+def test_migrate_commands_are_loaded_on_use():
+    app = _fast_app()
+    assert "migrate" not in app.extensions
+    rv = app.test_cli_runner().invoke(args=["db", "--help"])
+    assert rv.exit_code == 0, rv.output
+    assert "upgrade" in rv.output
+    assert "migrate" in app.extensions
+
+
+def test_startup_profile_command(app, tmp_path):
+    out = tmp_path / "startup.json"
+    rv = app.test_cli_runner().invoke(
+        args=["startup-profile", "--mode", "cli", "--top", "5", "--out", str(out)]
+    )
+    assert rv.exit_code == 0, rv.output
+    assert "create_app() [cli]" in rv.output
+
+    report = json.loads(out.read_text())
+    modules = {m["module"] for m in report["modules"]}
+    assert "app" in modules
+    assert "app.auth.routes" not in modules
+    assert "alembic" not in modules
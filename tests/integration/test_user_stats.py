@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import user_stats
+from app.extensions import db
+from app.models.assignment import CareAssignment
+from app.models.pet import Pet
+from app.models.stats import UserStats
+
+
+def _stats(user):
+    row = db.session.get(UserStats, user.id)
+    db.session.refresh(row) if row is not None else None
+    return {c: getattr(row, c, 0) for c in user_stats.COUNTERS}
+
+
+def test_counters_follow_status_transitions(app, sample_data):
+    owner, sitter, cr = sample_data["owner"], sample_data["sitter"], sample_data["request"]
+    assert _stats(owner) == {"pets": 1, "open_requests": 1, "pending_approvals": 0, "active_assignments": 0}
+
+    a = CareAssignment(care_request_id=cr.id, sitter_id=sitter.id, pet_id=cr.pet_id,
+                       start_at=cr.start_at, end_at=cr.end_at, status="pending")
+    db.session.add(a)
+    db.session.commit()
+    assert _stats(owner)["pending_approvals"] == 1
+
+    a.status = "active"
+    cr.status = "confirmed"
+    db.session.commit()
+    assert _stats(owner) == {"pets": 1, "open_requests": 0, "pending_approvals": 0, "active_assignments": 0}
+    assert _stats(sitter)["active_assignments"] == 1
+
+    a.status = "done"
+    db.session.add(Pet(owner_id=owner.id, name="Sharo", species="Dog"))
+    db.session.commit()
+    assert _stats(sitter)["active_assignments"] == 0
+    assert _stats(owner)["pets"] == 2
+    assert user_stats.verify().ok
+
+
+def test_verify_reports_and_repairs_drift(app, sample_data):
+    owner = sample_data["owner"]
+    db.session.execute(
+        UserStats.__table__.update().where(UserStats.user_id == owner.id).values(pets=7)
+    )
+    db.session.execute(UserStats.__table__.insert().values(user_id=sample_data["stranger"].id, pets=1))
+    db.session.commit()
+
+    drift = user_stats.verify()
+    assert drift.total == 2
+    assert (owner.id, "pets", 7, 1) in drift.rows
+
+    runner = app.test_cli_runner()
+    rv = runner.invoke(args=["stats-verify"])
+    assert rv.exit_code == 1
+    assert "drift: 2 users" in rv.output
+
+    rv = runner.invoke(args=["stats-verify", "--repair"])
+    assert rv.exit_code == 0, rv.output
+    assert user_stats.verify().ok
+    assert _stats(owner)["pets"] == 1
+
+
+def test_verify_finds_missing_rows_without_a_full_join(app, sample_data):
+    owner = sample_data["owner"]
+    db.session.execute(UserStats.__table__.delete().where(UserStats.user_id == owner.id))
+    db.session.commit()
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        drift = user_stats.verify()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert (owner.id, "pets", 0, 1) in drift.rows
+    assert not any("FULL" in s for s in statements)
+
+
+def test_seeded_counters_match(app):
+    rv = app.test_cli_runner().invoke(args=["seed-small", "--users", "30"])
+    assert rv.exit_code == 0, rv.output
+    assert "user_stats" in rv.output
+    assert user_stats.verify().ok
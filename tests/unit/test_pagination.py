@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from app.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    token = encode_cursor((datetime(2026, 3, 1, 9, 30), 42))
+    assert "=" not in token
+    assert decode_cursor(token, (datetime, int)) == ("next", (datetime(2026, 3, 1, 9, 30), 42))
+
+    back = encode_cursor((datetime(2026, 3, 1, 9, 30), 42), "prev")
+    assert decode_cursor(back, (datetime, int))[0] == "prev"
+
+
+def test_malformed_cursor_is_ignored():
+    assert decode_cursor(None, (datetime, int)) is None
+    assert decode_cursor("not-a-cursor", (datetime, int)) is None
+    assert decode_cursor(encode_cursor((1,)), (datetime, int)) is None
+    assert decode_cursor(encode_cursor(("x", "y")), (datetime, int)) is None
@@ -0,0 +1,22 @@
+from app.startup_profile import StartupProfile, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _abc
+import time:      1500 |       1620 |   abc
+import time:      3000 |       4620 | app
+some other line
+"""
+
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE)
+    assert [(m.module, m.depth) for m in rows] == [("_abc", 2), ("abc", 1), ("app", 0)]
+    assert rows[1].self_ms == 1.5
+    assert rows[2].cumulative_ms == 4.62
+
+
+def test_top_modules():
+    profile = StartupProfile(mode="web", total_ms=5.0, modules=parse_importtime(SAMPLE))
+    assert [m.module for m in profile.top(2)] == ["app", "abc"]
+    assert [m.module for m in profile.top(1, "self")] == ["app"]